@@ -1,16 +1,30 @@
 import streamlit as st
-import vosk
-import sounddevice as sd
 import queue
-import json
 import threading
 import sys
+import sqlite3
+import uuid
 import time
 import os
 import wave
-import numpy as np
 from io import BytesIO
-import scipy.signal
+
+# Only modules that are cheap to import are loaded here. vosk, sounddevice
+# (PortAudio), numpy and scipy are imported where a feature first needs them,
+# so the page renders before they load (see benchmark_startup.py)
+from audio_decode import CompressedAudio, is_wav, supported_types
+from audio_feed import AdaptiveChunker, as_waveform
+from checkpoints import CheckpointStore
+from file_jobs import DONE, FAILED, QUEUED, RUNNING, FileJob, JobQueue, format_duration
+from code_switch import CodeSwitchRecognizer
+from grammar import create_recognizer, load_grammar, supports_grammar
+from language_switch import HotSwitchRecognizer
+from recognition import decode_block, flush_block, recognition_loop, segment_times
+from speakers import SPEAKER_MODEL
+from transcript_buffer import TranscriptBuffer
+from transcript_export import SegmentExporter, export_base_path
+from transcript_store import DEFAULT_DB, TranscriptStore
+from transcription_cache import CacheKey, TranscriptionCache, decode_options
 
 # --- Application State Management ---
 # Use Streamlit's session state to manage our app's state across reruns.
@@ -20,20 +34,32 @@ if 'text_queue' not in st.session_state:
     st.session_state.text_queue = queue.Queue()
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
-if 'full_text' not in st.session_state:
-    st.session_state.full_text = ""
-if 'partial_text' not in st.session_state:
-    st.session_state.partial_text = ""
+if 'transcript' not in st.session_state:
+    # Finalized segments + current partial result (see transcript_buffer.py)
+    st.session_state.transcript = TranscriptBuffer()
 if 'stop_event' not in st.session_state:
     st.session_state.stop_event = threading.Event()
 if 'model_loaded' not in st.session_state:
     st.session_state.model_loaded = {}
-if 'audio_initialized' not in st.session_state:
-    st.session_state.audio_initialized = False
-if 'uploaded_file_text' not in st.session_state:
-    st.session_state.uploaded_file_text = ""
-if 'processing_file' not in st.session_state:
-    st.session_state.processing_file = False
+if 'microphone_missing' not in st.session_state:
+    st.session_state.microphone_missing = False
+if 'file_jobs' not in st.session_state:
+    # Background transcription jobs for uploaded files (see file_jobs.py)
+    st.session_state.file_jobs = []
+if 'uploader_key' not in st.session_state:
+    st.session_state.uploader_key = 0
+if 'detected_language' not in st.session_state:
+    st.session_state.detected_language = None
+if 'live_export_paths' not in st.session_state:
+    st.session_state.live_export_paths = []
+if 'live_gate' not in st.session_state:
+    st.session_state.live_gate = None
+if 'last_speaker' not in st.session_state:
+    st.session_state.last_speaker = None
+if 'language_switch' not in st.session_state:
+    st.session_state.language_switch = None
+if 'recording_session_id' not in st.session_state:
+    st.session_state.recording_session_id = uuid.uuid4().hex
 
 # --- MODEL LOADING ---
 @st.cache_resource
@@ -43,15 +69,79 @@ def load_vosk_model(model_path):
         if not os.path.exists(model_path):
             return None, f"Model directory not found: {model_path}"
         
+        import vosk
         model = vosk.Model(model_path)
         return model, "Model loaded successfully"
     except Exception as e:
         return None, f"Error loading model: {str(e)}"
 
+@st.cache_data
+def load_vocabulary_grammar(model_path):
+    """Build and cache the constrained-decoding grammar from whisperboard/vocabulary.txt"""
+    return load_grammar(model_path)
+
+@st.cache_resource
+def get_speaker_model():
+    """Load and cache the Vosk speaker model (None if it is not installed)"""
+    try:
+        from speakers import load_speaker_model
+        return load_speaker_model(SPEAKER_MODEL)
+    except Exception as e:
+        print(f"WARNING: Speaker labeling disabled: {e}", file=sys.stderr)
+        return None
+
+@st.cache_resource
+def load_domain_lm():
+    """Memory-map the compiled domain LM (compiled from lm.arpa on first use)"""
+    from lm_binary import load_lm
+    from rescoring import DEFAULT_LM
+    return load_lm(DEFAULT_LM)
+
+@st.cache_resource
+def get_transcript_store():
+    """Open the transcript history shared by all sessions (None if unavailable)"""
+    try:
+        return TranscriptStore(DEFAULT_DB)
+    except sqlite3.Error as e:
+        print(f"WARNING: Transcript history disabled: {e}", file=sys.stderr)
+        return None
+
+@st.cache_resource
+def get_transcription_cache():
+    """Open the on-disk cache of finished file transcriptions (None if unavailable)"""
+    try:
+        return TranscriptionCache()
+    except OSError as e:
+        print(f"WARNING: Transcription cache disabled: {e}", file=sys.stderr)
+        return None
+
+@st.cache_resource
+def get_checkpoint_store():
+    """Open the checkpoints of in-progress file transcriptions (None if unavailable)"""
+    try:
+        return CheckpointStore()
+    except OSError as e:
+        print(f"WARNING: Transcription checkpoints disabled: {e}", file=sys.stderr)
+        return None
+
+@st.cache_resource
+def get_job_queue():
+    """Worker pool shared by all sessions for uploaded-file transcription"""
+    return JobQueue(max_workers=FILE_JOB_WORKERS)
+
+@st.cache_resource
+def get_recognizer_pool():
+    """Worker processes shared by all sessions for live decoding (None: decode in this process)"""
+    if not RECOGNIZER_PROCESSES:
+        return None
+    from recognizer_pool import RecognizerPool
+    return RecognizerPool(RECOGNIZER_PROCESSES)
+
 # --- AUDIO DEVICE CHECK ---
 def check_audio_devices():
-    """Check if audio input devices are available"""
+    """Check if audio input devices are available (initializes PortAudio on first use)"""
     try:
+        import sounddevice as sd
         devices = sd.query_devices()
         input_devices = [d for d in devices if d['max_input_channels'] > 0]
         return len(input_devices) > 0, input_devices
@@ -59,212 +149,358 @@ def check_audio_devices():
         return False, str(e)
 
 # --- AUDIO FILE PROCESSING ---
-def process_audio_file(model, audio_file, language):
-    """Process uploaded audio file and return transcription"""
+def process_audio_file(model, audio_file, language, grammar=None, rescorer=None, on_segment=None,
+                       cache=None, model_path=None, on_progress=None, cancel_event=None,
+                       checkpoints=None, gate=None):
+    """
+    Process an uploaded audio file (or the path of one on disk) and return transcription.
+    on_segment, if given, is called with each finalized Vosk result as it is decoded.
+    With a cache and the model's path, audio already decoded with the same model
+    and options is answered from the cache (on_segment still sees every segment).
+    With a checkpoint store, progress is saved after every finalized segment and
+    an interrupted run of the same audio resumes from its last checkpoint.
+    on_progress is called with (seconds decoded, total seconds) after every chunk,
+    and setting cancel_event stops decoding early. A SilenceGate, if given, keeps
+    silent stretches away from the recognizer.
+    """
     try:
         if model is None:
             return None, f"Model for {language} is not available"
         
-        # Read the uploaded file
-        audio_bytes = audio_file.read()
-        
-        if len(audio_bytes) == 0:
-            return None, "Audio file is empty"
+        from wav_reader import WavAudio
         
-        # Create a BytesIO object from the audio bytes
-        audio_io = BytesIO(audio_bytes)
-        
-        # Open the audio file with wave
-        with wave.open(audio_io, 'rb') as wf:
-            # Get file properties
-            channels = wf.getnchannels()
-            sampwidth = wf.getsampwidth()
-            sample_rate = wf.getframerate()
-            frames = wf.getnframes()
-            
-            # Provide detailed file info for debugging
-            print(f"Audio file info: {channels} channels, {sampwidth*8}-bit, {sample_rate}Hz, {frames} frames")
-            
-            # Check file format requirements
-            if channels != 1:
-                return None, f"Audio file must be mono (single channel), found {channels} channels"
-            
-            if sampwidth != 2:
-                return None, f"Audio file must be 16-bit, found {sampwidth*8}-bit"
-            
-            if frames == 0:
-                return None, "Audio file contains no audio frames"
-            
-            # Read all audio data
-            audio_data = wf.readframes(frames)
+        if isinstance(audio_file, (str, os.PathLike)):
+            # Files on local disk are memory-mapped (WAV) or streamed, never read in whole
+            source_name = os.path.basename(audio_file)
+            if os.path.getsize(audio_file) == 0:
+                return None, "Audio file is empty"
+            with open(audio_file, 'rb') as f:
+                header = f.read(12)
+            audio = WavAudio.open(audio_file) if is_wav(header) else CompressedAudio(audio_file)
+        else:
+            # Read the uploaded file
+            source_name = getattr(audio_file, 'name', None)
+            audio_bytes = audio_file.read()
             
-            # Convert to numpy array for processing
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
+            if len(audio_bytes) == 0:
+                return None, "Audio file is empty"
             
-            # Handle sample rate conversion if needed
-            if sample_rate != 16000:
-                print(f"Converting sample rate from {sample_rate}Hz to 16000Hz")
-                # Calculate the number of samples for 16kHz
-                target_samples = int(len(audio_array) * 16000 / sample_rate)
-                # Resample the audio
-                audio_array = scipy.signal.resample(audio_array, target_samples).astype(np.int16)
-                sample_rate = 16000
+            if is_wav(audio_bytes[:12]):
+                # The samples are a view of the uploaded bytes, not a copy
+                audio = WavAudio.from_buffer(audio_bytes)
+            else:
+                # Compressed formats are decoded and resampled block by block while
+                # decoding, so the file is never expanded to PCM in memory
+                audio = CompressedAudio(BytesIO(audio_bytes))
+        
+        # Provide detailed file info for debugging
+        print(f"Audio file info: {audio}")
+        
+        if audio.frames == 0:
+            return None, "Audio file contains no audio frames"
+        
+        # Anything other than 16kHz mono is downmixed and resampled block by block
+        total_samples = audio.total_samples
+        pcm_blocks = audio.blocks
+        
+        # The audio, model and options identify both cache entries and checkpoints
+        key = None
+        if model_path and (cache is not None or checkpoints is not None):
+            key = CacheKey(model_path, decode_options(grammar, rescorer, gate))
+            for block in pcm_blocks():
+                key.update(block)
+        
+        # Look the normalized audio up in the transcription cache
+        if cache is not None and key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                print(f"Transcription cache hit ({len(cached['segments'])} segments)")
+                if on_segment:
+                    for result in cached['segments']:
+                        on_segment(result)
+                if cached['text']:
+                    return cached['text'], "Loaded from the transcription cache"
+                return None, "No speech detected in the audio file"
             
-        # Initialize recognizer with 16kHz sample rate
-        recognizer = vosk.KaldiRecognizer(model, 16000)
-        recognizer.SetWords(True)
+        # Initialize recognizer with 16kHz sample rate (constrained if a grammar is given)
+        recognizer = create_recognizer(model, 16000, grammar)
+        if rescorer:
+            from rescoring import RescoringRecognizer
+            recognizer = RescoringRecognizer(recognizer, rescorer)
         
         transcription_parts = []
+        segments = []
         
-        # Process audio in chunks
-        chunk_size = 4000  # Process 4000 samples at a time
-        total_samples = len(audio_array)
+        # Process audio in chunks sized from the measured decoder throughput,
+        # passing views of the PCM buffer instead of per-chunk copies
+        chunker = AdaptiveChunker()
+        total_seconds = total_samples / 16000
         
-        print(f"Processing {total_samples} samples in chunks of {chunk_size}")
+        # Continue an interrupted run of the same audio from its last reset point
+        checkpoint = None
+        if checkpoints is not None and key is not None:
+            checkpoint = checkpoints.open(key, source_name, total_samples * 2)
+        start_byte = checkpoint.byte_offset if checkpoint else 0
+        resume_seconds = start_byte / 2 / 16000
+        if checkpoint and checkpoint.byte_offset:
+            print(f"Resuming at {resume_seconds:.1f}s with {len(checkpoint.segments)} saved segments")
+            for result in checkpoint.segments:
+                transcription_parts.append(result['text'].strip())
+                segments.append(result)
+                if on_segment:
+                    on_segment(result)
         
-        for i in range(0, total_samples, chunk_size):
-            # Get chunk of audio data
-            chunk = audio_array[i:i + chunk_size]
-            
-            # Convert chunk to bytes
-            chunk_bytes = chunk.tobytes()
-            
-            if recognizer.AcceptWaveform(chunk_bytes):
-                result = json.loads(recognizer.Result())
-                if result.get('text', '').strip():
-                    text = result['text'].strip()
-                    transcription_parts.append(text)
-                    print(f"Partial transcription: {text}")
-        
-        # Get final result
-        final_result = json.loads(recognizer.FinalResult())
-        if final_result.get('text', '').strip():
-            final_text = final_result['text'].strip()
-            transcription_parts.append(final_text)
-            print(f"Final transcription: {final_text}")
+        print(f"Processing {total_samples - start_byte // 2} samples in adaptive chunks")
+        if on_progress:
+            on_progress(resume_seconds, total_seconds)
+        
+        def time_offset(seconds):
+            # The recognizer's clock starts at the resume point and skips gated silence
+            return resume_seconds + (gate.offset_at(seconds) if gate is not None else 0.0)
+        
+        finished = False
+        try:
+            block_start = 0
+            for block in pcm_blocks():
+                block_end = block_start + block.nbytes
+                if block_end <= start_byte:
+                    # Decoded before the checkpoint
+                    block_start = block_end
+                    continue
+                for offset, chunk in chunker.chunks_of(block, max(0, start_byte - block_start)):
+                    offset += block_start
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None, "Cancelled"
+                    # Silent stretches never reach the recognizer when gated
+                    for piece in ([chunk] if gate is None else gate.process(chunk)):
+                        segment = decode_block(recognizer, as_waveform(piece), time_offset, partials=False)
+                        if segment is None:
+                            continue
+                        result = None
+                        if segment.text:
+                            result = segment.result
+                            transcription_parts.append(segment.text)
+                            print(f"Partial transcription: {segment.text}")
+                            segments.append(result)
+                            if on_segment:
+                                on_segment(result)
+                        # The recognizer has just reset: a restart can pick up from here
+                        if checkpoint:
+                            checkpoint.save(offset + len(chunk), result)
+                    if on_progress:
+                        on_progress(min(offset + len(chunk), total_samples * 2) / 2 / 16000, total_seconds)
+                block_start = block_end
             
-            # Combine all parts
-            full_transcription = ' '.join(transcription_parts)
+            print(f"Decoded in {chunker.chunks} chunks (final chunk size {chunker.chunk_samples} samples)")
+            if gate is not None:
+                print(f"Silence gate skipped {gate.skipped_fraction:.0%} of the audio")
             
-            if full_transcription:
-                return full_transcription, "Success"
-            else:
-                return None, "No speech detected in the audio file"
+            # Get final result
+            final = flush_block(recognizer, time_offset)
+            if final.text:
+                transcription_parts.append(final.text)
+                print(f"Final transcription: {final.text}")
+                segments.append(final.result)
+                if on_segment:
+                    on_segment(final.result)
+            finished = True
+        finally:
+            if checkpoint:
+                checkpoints.release(checkpoint, finished)
+        
+        # Combine all parts
+        full_transcription = ' '.join(transcription_parts)
+        
+        if cache is not None and key is not None:
+            cache.put(key, full_transcription, segments, language=language,
+                      audio_seconds=total_seconds)
+        
+        if full_transcription:
+            if start_byte:
+                return full_transcription, f"Resumed from a checkpoint at {format_duration(resume_seconds)}"
+            return full_transcription, "Success"
+        else:
+            return None, "No speech detected in the audio file"
                 
     except wave.Error as e:
         return None, f"Invalid WAV file: {str(e)}"
     except Exception as e:
         return None, f"Error processing audio file: {str(e)}"
 
+def run_file_job(job, model, model_path, grammar, rescorer, store, cache, checkpoints, export_timestamps,
+                 silence_gating=False):
+    """
+    Transcribe one queued upload on a job worker thread, saving each segment
+    to the history (and timestamp exports), checkpointing after every segment
+    and reporting progress on the job.
+    """
+    gate = None
+    if silence_gating:
+        from silence_gate import SilenceGate
+        gate = SilenceGate()
+    exporter = None
+    if export_timestamps:
+        exporter = SegmentExporter(export_base_path("file", job.name), language=job.language)
+        job.export_paths = exporter.paths
+    session_id = uuid.uuid4().hex
+    
+    def save_segment(result):
+        if store:
+            store.append(result['text'].strip(), job.language, f"file:{job.name}",
+                         session_id, *segment_times(result))
+        if exporter:
+            exporter.write_segment(result)
+    
+    try:
+        return process_audio_file(
+            model, job.audio_file, job.language, grammar, rescorer, on_segment=save_segment,
+            cache=cache, model_path=model_path, on_progress=job.update_progress,
+            cancel_event=job.cancel_event, checkpoints=checkpoints, gate=gate
+        )
+    finally:
+        if exporter:
+            exporter.close()
+
 # --- VOSK WORKER THREAD ---
-def vosk_worker(model, language, text_queue_ref, stop_event):
+def close_recognizer(recognizer):
+    """Stop a recognizer's helper threads or release its worker-process session, if it has any"""
+    close = getattr(recognizer, 'close', None)
+    if close:
+        close()
+
+def vosk_worker(model, language, text_queue_ref, stop_event, code_switch_models=None, grammar=None,
+                rescorer=None, exporter=None, gate=None, speaker_model=None, language_switch=None,
+                recognizer_pool=None, model_path=None, endpointing=False, provisional=False):
     """
     Background thread that handles audio capture and speech recognition.
     This runs separately from the Streamlit main thread to prevent UI freezing.
+    When code_switch_models is given, every model decodes the same audio and
+    the most confident hypothesis is kept for each segment. A grammar restricts
+    decoding to the phrases it lists (ignored in code-switching mode), and a
+    rescorer picks each final result from the N-best list using the domain LM.
+    An exporter receives every final result with its word timings as it arrives,
+    and a silence gate keeps silent blocks away from the recognizer. With a
+    speaker model, every final result is labeled with its speaker. A
+    language_switch (HotSwitchRecognizer) replaces the recognizer so the
+    language can be changed without restarting the worker. With a
+    recognizer_pool, model_path is decoded in one of its worker processes
+    (speaker_model is then the speaker model's directory). With endpointing,
+    an utterance is finalized as soon as the speaker pauses (endpointing.py)
+    instead of waiting for Vosk's own endpointer. With provisional, a model
+    without partial results shows a sliding-window decode of the phrase in
+    progress instead (provisional.py).
     """
+    recognizer = None
     try:
-        # Audio configuration
+        # Audio configuration: the default input device is captured at its
+        # native rate and resampled to the 16kHz the models expect
+        from live_capture import NativeRateCapture
         samplerate = 16000
-        blocksize = 8000
         audio_queue = queue.Queue()
-
-        def audio_callback(indata, frames, time, status):
-            """Callback function to capture audio data from microphone"""
-            if status:
-                print(f"Audio status: {status}", file=sys.stderr)
-            # Convert audio data to bytes and add to queue
-            audio_queue.put(bytes(indata))
+        capture = NativeRateCapture(audio_queue)
 
         # Initialize Vosk recognizer
-        recognizer = vosk.KaldiRecognizer(model, samplerate)
-        recognizer.SetWords(True)
+        if language_switch is not None:
+            recognizer = language_switch
+        elif code_switch_models:
+            recognizer = CodeSwitchRecognizer(code_switch_models, samplerate)
+            language = f"Auto ({', '.join(code_switch_models)})"
+        else:
+            if recognizer_pool is not None:
+                recognizer = recognizer_pool.recognizer(model_path, samplerate, grammar)
+            else:
+                recognizer = create_recognizer(model, samplerate, grammar)
+            if rescorer:
+                from rescoring import RescoringRecognizer
+                recognizer = RescoringRecognizer(recognizer, rescorer)
+            if provisional:
+                from provisional import ProvisionalRecognizer
+                if recognizer_pool is not None:
+                    # Preview decoding stays out of this process too
+                    new_recognizer = lambda: recognizer_pool.recognizer(model_path, samplerate, grammar)
+                else:
+                    new_recognizer = lambda: create_recognizer(model, samplerate, grammar)
+                recognizer = ProvisionalRecognizer(recognizer, new_recognizer)
+        if speaker_model and not code_switch_models:
+            from speakers import SpeakerRecognizer
+            recognizer = SpeakerRecognizer(recognizer, speaker_model)
+        if endpointing:
+            # Outermost, so forced results are rescored and labeled like any other
+            from endpointing import PauseEndpointer
+            recognizer = PauseEndpointer(recognizer, samplerate=samplerate)
         
         # Signal that we're starting to listen
         text_queue_ref.put({"type": "status", "text": f"🎙️ Listening with {language} model..."})
         print(f"INFO: [{language}] Vosk Worker started - listening for speech...")
         
         # Start audio input stream
-        with sd.RawInputStream(
-            samplerate=samplerate, 
-            blocksize=blocksize,
-            device=None,  # Use default input device
-            dtype='int16',
-            channels=1, 
-            callback=audio_callback
-        ):
+        with capture.stream():
             
-            # Main recognition loop
-            while not stop_event.is_set():
-                try:
-                    # Get audio data from queue (with timeout to check stop_event regularly)
-                    data = audio_queue.get(timeout=0.1)
-                    
-                    # Process audio data with Vosk
-                    if recognizer.AcceptWaveform(data):
-                        # Final result - complete utterance recognized
-                        result = json.loads(recognizer.Result())
-                        if result.get('text', '').strip():
-                            text_queue_ref.put({
-                                "type": "final", 
-                                "text": result['text'].strip()
-                            })
-                    else:
-                        # Partial result - ongoing recognition
-                        partial_result = json.loads(recognizer.PartialResult())
-                        if partial_result.get('partial', '').strip():
-                            text_queue_ref.put({
-                                "type": "partial", 
-                                "text": partial_result['partial'].strip()
-                            })
-                            
-                except queue.Empty:
-                    # No audio data available, continue loop
-                    continue
-                except Exception as e:
-                    print(f"Error in recognition loop: {e}", file=sys.stderr)
-                    break
+            # Main recognition loop (shared with the command-line tools)
+            recognition_loop(recognizer, audio_queue, text_queue_ref, stop_event,
+                             on_result=exporter.write_segment if exporter else None, gate=gate)
         
         # Cleanup
-        print(f"INFO: [{language}] Vosk Worker stopped gracefully.")
-        text_queue_ref.put({"type": "status", "text": "⏹️ Recording stopped."})
+        close_recognizer(recognizer)
+        if exporter:
+            exporter.close()
+        print(f"INFO: [{language}] Vosk Worker stopped gracefully. {capture.summary()}")
+        text_queue_ref.put({"type": "status", "text": f"⏹️ Recording stopped. {capture.summary()}"})
         
     except Exception as e:
         error_message = f"ERROR: Vosk worker error for {language}: {str(e)}"
         print(error_message, file=sys.stderr)
         text_queue_ref.put({"type": "error", "text": error_message})
+        close_recognizer(recognizer)
 
 # --- Streamlit User Interface ---
 st.set_page_config(layout="wide", page_title="WhisperBoard - Live Demo")
 st.title("🎤 WhisperBoard - Live Speech Recognition")
 st.markdown("**Real-time speech-to-text powered by Vosk** | Built for the Pragna Hackathon")
 
-# Check audio system
-if not st.session_state.audio_initialized:
-    with st.spinner("Checking audio system..."):
-        audio_ok, audio_info = check_audio_devices()
-        st.session_state.audio_initialized = True
-        
-        if not audio_ok:
-            st.error("🎤 **No microphone detected!**")
-            st.error("Please ensure your microphone is connected and try refreshing the page.")
-            st.stop()
-
 # Sidebar controls
 st.sidebar.header("🎛️ Controls")
 
+# Live transcript display limits (segments)
+LIVE_WINDOW_SEGMENTS = 30
+HISTORY_PAGE_SEGMENTS = 50
+
+# Uploaded files transcribed in parallel (across all sessions)
+FILE_JOB_WORKERS = 2
+
+# Worker processes for live decoding (see recognizer_pool.py), so concurrent
+# sessions stop sharing the server's interpreter. Each process loads its own
+# copy of every model it serves, so memory grows with the process count: by
+# default one per core on multi-core machines, at most MAX_DEFAULT_PROCESSES.
+# WHISPERBOARD_RECOGNIZER_PROCESSES overrides it, 0 decodes in the server process
+MAX_DEFAULT_PROCESSES = 4
+RECOGNIZER_PROCESSES = int(os.environ.get("WHISPERBOARD_RECOGNIZER_PROCESSES",
+                                          min(os.cpu_count(), MAX_DEFAULT_PROCESSES)
+                                          if (os.cpu_count() or 1) > 1 else 0))
+
 # Language selection
 MODELS = {
     "English (US)": "model-English",
     "Hindi (हिन्दी)": "model-Hindi",
     "Telugu (తెలుగు)": "model-Telugu"
 }
+# Models that return no partial results (text only appears once a phrase is final)
+MODELS_WITHOUT_PARTIALS = {"Telugu (తెలుగు)"}
 
 language = st.sidebar.selectbox(
     "Select Language", 
     list(MODELS.keys()), 
-    disabled=st.session_state.is_recording,
+    # With hot switching on, the language can change mid-recording
+    disabled=st.session_state.is_recording and st.session_state.language_switch is None,
     help="Choose the language for speech recognition"
 )
+if st.session_state.is_recording and st.session_state.language_switch is not None:
+    if language in st.session_state.language_switch.recognizers:
+        st.session_state.language_switch.switch(language)
+    else:
+        # Only languages whose model loaded when recording started are warm
+        st.sidebar.warning(f"⚠️ {language} is not available in this recording; "
+                           f"still decoding {st.session_state.language_switch.language}")
 
 # Load model for selected language
 model_path = MODELS[language]
@@ -293,29 +529,202 @@ wget https://alphacephei.com/vosk/models/vosk-model-hi-0.22.zip
 unzip vosk-model-hi-0.22.zip
 mv vosk-model-hi-0.22 model-hi
                 """)
-            st.stop()
+            if not st.session_state.is_recording:
+                # Mid-recording the Stop button below must still render
+                st.stop()
         else:
             st.sidebar.success(f"✅ {language} model loaded")
 
+# Code-switching mode decodes with every installed model at once
+code_switching = st.sidebar.checkbox(
+    "🔀 Auto-detect language (code-switching)",
+    disabled=st.session_state.is_recording,
+    help="Decode English, Hindi and Telugu together and keep the most confident result for each phrase"
+)
+code_switch_models = None
+if code_switching:
+    for other_language, other_path in MODELS.items():
+        if other_language not in st.session_state.model_loaded:
+            with st.spinner(f"Loading {other_language} model..."):
+                st.session_state.model_loaded[other_language], _ = load_vosk_model(other_path)
+    code_switch_models = {
+        lang: loaded for lang, loaded in st.session_state.model_loaded.items() if loaded is not None
+    }
+    st.sidebar.caption(f"Decoding with: {', '.join(code_switch_models)}")
+
+# Hot switching keeps a warm recognizer per language so the language can be
+# changed while recording without stopping the microphone
+hot_switching = st.sidebar.checkbox(
+    "⚡ Switch language while recording",
+    disabled=st.session_state.is_recording or code_switching,
+    help="Loads every installed model so the language selector stays usable during a recording; "
+         "the new language applies from the next half-second of audio"
+)
+if hot_switching and not code_switching:
+    for other_language, other_path in MODELS.items():
+        if other_language not in st.session_state.model_loaded:
+            with st.spinner(f"Loading {other_language} model..."):
+                st.session_state.model_loaded[other_language], _ = load_vosk_model(other_path)
+
+# Decoding mode: open vocabulary or constrained to the domain phrases in vocabulary.txt
+decoding_mode = st.sidebar.radio(
+    "Decoding Mode",
+    ["Open vocabulary", "Commands (vocabulary.txt)"],
+    disabled=st.session_state.is_recording,
+    help="Commands mode only recognizes the words and phrases in whisperboard/vocabulary.txt, "
+         "which is faster and more accurate for short commands"
+)
+grammar = None
+if decoding_mode != "Open vocabulary":
+    if code_switching:
+        st.sidebar.warning("⚠️ Commands mode is not available with auto-detect; using open vocabulary")
+    elif not supports_grammar(model_path):
+        st.sidebar.warning(f"⚠️ {model_path} does not support grammars; using open vocabulary")
+    else:
+        try:
+            grammar = load_vocabulary_grammar(model_path)
+        except (OSError, ValueError) as e:
+            st.sidebar.error(f"❌ Could not build grammar: {e}")
+
+# Optional N-best rescoring with the custom domain LM (trained on English technical terms)
+rescorer = None
+if language == "English (US)" and not code_switching and grammar is None:
+    use_rescoring = st.sidebar.checkbox(
+        "🧠 Domain LM rescoring",
+        disabled=st.session_state.is_recording,
+        help="Rescore alternative transcriptions with whisperboard/lm.arpa to improve "
+             "recognition of terms like Vosk, Streamlit and Lomiri"
+    )
+    if use_rescoring:
+        lm_weight = st.sidebar.slider(
+            "LM weight", 0.0, 2.0, 0.5, 0.1,
+            disabled=st.session_state.is_recording,
+            help="Interpolation weight of the domain LM against the acoustic score"
+        )
+        try:
+            from rescoring import NBestRescorer
+            rescorer = NBestRescorer(load_domain_lm(), lm_weight=lm_weight)
+        except (OSError, ValueError) as e:
+            st.sidebar.error(f"❌ Could not load domain LM: {e}")
+
+# Stream word timings of every finalized segment to disk while decoding
+export_timestamps = st.sidebar.checkbox(
+    "💾 Export word timestamps (JSONL/SRT/VTT)",
+    disabled=st.session_state.is_recording,
+    help="Writes each segment to the transcripts/ folder as soon as it is recognized"
+)
+
+# Skip silent audio instead of decoding it (saves CPU and battery on long silences)
+silence_gating = st.sidebar.checkbox(
+    "🔇 Skip silence",
+    disabled=st.session_state.is_recording,
+    help="An energy / zero-crossing gate keeps long silences away from the recognizer; "
+         "short pauses still pass so utterances end normally"
+)
+
+# Finalize phrases after a pause fitted to the speaker's rhythm instead of Vosk's longer default
+fast_endpointing = st.sidebar.checkbox(
+    "⏱️ Fast endpointing",
+    disabled=st.session_state.is_recording,
+    help="Ends each phrase as soon as you pause, with the pause adapted to the gaps between "
+         "your words, so final text (and speaker labels) appear sooner"
+)
+
+# Models without partial results get a preview decoded on a second recognizer
+provisional_text = st.sidebar.checkbox(
+    "🔮 Live preview for Telugu",
+    value=True,
+    disabled=st.session_state.is_recording or code_switching,
+    help="The Telugu model shows no text until a phrase is finished. This decodes the last "
+         "few seconds on a second recognizer (capped at a quarter of a CPU) and shows the "
+         "result until the phrase is final"
+)
+
+# Who said what: speaker embeddings per final segment, clustered online
+# (the speaker model itself is only loaded once a labeled recording starts)
+label_speakers = st.sidebar.checkbox(
+    "🗣️ Label speakers",
+    disabled=st.session_state.is_recording or not os.path.isdir(SPEAKER_MODEL) or code_switching,
+    help="Tags each phrase with Speaker 1, Speaker 2, ... as it is recognized. "
+         f"Needs the Vosk speaker model in {SPEAKER_MODEL}/ (python download_models.py); "
+         "not available with auto-detect"
+)
+
 # Recording button
 model = st.session_state.model_loaded[language]
 button_text = "⏹️ Stop Recording" if st.session_state.is_recording else "🔴 Start Recording"
-button_disabled = model is None
+# Stopping never needs a model (the language may have changed mid-recording)
+button_disabled = model is None and not st.session_state.is_recording
 
 if st.sidebar.button(button_text, disabled=button_disabled):
-    if not st.session_state.is_recording:
+    # The audio system is only checked (and PortAudio initialized) when someone
+    # records, so file uploads work on machines without a microphone
+    if not st.session_state.is_recording and not check_audio_devices()[0]:
+        st.session_state.microphone_missing = True
+    elif not st.session_state.is_recording:
+        st.session_state.microphone_missing = False
         # Start recording
         st.session_state.is_recording = True
         st.session_state.stop_event.clear()
         
         # Clear previous text
-        st.session_state.full_text = ""
-        st.session_state.partial_text = ""
+        st.session_state.transcript.clear()
+        st.session_state.detected_language = None
+        st.session_state.last_speaker = None
+        st.session_state.recording_session_id = uuid.uuid4().hex
+        
+        exporter = None
+        st.session_state.live_export_paths = []
+        if export_timestamps:
+            exporter = SegmentExporter(export_base_path("live", language), language=language)
+            st.session_state.live_export_paths = exporter.paths
+        
+        st.session_state.live_gate = None
+        if silence_gating:
+            from silence_gate import SilenceGate
+            st.session_state.live_gate = SilenceGate()
+        
+        # Code-switching compares its models in this process; other modes can use the pool
+        recognizer_pool = None if code_switching else get_recognizer_pool()
+        
+        st.session_state.language_switch = None
+        if hot_switching and not code_switching:
+            # Warm recognizers; grammar and rescoring apply to the starting language
+            recognizers = {}
+            for lang, loaded in st.session_state.model_loaded.items():
+                if loaded is None:
+                    continue
+                lang_grammar = grammar if lang == language else None
+                if recognizer_pool is not None:
+                    recognizers[lang] = recognizer_pool.recognizer(MODELS[lang], 16000, lang_grammar)
+                else:
+                    recognizers[lang] = create_recognizer(loaded, 16000, lang_grammar)
+                if provisional_text and lang in MODELS_WITHOUT_PARTIALS:
+                    from provisional import ProvisionalRecognizer
+                    if recognizer_pool is not None:
+                        new_recognizer = lambda lang=lang, lang_grammar=lang_grammar: \
+                            recognizer_pool.recognizer(MODELS[lang], 16000, lang_grammar)
+                    else:
+                        new_recognizer = lambda loaded=loaded, lang_grammar=lang_grammar: \
+                            create_recognizer(loaded, 16000, lang_grammar)
+                    recognizers[lang] = ProvisionalRecognizer(recognizers[lang], new_recognizer)
+            if rescorer:
+                from rescoring import RescoringRecognizer
+                recognizers[language] = RescoringRecognizer(recognizers[language], rescorer)
+            st.session_state.language_switch = HotSwitchRecognizer(recognizers, language)
+        
+        speaker_model = None
+        if label_speakers and not code_switching:
+            # Worker processes load the speaker model from its directory themselves
+            speaker_model = SPEAKER_MODEL if recognizer_pool is not None else get_speaker_model()
         
         # Start background worker thread
         worker_thread = threading.Thread(
             target=vosk_worker,
-            args=(model, language, st.session_state.text_queue, st.session_state.stop_event),
+            args=(model, language, st.session_state.text_queue, st.session_state.stop_event,
+                  code_switch_models, grammar, rescorer, exporter, st.session_state.live_gate,
+                  speaker_model, st.session_state.language_switch, recognizer_pool, model_path,
+                  fast_endpointing, provisional_text and language in MODELS_WITHOUT_PARTIALS),
             daemon=True  # Thread will close when main program closes
         )
         st.session_state.vosk_worker_thread = worker_thread
@@ -329,17 +738,25 @@ if st.sidebar.button(button_text, disabled=button_disabled):
         if st.session_state.vosk_worker_thread and st.session_state.vosk_worker_thread.is_alive():
             st.session_state.stop_event.set()
             st.session_state.vosk_worker_thread.join(timeout=2.0)
+        st.session_state.language_switch = None
         
         # Clear partial text
-        st.session_state.partial_text = ""
+        st.session_state.transcript.set_partial("")
     
     # Refresh the page to update UI
     st.rerun()
 
 # Status display
+if st.session_state.microphone_missing:
+    st.sidebar.error("🎤 **No microphone detected!** Please connect one and try again; "
+                     "file uploads still work.")
 if st.session_state.is_recording:
     st.sidebar.info("🎙️ **LIVE** - Speak into your microphone")
     st.sidebar.write("The app is listening and transcribing in real-time!")
+    switch = st.session_state.language_switch
+    if switch is not None and switch.last_switch_seconds is not None:
+        st.sidebar.caption(f"⚡ Switched to {switch.language} in {switch.last_switch_seconds * 1000:.0f} ms, "
+                           f"no audio dropped ({switch.switches} switch(es))")
 elif model:
     st.sidebar.success("✅ Ready to record")
 else:
@@ -352,19 +769,22 @@ with col1:
     st.header("📝 Speech Recognition")
     
     # Create tabs for different input methods
-    tab1, tab2 = st.tabs(["🎙️ Live Recording", "📁 Upload Audio File"])
+    tab1, tab2, tab3 = st.tabs(["🎙️ Live Recording", "📁 Upload Audio File", "🗂️ History"])
     
     with tab1:
         st.subheader("Real-time Microphone Input")
     
-        # Combine full text and partial text for display
-        display_text = st.session_state.full_text
-        if st.session_state.partial_text:
-            # Add partial text with visual indicator
-            display_text += (" " if display_text else "") + st.session_state.partial_text + " ●"
-        elif st.session_state.is_recording and language == "Telugu (తెలుగు)" and not st.session_state.full_text:
-            # Special message for Telugu model (no partial results)
-            display_text = "🎙️ తెలుగు లో మాట్లాడండి... (Speak in Telugu - results appear after complete phrases) ●"
+        transcript = st.session_state.transcript
+        
+        # Only the most recent segments plus the partial result are rendered live,
+        # so every rerun costs the same however long the session gets
+        display_text = transcript.window_text(LIVE_WINDOW_SEGMENTS, partial_marker=" ●")
+        if not display_text and st.session_state.is_recording and language == "Telugu (తెలుగు)":
+            # Special message for Telugu model (no partial results of its own)
+            if provisional_text:
+                display_text = "🎙️ తెలుగు లో మాట్లాడండి... (Speak in Telugu - a preview appears as you speak) ●"
+            else:
+                display_text = "🎙️ తెలుగు లో మాట్లాడండి... (Speak in Telugu - results appear after complete phrases) ●"
         
         # Display transcription in real-time
         transcription_placeholder = st.text_area(
@@ -375,37 +795,52 @@ with col1:
             help="Live transcription will appear here as you speak"
         )
         
+        # Older segments are browsable one page at a time
+        if len(transcript) > LIVE_WINDOW_SEGMENTS:
+            st.caption(f"Showing the last {LIVE_WINDOW_SEGMENTS} of {len(transcript)} segments")
+            with st.expander("📜 Earlier transcript"):
+                page_count = transcript.page_count(HISTORY_PAGE_SEGMENTS)
+                page = st.number_input("Page", min_value=1, max_value=page_count, value=page_count)
+                for segment in transcript.page(page - 1, HISTORY_PAGE_SEGMENTS):
+                    st.write(segment.get('label', '') + segment['text'])
+        
+        if st.session_state.live_export_paths:
+            st.caption("💾 Streaming to: " + ", ".join(st.session_state.live_export_paths))
+        
         # Control buttons for live recording
         col_clear, col_copy = st.columns(2)
         with col_clear:
             if st.button("🗑️ Clear Live Text", disabled=st.session_state.is_recording):
-                st.session_state.full_text = ""
-                st.session_state.partial_text = ""
+                transcript.clear()
                 st.rerun()
         
         with col_copy:
-            if st.session_state.full_text:
+            # The full text is only joined once recording stops
+            if transcript and not st.session_state.is_recording:
                 st.download_button(
                     label="📋 Download Live Text",
-                    data=st.session_state.full_text,
+                    data=transcript.text(),
                     file_name=f"live_transcription_{language.lower().replace(' ', '_')}.txt",
                     mime="text/plain"
                 )
     
     with tab2:
-        st.subheader("Upload Audio File")
-        
-        # File upload
-        uploaded_file = st.file_uploader(
-            "Choose a WAV audio file",
-            type=['wav'],
-            help="Upload a WAV file (16kHz, 16-bit, mono) for transcription",
-            disabled=st.session_state.is_recording or st.session_state.processing_file
+        st.subheader("Upload Audio Files")
+        
+        # File upload (a new uploader key empties it once its files are queued)
+        uploaded_files = st.file_uploader(
+            "Choose audio files",
+            type=supported_types(),
+            accept_multiple_files=True,
+            key=f"uploader_{st.session_state.uploader_key}",
+            help="Upload one or more 16-bit PCM WAV files or FLAC, Ogg/Opus or MP3 files "
+                 "(any rate, decoded while transcribing) for transcription"
         )
         
-        if uploaded_file is not None:
+        if uploaded_files:
             # Display file info
-            st.info(f"📁 **File:** {uploaded_file.name} ({uploaded_file.size} bytes)")
+            st.info(f"📁 **{len(uploaded_files)} file(s):** " +
+                    ", ".join(f"{f.name} ({f.size} bytes)" for f in uploaded_files))
             
             # Show model status
             current_model = st.session_state.model_loaded.get(language)
@@ -414,61 +849,117 @@ with col1:
             else:
                 st.warning(f"⚠️ **Model Status:** {language} model is not loaded")
             
-            # Process button
-            if st.button("🔄 Process Audio File", disabled=st.session_state.is_recording or st.session_state.processing_file):
-                # Get the current model for the selected language
-                current_model = st.session_state.model_loaded.get(language)
+            # Queue button
+            if st.button("🔄 Process Audio Files", disabled=current_model is None):
+                # Jobs run on the shared worker pool; this session stays free to record
+                job_queue = get_job_queue()
+                store = get_transcript_store()
+                cache = get_transcription_cache()
+                checkpoints = get_checkpoint_store()
+                for uploaded_file in uploaded_files:
+                    audio = BytesIO(uploaded_file.getvalue())
+                    audio.name = uploaded_file.name
+                    job = FileJob(uploaded_file.name, language, audio)
+                    job_queue.submit(job, lambda job: run_file_job(
+                        job, current_model, model_path, grammar, rescorer, store, cache, checkpoints,
+                        export_timestamps, silence_gating
+                    ))
+                    st.session_state.file_jobs.append(job)
+                st.session_state.uploader_key += 1
+                st.rerun()
+        
+        # Transcriptions cut short by a restart continue when the same file is processed again
+        checkpoints = get_checkpoint_store()
+        interrupted = checkpoints.interrupted() if checkpoints else []
+        if interrupted:
+            st.warning("⏸️ **Interrupted transcriptions** (upload the same file with the same settings to resume): " +
+                       ", ".join(f"{name} ({done:.0%})" for name, done in interrupted))
+        
+        # Job list, newest first
+        for job in reversed(st.session_state.file_jobs):
+            with st.container(border=True):
+                st.markdown(f"**📄 {job.name}** · {job.language}")
                 
-                if current_model is None:
-                    st.error(f"❌ {language} model is not loaded. Please wait for the model to load or check if the model directory exists.")
+                if job.status == QUEUED:
+                    st.caption("⏳ Queued")
+                elif job.status == RUNNING:
+                    progress_text = "Reading audio..."
+                    if job.total_seconds:
+                        progress_text = (f"{format_duration(job.processed_seconds)} / "
+                                         f"{format_duration(job.total_seconds)} of audio")
+                        if job.eta_seconds is not None:
+                            progress_text += f" · about {format_duration(job.eta_seconds)} left"
+                    st.progress(job.progress, text=progress_text)
+                elif job.status == DONE:
+                    st.success(f"✅ Transcribed in {format_duration(job.finished_at - job.started_at)}")
+                    if job.message != "Success":
+                        st.info(f"⚡ {job.message}")
+                    st.text_area(
+                        "File Transcription Result",
+                        value=job.text,
+                        height=200,
+                        disabled=True,
+                        key=f"job_text_{job.id}",
+                        help="Transcription from your uploaded audio file"
+                    )
+                    if job.export_paths:
+                        st.caption("💾 Timestamps written to: " + ", ".join(job.export_paths))
+                elif job.status == FAILED:
+                    st.error(f"❌ {job.message}")
                 else:
-                    st.session_state.processing_file = True
-                    
-                    with st.spinner(f"🤖 Processing audio file with {language} model..."):
-                        try:
-                            # Reset the file pointer
-                            uploaded_file.seek(0)
-                            
-                            # Process the audio file
-                            transcription, message = process_audio_file(current_model, uploaded_file, language)
-                            
-                            if transcription:
-                                st.session_state.uploaded_file_text = transcription
-                                st.success("✅ Audio file processed successfully!")
-                            else:
-                                st.error(f"❌ {message}")
-                        except Exception as e:
-                            st.error(f"❌ Error processing file: {str(e)}")
-                    
-                    st.session_state.processing_file = False
-                    st.rerun()
-        
-        # Display transcription from uploaded file
-        if st.session_state.uploaded_file_text:
-            st.text_area(
-                "File Transcription Result",
-                value=st.session_state.uploaded_file_text,
-                height=300,
-                disabled=True,
-                help="Transcription from your uploaded audio file"
+                    st.warning("⏹️ Cancelled")
+                
+                # Control buttons for this job
+                col_action, col_download = st.columns(2)
+                with col_action:
+                    if job.active:
+                        if st.button("⏹️ Cancel", key=f"cancel_job_{job.id}"):
+                            job.cancel()
+                            st.rerun()
+                    elif st.button("🗑️ Remove", key=f"remove_job_{job.id}"):
+                        st.session_state.file_jobs.remove(job)
+                        st.rerun()
+                
+                with col_download:
+                    if job.status == DONE:
+                        st.download_button(
+                            label="📋 Download File Text",
+                            data=job.text,
+                            file_name=f"{os.path.splitext(job.name)[0]}_transcription.txt",
+                            mime="text/plain",
+                            key=f"download_job_{job.id}"
+                        )
+        
+        if not st.session_state.file_jobs and not uploaded_files:
+            st.info("📤 Upload audio files above to get started with file transcription.")
+    
+    with tab3:
+        st.subheader("Transcript History")
+        
+        store = get_transcript_store()
+        if store is None:
+            st.warning("⚠️ Transcript history is unavailable (SQLite FTS5 support is required)")
+        else:
+            query = st.text_input(
+                "Search transcripts",
+                placeholder="e.g. streamlit, नमस्ते, stream*",
+                help="All words must match; end a word with * to search by prefix"
             )
+            history_language = st.selectbox("Language", ["All"] + list(MODELS.keys()))
             
-            # Control buttons for file transcription
-            col_clear_file, col_copy_file = st.columns(2)
-            with col_clear_file:
-                if st.button("🗑️ Clear File Text", disabled=st.session_state.processing_file):
-                    st.session_state.uploaded_file_text = ""
-                    st.rerun()
+            language_filter = None if history_language == "All" else history_language
+            if query:
+                segments = store.search(query, language=language_filter)
+                st.caption(f"{len(segments)} matching segment(s) out of {store.count()}")
+            else:
+                segments = store.recent(limit=20, language=language_filter)
+                st.caption(f"Most recent segments ({store.count()} stored)")
             
-            with col_copy_file:
-                st.download_button(
-                    label="📋 Download File Text",
-                    data=st.session_state.uploaded_file_text,
-                    file_name=f"file_transcription_{language.lower().replace(' ', '_')}.txt",
-                    mime="text/plain"
-                )
-        else:
-            st.info("📤 Upload a WAV audio file above to get started with file transcription.")
+            for seg in segments:
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(seg['created_at']))
+                source = "🎙️ Live" if seg['source'] == "live" else f"📁 {seg['source'].split(':', 1)[-1]}"
+                st.markdown(f"**{when}** · {seg['language']} · {source}")
+                st.write(seg.get('snippet') or seg['text'])
 
 with col2:
     st.header("ℹ️ Status")
@@ -477,7 +968,14 @@ with col2:
     st.subheader("Configuration")
     st.write(f"**Language:** {language}")
     st.write(f"**Model:** {model_path}")
+    st.write(f"**Decoding:** {'Commands (constrained)' if grammar else 'Open vocabulary'}")
+    if rescorer:
+        st.write(f"**Rescoring:** domain LM (weight {rescorer.lm_weight:.1f})")
     st.write(f"**Status:** {'🔴 Recording' if st.session_state.is_recording else '⏸️ Idle'}")
+    if code_switching and st.session_state.detected_language:
+        st.write(f"**Detected Language:** {st.session_state.detected_language}")
+    if st.session_state.live_gate:
+        st.write(f"**Silence skipped:** {st.session_state.live_gate.skipped_fraction:.0%}")
     
     # Instructions
     st.subheader("How to Use")
@@ -492,13 +990,17 @@ with col2:
     st.write("**📁 File Upload:**")
     st.write("1. Select your language")
     st.write("2. Go to 'Upload Audio File' tab")
-    st.write("3. Upload a WAV file (16kHz, mono)")
-    st.write("4. Click 'Process Audio File'")
-    st.write("5. View transcription results")
+    st.write("3. Upload one or more audio files (WAV, FLAC, Ogg/Opus, MP3)")
+    st.write("4. Click 'Process Audio Files'")
+    st.write("5. Follow progress and view results (you can keep recording meanwhile)")
     
     # Special note for Telugu
     if language == "Telugu (తెలుగు)":
-        st.info("📝 **Telugu Note**: Text appears after complete phrases (no live preview while speaking)")
+        if provisional_text:
+            st.info("📝 **Telugu Note**: The model has no live results of its own; the preview while "
+                    "speaking is a quick re-decode of the last few seconds, replaced by the final text")
+        else:
+            st.info("📝 **Telugu Note**: Text appears after complete phrases (no live preview while speaking)")
     
     # Tips
     st.subheader("💡 Tips")
@@ -510,21 +1012,20 @@ with col2:
     st.write("• Stay close to the microphone")
     
     st.write("**📁 File Upload:**")
-    st.write("• Use WAV format only")
-    st.write("• 16kHz sample rate required")
-    st.write("• 16-bit depth, mono channel")
+    st.write("• FLAC or Opus uploads much faster than WAV")
+    st.write("• WAV files: 16-bit PCM (any rate, mono or stereo)")
     st.write("• Clear audio for best results")
     
     # Language-specific tips
     if language == "Telugu (తెలుగు)":
         st.write("• **Telugu**: Speak complete words/phrases")
         st.write("• **Telugu**: Pause briefly between sentences")
-        st.write("• **Telugu**: Results appear after you finish speaking")
+        if not provisional_text:
+            st.write("• **Telugu**: Results appear after you finish speaking")
     
-    # Word count
-    if st.session_state.full_text:
-        word_count = len(st.session_state.full_text.split())
-        st.metric("Words Transcribed", word_count)
+    # Word count (kept incrementally by the transcript buffer)
+    if st.session_state.transcript:
+        st.metric("Words Transcribed", st.session_state.transcript.word_count)
 
 # Process messages from background thread
 message_processed = False
@@ -535,15 +1036,28 @@ while not st.session_state.text_queue.empty():
         
         if result["type"] == "partial":
             # Update partial text (ongoing recognition)
-            st.session_state.partial_text = result["text"]
+            st.session_state.transcript.set_partial(result["text"])
             
         elif result["type"] == "final":
-            # Add final text (completed utterance)
-            if st.session_state.full_text:
-                st.session_state.full_text += " " + result["text"]
-            else:
-                st.session_state.full_text = result["text"]
-            st.session_state.partial_text = ""
+            # Add final text (completed utterance) as a new segment, labeled
+            # whenever the speaker changes
+            label = ""
+            if result.get("speaker") is not None and result["speaker"] != st.session_state.last_speaker:
+                from speakers import speaker_label
+                label = f"[{speaker_label(result['speaker'])}] "
+                st.session_state.last_speaker = result["speaker"]
+            st.session_state.transcript.add_final(
+                result["text"], start=result.get("start"), end=result.get("end"),
+                language=result.get("language", language), speaker=result.get("speaker"), label=label
+            )
+            if "language" in result:
+                st.session_state.detected_language = result["language"]
+            
+            # Keep a durable copy in the transcript history
+            store = get_transcript_store()
+            if store:
+                store.append(result["text"], result.get("language", language), "live",
+                             st.session_state.recording_session_id, result.get("start"), result.get("end"))
             
         elif result["type"] == "error":
             # Display error
@@ -557,10 +1071,14 @@ while not st.session_state.text_queue.empty():
     except queue.Empty:
         break
 
-# Auto-refresh while recording to show live updates
+# Auto-refresh while recording to show live updates, and more slowly
+# while file jobs are running to update their progress
 if st.session_state.is_recording or message_processed:
     time.sleep(0.1)  # Small delay to prevent excessive refreshing
     st.rerun()
+elif any(job.active for job in st.session_state.file_jobs):
+    time.sleep(0.5)
+    st.rerun()
 
 # Footer
 st.markdown("---")
@@ -570,7 +1088,7 @@ st.markdown("""
 This is a **comprehensive demonstration** of WhisperBoard's speech recognition capabilities:
 
 - **🎙️ Real-time Processing:** Your speech is transcribed as you speak
-- **📁 File Processing:** Upload WAV files for batch transcription
+- **📁 File Processing:** Upload WAV, FLAC, Ogg/Opus or MP3 files for batch transcription
 - **🔒 100% Private:** All processing happens locally on your device
 - **🌐 Multi-language:** Supports English, Hindi, and Telugu recognition
 - **⚡ Fast & Accurate:** Powered by the Vosk speech recognition toolkit
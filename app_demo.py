@@ -1,83 +1,125 @@
 import streamlit as st
-import vosk
-import json
-import time
+import glob
 import os
+import queue
+import threading
+import time
+
+from transcript_buffer import TranscriptBuffer
 
-# --- Demo Text Samples ---
-DEMO_TEXTS = {
-    "English (US)": [
-        "Hello world, this is a test of the WhisperBoard speech recognition system.",
-        "The quick brown fox jumps over the lazy dog.",
-        "This application uses Vosk for offline speech recognition.",
-        "Privacy is important, so all processing happens on your device.",
-        "Welcome to the future of speech-to-text technology."
-    ],
-    "Hindi (हिन्दी)": [
-        "नमस्ते दुनिया, यह व्हिस्परबोर्ड का परीक्षण है।",
-        "यह एक ऑफलाइन भाषा पहचान प्रणाली है।",
-        "गोपनीयता हमारी प्राथमिकता है।",
-        "सभी प्रसंस्करण आपके डिवाइस पर होता है।",
-        "भविष्य की तकनीक का स्वागत है।"
-    ]
+# --- Demo Recordings ---
+# Short spoken sentences (16kHz 16-bit WAV, synthesized with espeak-ng) replayed
+# through the real recognizer as if they were being spoken into a microphone.
+# A recording's reference transcript, written the way Vosk outputs text, sits
+# next to it as a .txt file and is used to report the word error rate.
+DEMO_AUDIO = {
+    "English (US)": ["demo_audio/english/*.wav"],
+    "Hindi (हिन्दी)": ["demo_audio/hindi/*.wav"]
 }
 
 # --- Application State Management ---
 if 'is_demo_running' not in st.session_state:
     st.session_state.is_demo_running = False
-if 'demo_text' not in st.session_state:
-    st.session_state.demo_text = ""
 if 'demo_index' not in st.session_state:
     st.session_state.demo_index = 0
-if 'models_loaded' not in st.session_state:
-    st.session_state.models_loaded = {}
+if 'demo_results' not in st.session_state:
+    # Per finished recording: real-time factor, latency and word error rate
+    st.session_state.demo_results = {}
+if 'demo_stats' not in st.session_state:
+    st.session_state.demo_stats = None
+if 'transcript' not in st.session_state:
+    st.session_state.transcript = TranscriptBuffer()
+if 'demo_queue' not in st.session_state:
+    st.session_state.demo_queue = queue.Queue()
+if 'demo_stop' not in st.session_state:
+    st.session_state.demo_stop = threading.Event()
+if 'demo_thread' not in st.session_state:
+    st.session_state.demo_thread = None
 
-def load_vosk_model(model_path, language):
-    """Load and validate Vosk model"""
+@st.cache_resource
+def load_vosk_model(model_path):
+    """Load and cache Vosk model"""
     try:
         if not os.path.exists(model_path):
-            return False, f"Model path not found: {model_path}"
-        
+            return None, f"Model path not found: {model_path}"
+
+        import vosk
         model = vosk.Model(model_path)
-        st.session_state.models_loaded[language] = True
-        return True, f"✅ {language} model loaded successfully"
+        return model, "Model loaded successfully"
     except Exception as e:
-        st.session_state.models_loaded[language] = False
-        return False, f"❌ Error loading {language} model: {str(e)}"
-
-def simulate_speech_recognition(text, language):
-    """Simulate real-time speech recognition by revealing text word by word"""
-    words = text.split()
-    partial_text = ""
-    
-    placeholder = st.empty()
-    
-    for i, word in enumerate(words):
-        if not st.session_state.is_demo_running:
-            break
-            
-        partial_text += word + " "
-        
-        # Show partial result
-        with placeholder.container():
-            st.text_area(
-                "Real-time Transcription", 
-                value=partial_text.strip() + "_", 
-                height=200, 
-                key=f"demo_partial_{i}"
-            )
-        
-        time.sleep(0.3)  # Simulate typing speed
-    
-    # Final result
-    if st.session_state.is_demo_running:
-        with placeholder.container():
-            st.text_area(
-                "Real-time Transcription", 
-                value=partial_text.strip(), 
-                height=200, 
-                key="demo_final"
-            )
+        return None, f"Error loading model: {str(e)}"
+
+def demo_recordings(language):
+    """The WAV fixtures bundled for a language, in playing order"""
+    recordings = []
+    for pattern in DEMO_AUDIO[language]:
+        recordings.extend(sorted(glob.glob(pattern)))
+    return recordings
+
+def reference_text(path):
+    """Reference transcript of a recording, None without one"""
+    reference = os.path.splitext(path)[0] + ".txt"
+    if not os.path.exists(reference):
+        return None
+    with open(reference, encoding="utf-8") as f:
+        return f.read().strip()
+
+def demo_worker(model, recordings, text_queue_ref, stop_event):
+    """
+    Background thread that replays the recordings through a real recognizer
+    at real-time pace: each block is decoded when a microphone would have
+    delivered it. Latency is the time from then until the block's text is
+    ready, so it includes any backlog if decoding falls behind.
+    """
+    import numpy as np
+
+    from audio_feed import pcm_view
+    from grammar import create_recognizer
+    from recognition import word_error_rate
+    from transcriber import SAMPLE_RATE, Transcriber, file_source
+
+    try:
+        for index, path in enumerate(recordings):
+            text_queue_ref.put({"type": "sample", "index": index})
+            transcriber = Transcriber(create_recognizer(model))
+            latencies, finals = [], []
+            started = time.perf_counter()
+            for block in file_source(path):
+                # The block is "spoken" once the audio before its end has played
+                arrival = started + transcriber.audio_seconds + len(pcm_view(block)) / 2 / SAMPLE_RATE
+                if stop_event.wait(max(0.0, arrival - time.perf_counter())):
+                    break
+                segments = transcriber.decode(block)
+                latencies.append(time.perf_counter() - arrival)
+                for segment in segments:
+                    text_queue_ref.put(segment.message())
+                    if segment.final:
+                        finals.append(segment.text)
+                text_queue_ref.put({
+                    "type": "stats", "index": index, "audio_seconds": transcriber.audio_seconds,
+                    "rtf": transcriber.real_time_factor,
+                    "latency_p50": float(np.percentile(latencies, 50)),
+                    "latency_p95": float(np.percentile(latencies, 95))
+                })
+            for segment in transcriber.finish():
+                text_queue_ref.put(segment.message())
+                finals.append(segment.text)
+            if stop_event.is_set():
+                return
+            reference = reference_text(path)
+            text_queue_ref.put({
+                "type": "sample_done", "index": index,
+                "wer": word_error_rate(reference, ' '.join(finals)) if reference else None
+            })
+        text_queue_ref.put({"type": "done"})
+    except Exception as e:
+        text_queue_ref.put({"type": "error", "text": f"Demo worker error: {str(e)}"})
+
+def stop_demo():
+    st.session_state.is_demo_running = False
+    st.session_state.demo_stop.set()
+    if st.session_state.demo_thread and st.session_state.demo_thread.is_alive():
+        st.session_state.demo_thread.join(timeout=2.0)
 
 # --- Streamlit User Interface ---
 st.set_page_config(layout="wide", page_title="WhisperBoard Demo")
@@ -87,7 +129,7 @@ st.title("🎤 WhisperBoard - Demo Mode")
 st.markdown("A privacy-focused, multi-language speech recognition app powered by **Vosk**. Built for the Pragna Hackathon.")
 
 # Info banner about demo mode
-st.info("🖥️ **Demo Mode Active**: Since this is running in a cloud environment without microphone access, this demo simulates the real-time speech recognition functionality using pre-defined text samples.")
+st.info("🖥️ **Demo Mode Active**: Since this is running in a cloud environment without microphone access, this demo plays bundled recordings through the real recognizer at real-time pace, as if they were spoken into a microphone. The speed and latency shown are measured on this server.")
 
 # Sidebar Controls
 st.sidebar.header("🎛️ Controls")
@@ -98,41 +140,72 @@ MODELS = {
 }
 
 language = st.sidebar.selectbox(
-    "Select Language", 
-    list(MODELS.keys()), 
+    "Select Language",
+    list(MODELS.keys()),
     disabled=st.session_state.is_demo_running
 )
 
 # Model Status Section
 st.sidebar.subheader("📊 Model Status")
 model_path = MODELS[language]
+recordings = demo_recordings(language)
 
-if language not in st.session_state.models_loaded:
-    with st.spinner(f"Loading {language} model..."):
-        success, message = load_vosk_model(model_path, language)
-        st.sidebar.write(message)
+with st.spinner(f"Loading {language} model..."):
+    model, message = load_vosk_model(model_path)
+if model is not None:
+    st.sidebar.success(f"✅ {language} model ready")
 else:
-    if st.session_state.models_loaded.get(language, False):
-        st.sidebar.success(f"✅ {language} model ready")
-    else:
-        st.sidebar.error(f"❌ {language} model failed to load")
+    st.sidebar.error(f"❌ {message}")
+
+# Messages from the demo worker, applied before anything is drawn
+while True:
+    try:
+        result = st.session_state.demo_queue.get_nowait()
+    except queue.Empty:
+        break
+    if result["type"] == "partial":
+        st.session_state.transcript.set_partial(result["text"])
+    elif result["type"] == "final":
+        st.session_state.transcript.add_final(result["text"], start=result.get("start"), end=result.get("end"))
+    elif result["type"] == "sample":
+        st.session_state.demo_index = result["index"]
+    elif result["type"] == "stats":
+        st.session_state.demo_stats = result
+    elif result["type"] == "sample_done":
+        st.session_state.demo_results[result["index"]] = dict(st.session_state.demo_stats or {}, wer=result["wer"])
+    elif result["type"] == "done":
+        st.session_state.is_demo_running = False
+        st.session_state.demo_index = len(recordings)
+    elif result["type"] == "error":
+        st.error(f"🚨 **Recognition Error:** {result['text']}")
+        st.session_state.is_demo_running = False
 
 # Demo Controls
 if st.sidebar.button("🎤 Start Demo" if not st.session_state.is_demo_running else "⏹️ Stop Demo"):
     if not st.session_state.is_demo_running:
-        if st.session_state.models_loaded.get(language, False):
+        if model is None:
+            st.sidebar.error("Cannot start demo: Model not loaded")
+        elif not recordings:
+            st.sidebar.error("Cannot start demo: no recordings bundled for this language")
+        else:
             st.session_state.is_demo_running = True
             st.session_state.demo_index = 0
-            st.rerun()
-        else:
-            st.sidebar.error("Cannot start demo: Model not loaded")
+            st.session_state.demo_results = {}
+            st.session_state.demo_stats = None
+            st.session_state.transcript.clear()
+            st.session_state.demo_queue = queue.Queue()
+            st.session_state.demo_stop = threading.Event()
+            st.session_state.demo_thread = threading.Thread(
+                target=demo_worker,
+                args=(model, recordings, st.session_state.demo_queue, st.session_state.demo_stop),
+                daemon=True
+            )
+            st.session_state.demo_thread.start()
     else:
-        st.session_state.is_demo_running = False
-        st.session_state.demo_text = ""
-        st.rerun()
+        stop_demo()
 
 if st.session_state.is_demo_running:
-    st.sidebar.info("🎙️ Demo running... Simulating speech recognition.")
+    st.sidebar.info("🎙️ Demo running... Playing recordings through the recognizer.")
 else:
     st.sidebar.success("✅ Ready to start demo.")
 
@@ -141,54 +214,58 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     st.header("📝 Transcription Output")
-    
-    if st.session_state.is_demo_running:
-        demo_texts = DEMO_TEXTS[language]
-        if st.session_state.demo_index < len(demo_texts):
-            current_text = demo_texts[st.session_state.demo_index]
-            
-            st.subheader(f"Sample {st.session_state.demo_index + 1} of {len(demo_texts)}")
-            st.write(f"**Original text**: {current_text}")
-            
-            # Simulate real-time recognition
-            simulate_speech_recognition(current_text, language)
-            
-            # Move to next sample
-            st.session_state.demo_index += 1
-            if st.session_state.demo_index >= len(demo_texts):
-                st.session_state.is_demo_running = False
-                st.success("🎉 Demo completed! All samples processed.")
-            
-            time.sleep(1)
-            st.rerun()
-        else:
-            st.session_state.is_demo_running = False
+
+    index = st.session_state.demo_index
+    if st.session_state.is_demo_running and index < len(recordings):
+        st.subheader(f"Sample {index + 1} of {len(recordings)}: {os.path.basename(recordings[index])}")
+        reference = reference_text(recordings[index])
+        if reference:
+            st.write(f"**Original text**: {reference}")
+    elif recordings and index >= len(recordings):
+        st.success("🎉 Demo completed! All samples processed.")
+
+    # One text area for the whole demo: its contents change, the widget does not
+    transcript = st.session_state.transcript
+    if transcript or transcript.partial:
+        st.session_state.demo_transcript = transcript.window_text(20, partial_marker="_")
     else:
-        st.text_area(
-            "Real-time Transcription", 
-            value="Click 'Start Demo' to see simulated speech recognition...", 
-            height=200,
-            disabled=True
-        )
+        st.session_state.demo_transcript = "Click 'Start Demo' to hear the bundled recordings recognized in real time..."
+    st.text_area("Real-time Transcription", height=200, disabled=True, key="demo_transcript")
+
+    # Live performance of the recognizer on this server
+    stats = st.session_state.demo_stats
+    rtf_col, latency_col, audio_col = st.columns(3)
+    rtf_col.metric("Real-time factor", f"{stats['rtf']:.3f}" if stats else "—",
+                   help="Decoding time divided by audio time (below 1 keeps up with speech)")
+    latency_col.metric("Latency p50 / p95", f"{stats['latency_p50'] * 1000:.0f} / {stats['latency_p95'] * 1000:.0f} ms"
+                       if stats else "—",
+                       help="From the end of each 0.5 s block of audio to its text being ready")
+    audio_col.metric("Audio played", f"{stats['audio_seconds']:.1f} s" if stats else "—")
 
 with col2:
     st.header("📋 Demo Information")
-    
+
     # Show available samples
     st.subheader("Available Samples")
-    demo_texts = DEMO_TEXTS[language]
-    for i, text in enumerate(demo_texts):
-        status = "✅" if not st.session_state.is_demo_running or st.session_state.demo_index > i else "⏳" if st.session_state.demo_index == i else "⏸️"
-        st.write(f"{status} **Sample {i+1}**: {text[:50]}...")
-    
+    if not recordings:
+        st.write(f"No recordings found ({', '.join(DEMO_AUDIO[language])})")
+    for i, path in enumerate(recordings):
+        result = st.session_state.demo_results.get(i)
+        if result:
+            wer = f", WER {result['wer']:.0%}" if result.get("wer") is not None else ""
+            st.write(f"✅ **Sample {i+1}**: {os.path.basename(path)} (RTF {result['rtf']:.3f}{wer})")
+        else:
+            status = "⏳" if st.session_state.is_demo_running and st.session_state.demo_index == i else "⏸️"
+            st.write(f"{status} **Sample {i+1}**: {os.path.basename(path)}")
+
     # Technical Details
     st.subheader("🔧 Technical Details")
     st.write(f"**Selected Model**: {model_path}")
     st.write(f"**Language**: {language}")
     st.write(f"**Status**: {'Running' if st.session_state.is_demo_running else 'Idle'}")
-    
+
     # Model Information
-    if st.session_state.models_loaded.get(language, False):
+    if model is not None:
         st.write("**Model Features**:")
         st.write("- ✅ Offline processing")
         st.write("- ✅ Real-time recognition")
@@ -200,15 +277,20 @@ st.markdown("---")
 st.markdown("""
 ### 🎯 About WhisperBoard
 
-This demo showcases the core functionality of WhisperBoard, a speech-to-text keyboard application designed for Lomiri (Ubuntu Touch) OS. 
+This demo showcases the core functionality of WhisperBoard, a speech-to-text keyboard application designed for Lomiri (Ubuntu Touch) OS.
 
 **Key Features Demonstrated:**
 - ✅ **Multi-language Support**: Switch between English and Hindi models
-- ✅ **Real-time Processing**: Simulated word-by-word transcription
+- ✅ **Real-time Processing**: Recordings decoded block by block at speaking pace, with live speed and latency
 - ✅ **Offline Operation**: All processing happens locally using Vosk
 - ✅ **Privacy-First**: No data sent to external servers
 
 **Note**: In the actual application running on a device with microphone access, users would speak directly and see their speech converted to text in real-time.
 """)
 
-st.write("Built with ❤️ by **Gade Joseph Preetham Reddy** | [GitHub Repository](https://github.com/preetham-22/WhisperBoard)")
\ No newline at end of file
+st.write("Built with ❤️ by **Gade Joseph Preetham Reddy** | [GitHub Repository](https://github.com/preetham-22/WhisperBoard)")
+
+# Refresh while the demo runs to show live updates
+if st.session_state.is_demo_running:
+    time.sleep(0.25)
+    st.rerun()
@@ -1,13 +1,16 @@
 import streamlit as st
-import vosk
-import sounddevice as sd
 import queue
-import json
 import threading
 import sys
 import time
 import os
 
+# As in app.py, vosk, sounddevice (PortAudio) and numpy are imported where a
+# feature first needs them, so the page renders before they load
+from grammar import create_recognizer
+from recognition import recognition_loop
+from transcript_buffer import TranscriptBuffer
+
 # --- Application State Management ---
 if 'vosk_worker_thread' not in st.session_state:
     st.session_state.vosk_worker_thread = None
@@ -15,10 +18,8 @@ if 'text_queue' not in st.session_state:
     st.session_state.text_queue = queue.Queue()
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
-if 'full_text' not in st.session_state:
-    st.session_state.full_text = ""
-if 'partial_text' not in st.session_state:
-    st.session_state.partial_text = ""
+if 'transcript' not in st.session_state:
+    st.session_state.transcript = TranscriptBuffer()
 if 'stop_event' not in st.session_state:
     st.session_state.stop_event = threading.Event()
 if 'models_loaded' not in st.session_state:
@@ -27,11 +28,14 @@ if 'audio_devices_checked' not in st.session_state:
     st.session_state.audio_devices_checked = False
 if 'available_devices' not in st.session_state:
     st.session_state.available_devices = []
+if 'multichannel' not in st.session_state:
+    st.session_state.multichannel = False
 
 # --- AUDIO DEVICE DETECTION ---
 def check_audio_devices():
-    """Check available audio input devices"""
+    """Check available audio input devices (fails cleanly without PortAudio)"""
     try:
+        import sounddevice as sd
         devices = sd.query_devices()
         input_devices = []
         
@@ -67,6 +71,7 @@ def load_vosk_model(model_path, language):
             if not os.path.exists(full_path):
                 return False, f"Missing model file: {full_path}"
         
+        import vosk
         model = vosk.Model(model_path)
         st.session_state.models_loaded[language] = model
         return True, f"✅ {language} model loaded successfully"
@@ -76,50 +81,44 @@ def load_vosk_model(model_path, language):
         return False, f"❌ Error loading {language} model: {str(e)}"
 
 # --- VOSK WORKER THREAD ---
-def vosk_worker(model, language, text_queue_ref, stop_event, device_index=None):
-    """Enhanced Vosk worker with better error handling"""
+def vosk_worker(model, language, text_queue_ref, stop_event, device_index=None, channels=1):
+    """
+    Enhanced Vosk worker with better error handling. With channels above 1,
+    every input channel is decoded by its own recognizer and messages are
+    tagged with their channel.
+    """
     try:
+        from live_capture import NativeRateCapture
+        from multichannel import MultiChannelRecognizer, multichannel_loop
         samplerate = 16000
         audio_q = queue.Queue()
 
-        def audio_callback(indata, frames, time, status):
-            if status:
-                print(f"Audio callback status: {status}", file=sys.stderr)
-            audio_q.put(bytes(indata))
-
-        # Use specific device if provided
-        device_config = {'device': device_index} if device_index is not None else {}
+        # Capture at the device's own rate; blocks are resampled to 16kHz on the way in
+        capture = NativeRateCapture(audio_q, device_index, channels=channels)
         
-        with sd.RawInputStream(samplerate=samplerate, 
-                               blocksize=8000,
-                               dtype='int16',
-                               channels=1, 
-                               callback=audio_callback,
-                               **device_config):
+        with capture.stream():
             
-            rec = vosk.KaldiRecognizer(model, samplerate)
-            rec.SetWords(True)
-            print(f"INFO: [{language}] Vosk Worker is now listening on device {device_index}.")
+            print(f"INFO: [{language}] Vosk Worker is now listening on {capture}.")
             
-            # Send ready signal
-            text_queue_ref.put({"type": "status", "text": f"🎙️ Listening with {language} model..."})
-            
-            while not stop_event.is_set():
-                try:
-                    data = audio_q.get(timeout=0.1)
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        if result.get('text'):
-                            text_queue_ref.put({"type": "final", "text": result['text']})
-                    else:
-                        partial_result = json.loads(rec.PartialResult())
-                        if partial_result.get('partial'):
-                            text_queue_ref.put({"type": "partial", "text": partial_result['partial']})
-                except queue.Empty:
-                    pass
+            if channels > 1:
+                # One recognizer per microphone, decoded concurrently
+                recognizer = MultiChannelRecognizer(model, channels, samplerate)
+                text_queue_ref.put({"type": "status",
+                                    "text": f"🎚️ Listening to {channels} channels with {language} model..."})
+                multichannel_loop(recognizer, audio_q, text_queue_ref, stop_event)
+                recognizer.close()
+            else:
+                rec = create_recognizer(model, samplerate)
+                
+                # Send ready signal
+                text_queue_ref.put({"type": "status",
+                                    "text": f"🎙️ Listening with {language} model ({capture.samplerate} Hz)..."})
+                
+                # The decoding loop shared with app.py and the command-line tools
+                recognition_loop(rec, audio_q, text_queue_ref, stop_event)
         
-        print(f"INFO: [{language}] Vosk Worker has gracefully stopped.")
-        text_queue_ref.put({"type": "status", "text": "⏹️ Recording stopped."})
+        print(f"INFO: [{language}] Vosk Worker has gracefully stopped. {capture.summary()}")
+        text_queue_ref.put({"type": "status", "text": f"⏹️ Recording stopped. {capture.summary()}"})
         
     except Exception as e:
         error_message = f"ERROR: Error in Vosk worker for {language}: {e}"
@@ -158,6 +157,21 @@ if st.session_state.audio_devices_checked:
                 dev['index'] for dev in st.session_state.available_devices 
                 if dev['name'] == selected_device_name
             )
+        
+        # Meeting-room interfaces: one recognizer per microphone channel
+        selected_channels = next(
+            (dev['channels'] for dev in st.session_state.available_devices
+             if dev['index'] == selected_device_index), 1
+        )
+        if selected_channels > 1:
+            st.session_state.multichannel = st.sidebar.checkbox(
+                f"🎚️ Transcribe all {selected_channels} channels separately",
+                value=st.session_state.multichannel,
+                disabled=st.session_state.is_recording,
+                help="Each input channel gets its own recognizer; the transcript is labeled by channel"
+            )
+        else:
+            st.session_state.multichannel = False
     else:
         st.sidebar.error("❌ No audio input devices found")
         st.error("🎤 **No microphone detected!**\n\nPlease ensure:")
@@ -166,6 +180,9 @@ if st.session_state.audio_devices_checked:
         st.error("• You've granted microphone permissions")
         st.stop()
 
+# Number of recent segments shown in the live transcript
+LIVE_WINDOW_SEGMENTS = 30
+
 # Language and model selection
 st.sidebar.header("🌐 Language Settings")
 MODELS = {
@@ -224,15 +241,15 @@ if st.sidebar.button(
         # Start recording
         st.session_state.is_recording = True
         st.session_state.stop_event.clear()
-        st.session_state.full_text = ""
-        st.session_state.partial_text = ""
+        st.session_state.transcript.clear()
         
         model = st.session_state.models_loaded[language]
         device_idx = selected_device_index if 'selected_device_index' in locals() else None
+        channels = selected_channels if st.session_state.multichannel else 1
         
         worker_thread = threading.Thread(
             target=vosk_worker, 
-            args=(model, language, st.session_state.text_queue, st.session_state.stop_event, device_idx)
+            args=(model, language, st.session_state.text_queue, st.session_state.stop_event, device_idx, channels)
         )
         st.session_state.vosk_worker_thread = worker_thread
         worker_thread.start()
@@ -242,7 +259,7 @@ if st.sidebar.button(
         if st.session_state.vosk_worker_thread:
             st.session_state.stop_event.set()
             st.session_state.vosk_worker_thread.join(timeout=2)
-        st.session_state.partial_text = ""
+        st.session_state.transcript.set_partial("")
     
     st.rerun()
 
@@ -260,10 +277,15 @@ col1, col2 = st.columns([2, 1])
 with col1:
     st.header("📝 Live Transcription")
     
-    # Display transcribed text
-    display_text = st.session_state.full_text
-    if st.session_state.partial_text:
-        display_text += " " + st.session_state.partial_text + "_"
+    # Display transcribed text (only the most recent segments, so updates stay cheap)
+    if st.session_state.multichannel:
+        # One timestamped line per segment, labeled by channel
+        from multichannel import merged_transcript
+        display_text = merged_transcript(st.session_state.transcript.window(LIVE_WINDOW_SEGMENTS))
+        if st.session_state.transcript.partial:
+            display_text += f"\n{st.session_state.transcript.partial}_"
+    else:
+        display_text = st.session_state.transcript.window_text(LIVE_WINDOW_SEGMENTS, partial_marker="_")
     
     st.text_area(
         "Recognized Speech", 
@@ -274,9 +296,11 @@ with col1:
     )
     
     # Clear button
+    if len(st.session_state.transcript) > LIVE_WINDOW_SEGMENTS:
+        st.caption(f"Showing the last {LIVE_WINDOW_SEGMENTS} of {len(st.session_state.transcript)} segments")
+    
     if st.button("🗑️ Clear Text"):
-        st.session_state.full_text = ""
-        st.session_state.partial_text = ""
+        st.session_state.transcript.clear()
         st.rerun()
 
 with col2:
@@ -307,14 +331,17 @@ while not st.session_state.text_queue.empty():
     try:
         result = st.session_state.text_queue.get_nowait()
         
-        if result["type"] == "partial":
-            st.session_state.partial_text = result["text"]
+        if result["type"] == "partial" and "channel" in result:
+            from multichannel import channel_label
+            st.session_state.transcript.set_partial(f"{channel_label(result['channel'])}: {result['text']}")
+        elif result["type"] == "partial":
+            st.session_state.transcript.set_partial(result["text"])
+        elif result["type"] == "final" and "channel" in result:
+            st.session_state.transcript.add_final(
+                result["text"], channel=result["channel"], start=result.get("start"), end=result.get("end")
+            )
         elif result["type"] == "final":
-            if st.session_state.full_text:
-                st.session_state.full_text += " " + result["text"]
-            else:
-                st.session_state.full_text = result["text"]
-            st.session_state.partial_text = ""
+            st.session_state.transcript.add_final(result["text"])
         elif result["type"] == "error":
             st.error(f"🚨 **Error**: {result['text']}")
         elif result["type"] == "status":
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Streaming decode of compressed audio for WhisperBoard
+Decodes FLAC, Ogg (Vorbis/Opus) and MP3 uploads a block at a time with
+libsndfile (via the soundfile package, fully local), downmixes to mono and
+resamples each block to 16kHz, so only the compressed bytes and one block of
+PCM are ever held in memory.
+"""
+
+import importlib.util
+
+COMPRESSED_TYPES = ['flac', 'ogg', 'opus', 'mp3']
+BLOCK_SECONDS = 2.0
+
+
+def is_wav(header):
+    """True if the first bytes of a file are a RIFF (or RF64) WAVE header"""
+    return header[:4] in (b'RIFF', b'RF64') and header[8:12] == b'WAVE'
+
+
+def supported_types():
+    """
+    Upload types the file decoder can read on this installation (checked
+    without importing soundfile, which loads numpy and libsndfile)
+    """
+    return ['wav'] + (COMPRESSED_TYPES if importlib.util.find_spec('soundfile') else [])
+
+
+def _soundfile():
+    try:
+        import soundfile
+    except (ImportError, OSError):
+        # OSError: the package is installed but libsndfile could not be loaded
+        return None
+    return soundfile
+
+
+class CompressedAudio:
+    """A compressed audio file read as a stream of 16kHz int16 mono blocks"""
+
+    def __init__(self, audio_file):
+        """audio_file: a path or a seekable file-like object"""
+        from resampler import TARGET_RATE
+        sf = _soundfile()
+        if sf is None:
+            raise RuntimeError("Compressed audio needs the soundfile package and libsndfile "
+                               "(pip install soundfile)")
+        self._sf = sf
+        self._file = audio_file
+        with sf.SoundFile(audio_file) as f:
+            self.format = f.format
+            self.subtype = f.subtype
+            self.samplerate = f.samplerate
+            self.channels = f.channels
+            self.frames = f.frames
+        # Decoded length at 16kHz (an estimate for formats without an exact frame count)
+        self.total_samples = -(-self.frames * TARGET_RATE // self.samplerate)
+
+    def __str__(self):
+        return (f"{self.format}/{self.subtype}, {self.channels} channels, {self.samplerate}Hz, "
+                f"{self.frames} frames")
+
+    def blocks(self, block_seconds=BLOCK_SECONDS):
+        """Yield 16kHz int16 mono blocks of about block_seconds each"""
+        from resampler import TARGET_RATE, StreamingResampler, to_int16
+        if hasattr(self._file, 'seek'):
+            self._file.seek(0)
+        resampler = StreamingResampler(self.samplerate, TARGET_RATE)
+        with self._sf.SoundFile(self._file) as f:
+            for block in f.blocks(blocksize=int(self.samplerate * block_seconds),
+                                  dtype='float64', always_2d=True):
+                # Full-scale floats back to the 16-bit range, downmixed to mono
+                mono = block.mean(axis=1) * 32768
+                yield to_int16(resampler.process(mono))
+        tail = resampler.flush()
+        if len(tail):
+            yield to_int16(tail)
+
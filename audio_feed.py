@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Zero-copy, adaptively sized PCM feeding for WhisperBoard
+Hands the recognizer slices of the decoded PCM buffer without copying them,
+and sizes the chunks from the decoder throughput measured on this machine.
+"""
+
+import time
+
+_vosk_ffi = None  # Looked up on first use: importing vosk loads the native library
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+def as_waveform(view):
+    """
+    Wrap a contiguous byte buffer so AcceptWaveform can read it in place.
+
+    Falls back to a bytes copy if Vosk's cffi interface is not available.
+    """
+    global _vosk_ffi
+    if _vosk_ffi is None:
+        try:
+            # Vosk's cffi handle lets us pass a pointer into our buffer instead of bytes
+            from vosk import _ffi as _vosk_ffi
+        except ImportError:
+            _vosk_ffi = False
+    if _vosk_ffi:
+        return _vosk_ffi.from_buffer(view)
+    return bytes(view)
+
+
+def pcm_view(samples):
+    """Byte-level memoryview of an int16 sample array (or any PCM buffer)"""
+    return memoryview(samples).cast('B')
+
+
+class AdaptiveChunker:
+    """
+    Splits a PCM buffer into memoryview chunks whose size tracks decoder speed.
+
+    The time the consumer spends on each chunk (AcceptWaveform plus result
+    handling) is measured between iterations. Chunks grow until one call takes
+    about target_seconds, so fixed per-call overhead is amortized on fast
+    machines, and are capped at max_samples so results still arrive often.
+    """
+
+    def __init__(self, initial_samples=4000, min_samples=2000, max_samples=16000,
+                 target_seconds=0.05, smoothing=0.3):
+        self.chunk_samples = initial_samples
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self.throughput = None  # Samples decoded per second (exponential moving average)
+        self.chunks = 0
+
+    def _update(self, samples, elapsed):
+        if elapsed <= 0:
+            return
+        rate = samples / elapsed
+        if self.throughput is None:
+            self.throughput = rate
+        else:
+            self.throughput += self.smoothing * (rate - self.throughput)
+        # Round to 10 ms of audio to keep chunks frame-aligned
+        step = SAMPLE_RATE // 100
+        wanted = int(self.throughput * self.target_seconds) // step * step
+        self.chunk_samples = min(self.max_samples, max(self.min_samples, wanted))
+
+    def chunks_of(self, pcm, start_byte=0):
+        """Yield (byte offset, memoryview) chunks of pcm starting at start_byte"""
+        view = pcm_view(pcm)
+        offset = start_byte
+        while offset < len(view):
+            size = self.chunk_samples * BYTES_PER_SAMPLE
+            chunk = view[offset:offset + size]
+            started = time.perf_counter()
+            yield offset, chunk
+            self._update(len(chunk) // BYTES_PER_SAMPLE, time.perf_counter() - started)
+            self.chunks += 1
+            offset += len(chunk)
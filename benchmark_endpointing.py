@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Endpointing benchmark for WhisperBoard
+Measures how long after the last word of an utterance its final result
+arrives, with Vosk's own endpointer alone and with the pause endpointer
+(endpointing.py) at fixed and adaptive pauses. Audio is fed in live-sized
+blocks and latency is counted in audio time: from the end of the last word
+(Vosk's word timing) to the end of the block that delivered the final. The
+transcript is compared with the Vosk-only one to show the cost of cutting
+utterances earlier.
+
+Without a model directory only the pause detection is measured, on synthetic
+dictation (word-like bursts with short gaps, phrases separated by longer
+pauses) whose phrase ends are known: latency from each phrase end to the
+forced endpoint, phrases split mid-way and phrases merged with the next one.
+
+Usage:
+    python benchmark_endpointing.py dictation.wav --model model-English
+    python benchmark_endpointing.py --minutes 10
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from endpointing import PauseEndpointer
+from recognition import decode_block, flush_block, word_error_rate
+from wav_reader import WavAudio
+
+SAMPLE_RATE = 16000
+CONFIGS = [
+    ("Vosk endpointer only", None),
+    ("Pause 0.5 s", dict(pause_seconds=0.5, adaptive=False)),
+    ("Pause 0.8 s", dict(pause_seconds=0.8, adaptive=False)),
+    ("Adaptive pause", dict()),
+]
+
+
+def synthetic_dictation(minutes, seed=0):
+    """Speech-like int16 audio and the (start, end) seconds of each phrase"""
+    rng = np.random.default_rng(seed)
+    parts, phrases = [], []
+    length = 0
+    total = int(minutes * 60 * SAMPLE_RATE)
+
+    def add(samples):
+        nonlocal length
+        parts.append(samples)
+        length += len(samples)
+
+    while length < total:
+        start = length
+        for word in range(rng.integers(3, 12)):
+            if word:
+                add(rng.standard_normal(int(rng.uniform(0.03, 0.25) * SAMPLE_RATE)) * 20)
+            n = int(rng.uniform(0.15, 0.45) * SAMPLE_RATE)
+            envelope = 0.6 + 0.4 * np.sin(np.arange(n) * 2 * np.pi * 4 / SAMPLE_RATE)
+            add(rng.standard_normal(n) * 3000 * envelope)
+        phrases.append((start / SAMPLE_RATE, length / SAMPLE_RATE))
+        add(rng.standard_normal(int(rng.uniform(0.6, 3.0) * SAMPLE_RATE)) * 20)
+    return np.concatenate(parts).astype(np.int16), phrases
+
+
+class _SilentRecognizer:
+    """Stands in for Vosk: never ends an utterance on its own"""
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def FinalResult(self):
+        return '{"text": ""}'
+
+
+def blocks_of(samples, block_seconds):
+    step = int(SAMPLE_RATE * block_seconds)
+    for start in range(0, len(samples), step):
+        yield (start + min(step, len(samples) - start)) / SAMPLE_RATE, samples[start:start + step]
+
+
+def detector_only(samples, phrases, block_seconds):
+    print(f"{'Endpointing':22} | {'latency p50/p95 (ms)':>20} | {'split':>5} | {'merged':>6} | final pause")
+    print("-" * 80)
+    ends = np.array([end for _, end in phrases])
+    starts = np.array([start for start, _ in phrases])
+    for label, options in CONFIGS[1:]:
+        endpointer = PauseEndpointer(_SilentRecognizer(), **options)
+        forced = [t for t, block in blocks_of(samples, block_seconds) if endpointer.AcceptWaveform(block.tobytes())]
+        forced = np.array(forced)
+        # Which phrase each endpoint falls after, and whether it came before that phrase ended
+        phrase = np.searchsorted(starts, forced, side='right') - 1
+        split = int(np.count_nonzero(forced < ends[phrase]))
+        latencies = [forced[i] - ends[p] for i, p in enumerate(phrase) if forced[i] >= ends[p]]
+        merged = len(phrases) - len(set(phrase[forced >= ends[phrase]].tolist()))
+        p50, p95 = (np.percentile(latencies, [50, 95]) * 1000) if latencies else (float('nan'),) * 2
+        print(f"{label:22} | {p50:9.0f} / {p95:8.0f} | {split:5} | {merged:6} | "
+              f"{endpointer.pause_seconds:.2f} s")
+    print(f"\n{len(phrases)} phrases. Latency is quantized by the {block_seconds} s blocks; "
+          "merged phrases were followed by pauses shorter than the endpointing pause.")
+
+
+def decode_with(model, samples, options, block_seconds):
+    """Finals of a file as (text, latency seconds), and the endpointer used"""
+    from grammar import create_recognizer
+    recognizer = create_recognizer(model)
+    if options is not None:
+        recognizer = PauseEndpointer(recognizer, **options)
+    finals = []
+    for block_end, block in blocks_of(samples, block_seconds):
+        segment = decode_block(recognizer, block.tobytes(), partials=False)
+        if segment is not None and segment.text:
+            latency = block_end - segment.end if segment.end is not None else None
+            finals.append((segment.text, latency))
+    last = flush_block(recognizer)
+    if last.text:
+        finals.append((last.text, None))  # End of the file, not an endpoint
+    return finals, recognizer if options is not None else None
+
+
+def with_model(model_path, paths, block_seconds):
+    import vosk
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(model_path)
+    for path in paths:
+        blocks = list(WavAudio.open(path).blocks())
+        samples = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+        print(f"\n📄 {path} ({len(samples) / SAMPLE_RATE:.1f} s)")
+        print(f"{'Endpointing':22} | {'finals':>6} | {'forced':>6} | {'latency p50/p95 (ms)':>20} | "
+              f"{'vs Vosk':>8} | {'WER vs Vosk':>11}")
+        print("-" * 92)
+        baseline_text, baseline_p50 = None, None
+        for label, options in CONFIGS:
+            finals, endpointer = decode_with(model, samples, options, block_seconds)
+            text = ' '.join(t for t, _ in finals)
+            latencies = [l for _, l in finals if l is not None]
+            p50, p95 = (np.percentile(latencies, [50, 95]) * 1000) if latencies else (float('nan'),) * 2
+            if baseline_text is None:
+                baseline_text, baseline_p50 = text, p50
+            forced = endpointer.forced if endpointer else 0
+            pause = f" (pause {endpointer.pause_seconds:.2f} s)" if endpointer and endpointer.adaptive else ""
+            print(f"{label:22} | {len(finals):6} | {forced:6} | {p50:9.0f} / {p95:8.0f} | "
+                  f"{p50 - baseline_p50:+6.0f} ms | {word_error_rate(baseline_text, text):10.1%}{pause}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Final-result latency with pause endpointing")
+    parser.add_argument('wav_files', nargs='*', help="Recordings to decode (16-bit WAV)")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    parser.add_argument('--minutes', type=float, default=10, help="Synthetic dictation length")
+    parser.add_argument('--block-seconds', type=float, default=0.5, help="Block size (0.5 s in the apps)")
+    args = parser.parse_args()
+
+    print("⏱️ WhisperBoard Endpointing Benchmark")
+    print("=" * 92)
+    if args.wav_files and os.path.exists(args.model):
+        with_model(args.model, args.wav_files, args.block_seconds)
+        return
+    if args.wav_files:
+        print(f"(Model directory not found: {args.model}; measuring pause detection only)")
+    print(f"Pause detection on {args.minutes:.0f} minutes of synthetic dictation\n")
+    samples, phrases = synthetic_dictation(args.minutes)
+    detector_only(samples, phrases, args.block_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+File decoder feeding benchmark for WhisperBoard
+Compares the original loop in process_audio_file (fixed 4000-sample slices
+copied with tobytes()) against zero-copy memoryview feeding with fixed and
+adaptive chunk sizes.
+
+Without a model directory the recognizer is replaced by a no-op so the
+Python-side feeding overhead (copies, calls) is measured on its own.
+
+Usage:
+    python benchmark_feed.py long_recording.wav --model model-English
+    python benchmark_feed.py --minutes 120
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from audio_feed import AdaptiveChunker, as_waveform
+from wav_reader import WavAudio
+
+
+class NullRecognizer:
+    """Accepts audio without decoding it, to isolate feeding overhead"""
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def Result(self):
+        return '{"text": ""}'
+
+    def FinalResult(self):
+        return '{"text": ""}'
+
+
+def feed_copy(recognizer, samples, chunk_size=4000):
+    """The original loop: slice the array and copy each chunk to bytes"""
+    chunks = 0
+    for i in range(0, len(samples), chunk_size):
+        if recognizer.AcceptWaveform(samples[i:i + chunk_size].tobytes()):
+            json.loads(recognizer.Result())
+        chunks += 1
+    json.loads(recognizer.FinalResult())
+    return chunks
+
+
+def feed_zero_copy(recognizer, samples, chunker):
+    for _, chunk in chunker.chunks_of(samples):
+        if recognizer.AcceptWaveform(as_waveform(chunk)):
+            json.loads(recognizer.Result())
+    json.loads(recognizer.FinalResult())
+    return chunker.chunks
+
+
+def load_samples(args):
+    if args.wav:
+        # Memory-mapped, so long archives are paged in as they are fed
+        audio = WavAudio.open(args.wav)
+        if audio.channels != 1 or audio.samplerate != 16000:
+            raise ValueError(f"{args.wav} must be 16kHz 16-bit mono")
+        return audio.samples.reshape(-1)
+    # Synthetic noise of the requested length
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(args.minutes * 60 * 16000)) * 1000).astype(np.int16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File decoder feeding benchmark")
+    parser.add_argument('wav', nargs='?', help="16kHz 16-bit mono WAV file (default: synthetic audio)")
+    parser.add_argument('--minutes', type=float, default=60, help="Length of synthetic audio")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per strategy (fastest is kept)")
+    args = parser.parse_args()
+
+    samples = load_samples(args)
+    audio_seconds = len(samples) / 16000
+
+    if os.path.exists(args.model):
+        import vosk
+        vosk.SetLogLevel(-1)
+        model = vosk.Model(args.model)
+
+        def make_recognizer():
+            recognizer = vosk.KaldiRecognizer(model, 16000)
+            recognizer.SetWords(True)
+            return recognizer
+        mode = f"Vosk model {args.model}"
+    else:
+        make_recognizer = NullRecognizer
+        mode = "no-op recognizer (feeding overhead only)"
+
+    print("📦 WhisperBoard File Feeding Benchmark")
+    print("=" * 70)
+    print(f"Audio: {audio_seconds / 60:.1f} min | Recognizer: {mode}")
+
+    strategies = [
+        ("copy, 4000 samples", lambda rec: feed_copy(rec, samples)),
+        ("zero-copy, 4000 samples", lambda rec: feed_zero_copy(
+            rec, samples, AdaptiveChunker(initial_samples=4000, min_samples=4000, max_samples=4000))),
+        ("zero-copy, adaptive", lambda rec: feed_zero_copy(rec, samples, AdaptiveChunker())),
+    ]
+
+    results = []
+    for name, run in strategies:
+        best, chunks = None, 0
+        for _ in range(args.repeat):
+            recognizer = make_recognizer()
+            start = time.perf_counter()
+            chunks = run(recognizer)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((name, best, chunks))
+
+    print(f"\n{'Strategy':26} | {'time (s)':>9} | {'RTF':>8} | {'chunks':>7} | speedup")
+    print("-" * 70)
+    baseline = results[0][1]
+    for name, elapsed, chunks in results:
+        print(f"{name:26} | {elapsed:9.3f} | {elapsed / audio_seconds:8.2e} | {chunks:7} | "
+              f"{baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
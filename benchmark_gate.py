@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Silence gate benchmark for WhisperBoard
+Decodes the same audio with and without the energy / zero-crossing silence
+gate (silence_gate.py) and reports how much audio and decoder CPU time the
+gate saves, what the gate itself costs, and how far the transcript and word
+timings move (against a reference transcript in a sibling .txt file when
+there is one, otherwise against the ungated transcript).
+
+Without a model directory only the gating itself is measured on the audio
+(fraction skipped and gate overhead), using synthetic speech-like bursts
+separated by low-level noise unless WAV files are given.
+
+Usage:
+    python benchmark_gate.py meeting.wav lecture.wav --model model-English
+    python benchmark_gate.py --minutes 30
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from recognition import word_error_rate
+from silence_gate import SilenceGate
+from wav_reader import WavAudio
+
+BLOCK_SIZE = 8000  # samples, same as the live recording blocks in app.py
+
+
+def synthetic_audio(minutes, seed=0):
+    """Bursts of syllable-modulated noise (~-20 dBFS) between pauses of -65 dBFS noise"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = int(minutes * 60 * 16000)
+    length = 0
+    while length < total:
+        speech = int(rng.uniform(1.0, 6.0) * 16000)
+        envelope = 0.6 + 0.4 * np.sin(np.arange(speech) * 2 * np.pi * 4 / 16000)  # ~4 syllables/s
+        parts.append(rng.standard_normal(speech) * 3000 * envelope)
+        pause = int(rng.uniform(0.3, 8.0) * 16000)
+        parts.append(rng.standard_normal(pause) * 20)
+        length += speech + pause
+    return np.concatenate(parts)[:total].astype(np.int16)
+
+
+def load_files(paths, minutes):
+    if not paths:
+        return [("synthetic", synthetic_audio(minutes), None)]
+    files = []
+    for path in paths:
+        reference_path = os.path.splitext(path)[0] + '.txt'
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding='utf-8') as f:
+                reference = f.read().strip()
+        blocks = list(WavAudio.open(path).blocks())
+        files.append((path, blocks[0] if len(blocks) == 1 else np.concatenate(blocks), reference))
+    return files
+
+
+def decode(model, samples, gate):
+    """Decode in live-sized blocks; returns (words, CPU seconds, gate seconds, seconds fed)"""
+    import vosk
+    recognizer = vosk.KaldiRecognizer(model, 16000)
+    recognizer.SetWords(True)
+    words = []
+    gate_seconds = 0.0
+    fed = 0
+
+    def collect(result_json):
+        for word in json.loads(result_json).get('result', []):
+            words.append((word['word'], word['start'] + (gate.offset_at(word['start']) if gate else 0.0)))
+
+    start = time.process_time()
+    for i in range(0, len(samples), BLOCK_SIZE):
+        block = samples[i:i + BLOCK_SIZE]
+        if gate is None:
+            pieces = [block]
+        else:
+            t0 = time.process_time()
+            pieces = gate.process(block)
+            gate_seconds += time.process_time() - t0
+        for piece in pieces:
+            fed += len(piece)
+            if recognizer.AcceptWaveform(piece.tobytes()):
+                collect(recognizer.Result())
+    collect(recognizer.FinalResult())
+    return words, time.process_time() - start, gate_seconds, fed / 16000
+
+
+def gate_only(samples):
+    gate = SilenceGate()
+    start = time.process_time()
+    for i in range(0, len(samples), BLOCK_SIZE):
+        gate.process(samples[i:i + BLOCK_SIZE])
+    return gate, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Silence gate benchmark")
+    parser.add_argument('wav_files', nargs='*', help="16-bit WAV files (default: synthetic audio)")
+    parser.add_argument('--minutes', type=float, default=10, help="Length of synthetic audio")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    args = parser.parse_args()
+
+    files = load_files(args.wav_files, args.minutes)
+    audio_seconds = sum(len(samples) for _, samples, _ in files) / 16000
+
+    print("🔇 WhisperBoard Silence Gate Benchmark")
+    print("=" * 70)
+    print(f"Audio: {audio_seconds / 60:.1f} min in {len(files)} file(s)")
+
+    if not os.path.exists(args.model):
+        print(f"(No model at {args.model}: measuring the gate only)\n")
+        for name, samples, _ in files:
+            gate, seconds = gate_only(samples)
+            print(f"   {os.path.basename(name):30} skipped {gate.skipped_fraction:6.1%} of the audio, "
+                  f"gate cost {seconds * 1000 / (len(samples) / 16000 / 60):.2f} ms CPU per audio minute")
+        return
+
+    import vosk
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+
+    totals = {"Ungated": [0.0, 0.0, 0.0], "Gated": [0.0, 0.0, 0.0]}
+    errors = {"Ungated": [], "Gated": []}
+    agreement = []
+    time_shifts = []
+    for name, samples, reference in files:
+        plain_words, plain_cpu, _, plain_fed = decode(model, samples, None)
+        gate = SilenceGate()
+        gated_words, gated_cpu, gate_cpu, gated_fed = decode(model, samples, gate)
+        totals["Ungated"] = [a + b for a, b in zip(totals["Ungated"], (plain_cpu, 0.0, plain_fed))]
+        totals["Gated"] = [a + b for a, b in zip(totals["Gated"], (gated_cpu, gate_cpu, gated_fed))]
+
+        plain_text = ' '.join(word for word, _ in plain_words)
+        gated_text = ' '.join(word for word, _ in gated_words)
+        agreement.append(word_error_rate(plain_text, gated_text))
+        if reference is not None:
+            errors["Ungated"].append(word_error_rate(reference, plain_text))
+            errors["Gated"].append(word_error_rate(reference, gated_text))
+        if [w for w, _ in plain_words] == [w for w, _ in gated_words]:
+            time_shifts.extend(abs(a - b) for (_, a), (_, b) in zip(plain_words, gated_words))
+        print(f"   {os.path.basename(name):30} skipped {gate.skipped_fraction:6.1%} | "
+              f"CPU {plain_cpu:.2f}s → {gated_cpu:.2f}s")
+
+    print(f"\n{'Mode':10} | {'audio fed':>9} | {'CPU (s)':>8} | {'gate (ms)':>9} | {'WER':>6}")
+    print("-" * 56)
+    for mode, (cpu, gate_cpu, fed) in totals.items():
+        wer = f"{np.mean(errors[mode]):6.1%}" if errors[mode] else "   n/a"
+        print(f"{mode:10} | {fed / audio_seconds:9.1%} | {cpu:8.2f} | {gate_cpu * 1000:9.1f} | {wer}")
+
+    plain_cpu, gated_cpu = totals["Ungated"][0], totals["Gated"][0]
+    print(f"\n💡 CPU saved: {1 - gated_cpu / plain_cpu:.1%} | "
+          f"gated vs ungated word difference: {np.mean(agreement):.1%}")
+    if time_shifts:
+        print(f"   Word start shift where transcripts agree: mean {1000 * np.mean(time_shifts):.0f} ms, "
+              f"max {1000 * np.max(time_shifts):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Open vs grammar-constrained decoding benchmark for WhisperBoard
+Decodes the same WAV files with and without the vocabulary.txt grammar and
+reports decode time, real-time factor, per-chunk and final-result latency and,
+when a reference transcript is available, word error rate.
+
+Reference transcripts are read from a .txt file next to each WAV
+(command.wav -> command.txt).
+
+Usage:
+    python benchmark_grammar.py command1.wav command2.wav --model model-English
+"""
+
+import argparse
+import json
+import os
+import time
+import wave
+
+import numpy as np
+import vosk
+
+from grammar import DEFAULT_VOCABULARY, create_recognizer, load_grammar, supports_grammar
+from recognition import decode_block, flush_block, word_error_rate
+
+CHUNK_SIZE = 4000  # samples, same as process_audio_file in app.py
+
+
+def read_pcm(path):
+    """Read a 16kHz 16-bit mono WAV file as raw PCM bytes"""
+    with wave.open(path, 'rb') as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
+            raise ValueError(f"{path} must be 16kHz 16-bit mono")
+        return wf.readframes(wf.getnframes())
+
+
+def decode(model, pcm, grammar):
+    """Decode PCM bytes and return (text, total seconds, chunk latencies, final latency)"""
+    recognizer = create_recognizer(model, 16000, grammar)
+    chunk_bytes = CHUNK_SIZE * 2
+    parts = []
+    chunk_latencies = []
+
+    # The apps' decode path, which also leaves out "[unk]" words
+    start = time.perf_counter()
+    for i in range(0, len(pcm), chunk_bytes):
+        t0 = time.perf_counter()
+        segment = decode_block(recognizer, pcm[i:i + chunk_bytes], partials=False)
+        if segment is not None:
+            parts.append(segment.text)
+        chunk_latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    parts.append(flush_block(recognizer).text)
+    final_latency = time.perf_counter() - t0
+    total = time.perf_counter() - start
+
+    text = ' '.join(p for p in parts if p)
+    return text, total, chunk_latencies, final_latency
+
+
+def benchmark_mode(model, files, grammar, repeat):
+    """Decode every file `repeat` times and aggregate the fastest run per file"""
+    audio_seconds = 0.0
+    decode_seconds = 0.0
+    chunk_latencies = []
+    final_latencies = []
+    errors = []
+
+    for path, pcm, reference in files:
+        best = None
+        for _ in range(repeat):
+            run = decode(model, pcm, grammar)
+            if best is None or run[1] < best[1]:
+                best = run
+        text, total, chunks, final = best
+
+        audio_seconds += len(pcm) / 2 / 16000
+        decode_seconds += total
+        chunk_latencies.extend(chunks)
+        final_latencies.append(final)
+        if reference is not None:
+            errors.append(word_error_rate(reference, text))
+        print(f"   {os.path.basename(path):30} → {text!r}")
+
+    return {
+        'rtf': decode_seconds / audio_seconds,
+        'decode': decode_seconds,
+        'chunk_ms': 1000 * float(np.mean(chunk_latencies)),
+        'final_ms': 1000 * float(np.mean(final_latencies)),
+        'wer': float(np.mean(errors)) if errors else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open vs grammar-constrained decoding benchmark")
+    parser.add_argument('wav_files', nargs='+', help="16kHz 16-bit mono WAV files of commands")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    parser.add_argument('--phrases', default=DEFAULT_VOCABULARY, help="Vocabulary or phrase file")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per file (fastest is kept)")
+    args = parser.parse_args()
+
+    print("⚡ WhisperBoard Grammar Decoding Benchmark")
+    print("=" * 70)
+
+    if not supports_grammar(args.model):
+        print(f"❌ {args.model} has a static decoding graph and ignores grammars.")
+        print("   Use a small model (e.g. vosk-model-small-en-us) for constrained decoding.")
+        return
+
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+    grammar = load_grammar(args.model, args.phrases)
+    print(f"Grammar: {len(json.loads(grammar)) - 1} phrases from {args.phrases}")
+
+    files = []
+    for path in args.wav_files:
+        reference_path = os.path.splitext(path)[0] + '.txt'
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding='utf-8') as f:
+                reference = f.read().strip()
+        files.append((path, read_pcm(path), reference))
+
+    results = {}
+    for mode, mode_grammar in [("Open", None), ("Constrained", grammar)]:
+        print(f"\n🔄 {mode} decoding:")
+        results[mode] = benchmark_mode(model, files, mode_grammar, args.repeat)
+
+    print("\n📊 RESULTS:")
+    print("-" * 70)
+    print(f"{'Mode':12} | {'RTF':>6} | {'decode (s)':>10} | {'chunk (ms)':>10} | {'final (ms)':>10} | {'WER':>6}")
+    for mode, r in results.items():
+        wer = f"{r['wer'] * 100:5.1f}%" if r['wer'] is not None else f"{'n/a':>6}"
+        print(f"{mode:12} | {r['rtf']:6.3f} | {r['decode']:10.2f} | {r['chunk_ms']:10.1f} | "
+              f"{r['final_ms']:10.1f} | {wer}")
+
+    speedup = results["Open"]['decode'] / results["Constrained"]['decode']
+    print(f"\n🎯 Constrained decoding is {speedup:.2f}x the speed of open decoding")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the WhisperBoard Streamlit apps
+Runs each app in a fresh Python process (with Streamlit's headless AppTest
+runner, no browser or server) and measures from process launch:
+
+    first render      the page title is rendered (what a user sees first)
+    ready             the app's start button (Start Recording, or Start
+                      Demo in the demo) is rendered enabled, i.e. the model
+                      is loaded
+    script done       the first run of the script has finished
+
+It also lists which heavy modules (numpy, scipy.signal, sounddevice, vosk,
+soundfile) were already imported at first render and at the end of the run.
+Interpreter start and the Streamlit import are included; the web server's own
+start-up is not.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py app.py --runs 5
+    python benchmark_startup.py my_app.py --ready-label "Start"
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Each app and the label of the button that is enabled once it is ready to use
+APPS = {"app.py": "Start Recording", "app_local.py": "Start Recording", "app_demo.py": "Start Demo"}
+HEAVY_MODULES = ["numpy", "scipy.signal", "sounddevice", "vosk", "soundfile"]
+
+# Runs inside the child process: wraps st.title and the sidebar button to
+# timestamp the render milestones, then executes the app once
+PROBE = r'''
+import json, sys, time
+launched = float(sys.argv[2])
+heavy = json.loads(sys.argv[3])
+ready_label = sys.argv[4]
+marks = {}
+loaded = {}
+
+def mark(name):
+    if name not in marks:
+        marks[name] = time.time() - launched
+        loaded[name] = [m for m in heavy if m in sys.modules]
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.testing.v1 import AppTest
+marks["streamlit imported"] = time.time() - launched
+
+title = st.title
+def timed_title(*args, **kwargs):
+    mark("first render")
+    return title(*args, **kwargs)
+st.title = timed_title
+
+button = DeltaGenerator.button
+def timed_button(self, label, *args, **kwargs):
+    if ready_label in str(label) and not kwargs.get("disabled"):
+        mark("ready")
+    return button(self, label, *args, **kwargs)
+DeltaGenerator.button = timed_button
+
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+mark("script done")
+print(json.dumps({"marks": marks, "loaded": loaded,
+                  "errors": [str(e.value) for e in app.exception]}))
+'''
+
+MILESTONES = ["streamlit imported", "first render", "ready", "script done"]
+
+
+def measure(app, runs, ready_label):
+    samples = []
+    for _ in range(runs):
+        launched = time.time()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, app, repr(launched), json.dumps(HEAVY_MODULES), ready_label],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(app)) or "."
+        )
+        lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+        if output.returncode != 0 or not lines:
+            raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "no output")
+        samples.append(json.loads(lines[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the Streamlit apps")
+    parser.add_argument('apps', nargs='*', default=list(APPS), help="Streamlit scripts to measure")
+    parser.add_argument('--ready-label', help="Start button label of apps not in APPS (default: Start Recording)")
+    parser.add_argument('--runs', type=int, default=3, help="Cold starts per app (median is reported)")
+    args = parser.parse_args()
+
+    print("🚀 WhisperBoard Cold-Start Benchmark")
+    print("=" * 70)
+    print(f"{'App':14} | " + " | ".join(f"{name:>17}" for name in MILESTONES))
+    print("-" * 92)
+    details = []
+    for app in args.apps:
+        try:
+            ready_label = APPS.get(os.path.basename(app)) or args.ready_label or "Start Recording"
+            samples = measure(app, args.runs, ready_label)
+        except RuntimeError as e:
+            print(f"{app:14} | ❌ {e}")
+            continue
+        cells = []
+        for name in MILESTONES:
+            values = [s["marks"][name] for s in samples if name in s["marks"]]
+            cells.append(f"{np.median(values) * 1000:14.0f} ms" if values else f"{'n/a':>17}")
+        print(f"{app:14} | " + " | ".join(cells))
+        details.append((app, samples[-1]))
+
+    print("\n📦 Heavy modules already imported:")
+    for app, sample in details:
+        for name in ("first render", "script done"):
+            if name in sample["loaded"]:
+                modules = ", ".join(sample["loaded"][name]) or "none"
+                print(f"   {app:14} at {name:12}: {modules}")
+        for error in sample["errors"]:
+            print(f"   ⚠️ {app}: {error}")
+
+
+if __name__ == "__main__":
+    main()
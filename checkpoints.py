@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Checkpoint and resume for long file transcriptions in WhisperBoard
+After every finalized segment, a file job appends a record to an append-only
+checkpoint file: the PCM byte offset where the recognizer was reset and the
+segment it emitted. If the process dies, processing the same audio again
+(same model and options) replays the saved segments and resumes decoding
+from the last reset point instead of from zero.
+
+Usage:
+    python checkpoints.py           # list interrupted transcriptions
+    python checkpoints.py --check   # open, interrupt and resume a checkpoint in a scratch directory
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+
+CHECKPOINT_DIR = os.environ.get("WHISPERBOARD_CHECKPOINT_DIR", "checkpoints")
+CHECKPOINT_SUFFIX = ".jsonl"
+BYTES_PER_SECOND = 16000 * 2  # 16kHz 16-bit mono PCM
+
+
+def read_checkpoint(path):
+    """
+    Parse a checkpoint file into (header, byte offset, segments, valid bytes),
+    stopping at a line cut short by a crash.
+    """
+    header, byte_offset, segments, valid_bytes = {}, 0, [], 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_bytes += len(line)
+            if 'offset' in record:
+                byte_offset = record['offset']
+                if record.get('segment'):
+                    segments.append(record['segment'])
+            else:
+                header = record
+    return header, byte_offset, segments, valid_bytes
+
+
+class Checkpoint:
+    """
+    Progress of one file transcription.
+
+    The first line records the file; each further line is one recognizer
+    reset point {"offset": bytes, "segment": result or null}. Lines are only
+    appended and flushed, so a crash can at worst cut off the last line,
+    which is discarded on load.
+    """
+
+    def __init__(self, path, name=None, total_bytes=None):
+        self.path = path
+        self.name = name
+        self.total_bytes = total_bytes
+        self.byte_offset = 0
+        self.segments = []
+        valid_bytes = 0
+        if os.path.exists(path):
+            header, self.byte_offset, self.segments, valid_bytes = read_checkpoint(path)
+            self.name = header.get('name', name)
+            self.total_bytes = header.get('total_bytes', total_bytes)
+        self._file = open(path, 'ab')
+        self._file.truncate(valid_bytes)  # Drop a line cut short by a crash
+        if valid_bytes == 0:
+            self._write({"name": name, "total_bytes": total_bytes})
+
+    @property
+    def resume_seconds(self):
+        """Audio time where decoding resumes (0.0 for a fresh job)"""
+        return self.byte_offset / BYTES_PER_SECOND
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+        self._file.flush()
+
+    def save(self, byte_offset, segment=None):
+        """Record a reset point after byte_offset bytes, with the segment finalized there"""
+        self.byte_offset = byte_offset
+        if segment:
+            self.segments.append(segment)
+        self._write({"offset": byte_offset, "segment": segment})
+
+    def close(self):
+        self._file.close()
+
+
+class CheckpointStore:
+    """Checkpoint files for in-progress transcriptions, one per audio/model/options key"""
+
+    def __init__(self, directory=CHECKPOINT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._open = set()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.name + CHECKPOINT_SUFFIX)
+
+    def open(self, key, name=None, total_bytes=None):
+        """
+        The checkpoint for key (created if new), or None if another job is
+        already transcribing the same audio.
+        """
+        path = self._path(key)
+        with self._lock:
+            if path in self._open:
+                return None
+            self._open.add(path)
+        return Checkpoint(path, name, total_bytes)
+
+    def release(self, checkpoint, finished):
+        """Close a checkpoint, deleting it once its transcription has finished"""
+        checkpoint.close()
+        if finished:
+            os.remove(checkpoint.path)
+        with self._lock:
+            self._open.discard(checkpoint.path)
+
+    def interrupted(self):
+        """(name, fraction done) of transcriptions that stopped before finishing"""
+        pending = []
+        with self._lock:
+            open_paths = set(self._open)
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(CHECKPOINT_SUFFIX) or entry.path in open_paths:
+                continue
+            header, byte_offset, _, _ = read_checkpoint(entry.path)
+            total_bytes = header.get('total_bytes')
+            pending.append((header.get('name'), byte_offset / total_bytes if total_bytes else 0.0))
+        return pending
+
+
+def check():
+    """
+    Round-trip a checkpoint the way a file job uses it: open it by the
+    transcription cache key, save reset points, stop mid-file with a line cut
+    short, then open it again and resume. Returns True if everything matched.
+    """
+    from transcription_cache import CacheKey, decode_options
+
+    ok = True
+
+    def expect(label, condition):
+        nonlocal ok
+        ok = ok and condition
+        print(f"   {'✅' if condition else '❌'} {label}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        key = CacheKey(directory, decode_options())
+        key.update(bytes(10 * BYTES_PER_SECOND))
+        store = CheckpointStore(os.path.join(directory, "checkpoints"))
+        first = {"text": "one", "result": [{"word": "one", "start": 0.2, "end": 0.6}]}
+        second = {"text": "two", "result": [{"word": "two", "start": 3.4, "end": 3.8}]}
+
+        checkpoint = store.open(key, "check.wav", 10 * BYTES_PER_SECOND)
+        expect("opened by cache key", checkpoint is not None and checkpoint.byte_offset == 0)
+        expect("second open of the same audio refused", store.open(key) is None)
+        checkpoint.save(1 * BYTES_PER_SECOND, first)
+        checkpoint.save(2 * BYTES_PER_SECOND)
+        checkpoint.save(4 * BYTES_PER_SECOND, second)
+        store.release(checkpoint, finished=False)
+        with open(checkpoint.path, 'ab') as f:
+            f.write(b'{"offset": 192000, "segm')  # Crash mid-write
+
+        expect("listed as interrupted at 40%", store.interrupted() == [("check.wav", 0.4)])
+        resumed = store.open(key)
+        expect("resumes at 4.0 s", resumed is not None and resumed.resume_seconds == 4.0)
+        expect("saved segments replayed", resumed is not None and resumed.segments == [first, second])
+        resumed.save(6 * BYTES_PER_SECOND)
+        store.release(resumed, finished=False)
+        expect("cut-off line dropped", read_checkpoint(resumed.path)[1] == 6 * BYTES_PER_SECOND)
+        finished = store.open(key)
+        store.release(finished, finished=True)
+        expect("removed once finished", not os.path.exists(finished.path) and store.interrupted() == [])
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperBoard transcription checkpoints")
+    parser.add_argument('--check', action='store_true',
+                        help="Open, interrupt and resume a checkpoint in a scratch directory")
+    args = parser.parse_args()
+
+    if args.check:
+        print("🔁 Checkpoint round trip")
+        if not check():
+            raise SystemExit(1)
+        return
+    store = CheckpointStore()
+    pending = store.interrupted()
+    print(f"⏸️ {len(pending)} interrupted transcription(s) in {store.directory}")
+    for name, done in pending:
+        print(f"   • {name}: {done:.0%} done — process the same file again to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Automatic language identification and code-switching decoding for WhisperBoard
+Feeds the same audio to several Vosk models at once and keeps, per segment,
+the hypothesis with the best word-level confidence.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from grammar import create_recognizer
+
+
+def mean_confidence(result):
+    """Average word-level 'conf' of a Vosk result (0.0 when there are no words)"""
+    words = result.get('result', [])
+    if not words:
+        return 0.0
+    return sum(word.get('conf', 0.0) for word in words) / len(words)
+
+
+class CodeSwitchRecognizer:
+    """
+    Recognizer-like object that decodes the same audio with several language models.
+
+    It exposes the KaldiRecognizer methods used by the recognition loop
+    (AcceptWaveform, Result, PartialResult, FinalResult), so it can be dropped
+    in wherever a single recognizer is used. Recognizers run concurrently on
+    worker threads (Vosk releases the GIL while decoding). Once one language
+    wins enough consecutive segments by a clear margin the others are paused to
+    save CPU, and all languages are probed again periodically or when the
+    winner's confidence drops, so mid-session switches are still picked up.
+    """
+
+    def __init__(self, models, samplerate=16000, dominance_segments=3, dominance_margin=0.1,
+                 min_confidence=0.6, probe_interval=10):
+        self.recognizers = {}
+        for language, model in models.items():
+            self.recognizers[language] = create_recognizer(model, samplerate)
+
+        self.dominance_segments = dominance_segments
+        self.dominance_margin = dominance_margin
+        self.min_confidence = min_confidence
+        self.probe_interval = probe_interval
+
+        self.active = list(self.recognizers)
+        self.language = self.active[0]  # Language of the most recent segment
+        self.locked = False
+        self.streak = 0
+        self.segments_since_lock = 0
+        self._result = {"text": ""}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.recognizers),
+                                            thread_name_prefix="code-switch")
+
+    def _run_active(self, fn):
+        """Apply fn(language, recognizer) to every active recognizer in parallel"""
+        if len(self.active) == 1:
+            language = self.active[0]
+            return {language: fn(language, self.recognizers[language])}
+        futures = {language: self._executor.submit(fn, language, self.recognizers[language])
+                   for language in self.active}
+        return {language: future.result() for language, future in futures.items()}
+
+    def AcceptWaveform(self, data):
+        endpoints = self._run_active(lambda language, rec: rec.AcceptWaveform(data))
+        if not any(endpoints.values()):
+            return False
+
+        # One model detected the end of an utterance: close the segment on all of
+        # them so the hypotheses cover the same audio and can be compared
+        results = self._run_active(
+            lambda language, rec: rec.Result() if endpoints[language] else rec.FinalResult()
+        )
+        self._choose({language: json.loads(res) for language, res in results.items()})
+        return True
+
+    def Result(self):
+        return json.dumps(self._result, ensure_ascii=False)
+
+    def PartialResult(self):
+        return self.recognizers[self.language].PartialResult()
+
+    def FinalResult(self):
+        results = self._run_active(lambda language, rec: rec.FinalResult())
+        self._choose({language: json.loads(res) for language, res in results.items()})
+        return self.Result()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _choose(self, results):
+        """Keep the most confident hypothesis and update language dominance"""
+        scores = {language: mean_confidence(result) for language, result in results.items()}
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best = ranked[0]
+
+        self._result = dict(results[best], language=best)
+        if not results[best].get('text', '').strip():
+            # Silence: nothing to learn about the language
+            return
+
+        if self.locked:
+            self.segments_since_lock += 1
+            if scores[best] < self.min_confidence or self.segments_since_lock >= self.probe_interval:
+                self._unlock()
+            return
+
+        margin = scores[best] - scores[ranked[1]] if len(ranked) > 1 else 1.0
+        if best == self.language and margin >= self.dominance_margin:
+            self.streak += 1
+        else:
+            self.streak = 1 if margin >= self.dominance_margin else 0
+        self.language = best
+
+        if self.streak >= self.dominance_segments and len(self.active) > 1:
+            # One language clearly dominates: stop decoding the others
+            self.active = [best]
+            self.locked = True
+            self.segments_since_lock = 0
+            print(f"INFO: [code-switch] {best} dominates, pausing other languages")
+
+    def _unlock(self):
+        """Resume decoding with every language (paused recognizers start fresh)"""
+        for language, recognizer in self.recognizers.items():
+            if language not in self.active:
+                recognizer.Reset()
+        self.active = list(self.recognizers)
+        self.locked = False
+        self.streak = 0
+        print("INFO: [code-switch] probing all languages again")
@@ -27,6 +27,12 @@ MODELS = {
         "url": "https://alphacephei.com/vosk/models/vosk-model-te-0.22.zip",
         "directory": "model-Telugu", 
         "size": "~45 MB"
+    },
+    "Speaker": {
+        # Speaker embeddings for "Label speakers" (works with every language model)
+        "url": "https://alphacephei.com/vosk/models/vosk-model-spk-0.4.zip",
+        "directory": "model-spk",
+        "size": "~13 MB"
     }
 }
 
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Pause-based endpointing for WhisperBoard
+Vosk only returns a final result when its own endpointer decides the
+utterance is over, which in dictation can take a second or more of trailing
+silence. PauseEndpointer watches the audio with the silence gate's
+frame-energy detector and finalizes the utterance itself once the speaker
+has paused for long enough. The pause adapts to the speaker: it is kept a
+margin above the gaps they leave between words, so slow speakers are not
+cut mid-sentence and fast ones are not kept waiting.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from silence_gate import SilenceGate
+
+
+class PauseEndpointer:
+    """
+    Recognizer-like wrapper that forces a final result after a pause.
+
+    After speech, once pause_seconds of consecutive silent 10 ms frames have
+    been fed, FinalResult() is taken from the wrapped recognizer and
+    delivered as an ordinary endpoint (AcceptWaveform returns True and
+    Result() returns it). Vosk's own endpoints still pass through.
+
+    With adaptive=True, the silent gaps inside utterances (at least
+    min_gap_seconds, the last max_gaps of them) set the pause to
+    rhythm_factor x their 90th percentile, kept within min_pause and
+    max_pause. Wrap it around all other wrappers, so forced results are
+    rescored and labeled like any other final result.
+    """
+
+    def __init__(self, recognizer, pause_seconds=0.6, adaptive=True, min_pause=0.3, max_pause=1.0,
+                 rhythm_factor=1.5, min_gap_seconds=0.1, max_gaps=50, samplerate=16000):
+        self.recognizer = recognizer
+        self.detector = SilenceGate(samplerate)
+        self.frame_seconds = self.detector.frame / samplerate
+        self.pause_seconds = pause_seconds
+        self.adaptive = adaptive
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self.rhythm_factor = rhythm_factor
+        self.min_gap_frames = int(round(min_gap_seconds / self.frame_seconds))
+        self.gaps = deque(maxlen=max_gaps)  # Seconds of silence between words
+        self.forced = 0
+        self.natural = 0
+        self._in_utterance = False
+        self._trailing = 0  # Silent frames since the last speech frame
+        self._forced_result = None
+
+    @property
+    def trailing_silence(self):
+        return self._trailing * self.frame_seconds
+
+    def _record_gaps(self, gaps):
+        gaps = gaps[gaps >= self.min_gap_frames]
+        if not len(gaps):
+            return
+        self.gaps.extend((gaps * self.frame_seconds).tolist())
+        if self.adaptive and len(self.gaps) >= 5:
+            rhythm = float(np.percentile(self.gaps, 90)) * self.rhythm_factor
+            self.pause_seconds = min(self.max_pause, max(self.min_pause, rhythm))
+
+    def _track(self, data):
+        """Follow speech and silence through one block"""
+        mask = self.detector.speech_mask(np.frombuffer(data, dtype=np.int16))
+        speech = np.flatnonzero(mask)
+        if not len(speech) or (not self._in_utterance and len(speech) < self.detector.min_speech_frames):
+            self._trailing += len(mask)
+            return
+        # Silent runs that speech resumed after, including the one carried over from the last block
+        gaps = np.diff(speech) - 1
+        if self._in_utterance:
+            gaps = np.append(gaps, self._trailing + speech[0])
+        self._record_gaps(gaps)
+        self._in_utterance = True
+        self._trailing = len(mask) - 1 - int(speech[-1])
+
+    def AcceptWaveform(self, data):
+        self._forced_result = None
+        self._track(data)
+        if self.recognizer.AcceptWaveform(data):
+            self.natural += 1
+            self._in_utterance = False
+            return True
+        if self._in_utterance and self.trailing_silence >= self.pause_seconds:
+            self._forced_result = self.recognizer.FinalResult()
+            self.forced += 1
+            self._in_utterance = False
+            return True
+        return False
+
+    def Result(self):
+        if self._forced_result is not None:
+            return self._forced_result
+        return self.recognizer.Result()
+
+    def Reset(self):
+        self._in_utterance = False
+        self._trailing = 0
+        self._forced_result = None
+        self.recognizer.Reset()
+
+    def __getattr__(self, name):
+        # PartialResult, FinalResult, SetSpkModel, close, ... go to the wrapped recognizer
+        return getattr(self.recognizer, name)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Background file transcription jobs for WhisperBoard
+Uploaded files are queued as jobs on a small worker pool, so decoding never
+blocks the Streamlit session: the UI keeps recording live and polls each
+job's progress (audio seconds processed, estimated time remaining) while
+files are transcribed in the background.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_job_ids = itertools.count(1)
+
+
+class FileJob:
+    """One uploaded file waiting for, undergoing or done with transcription"""
+
+    def __init__(self, name, language, audio_file):
+        self.id = next(_job_ids)
+        self.name = name
+        self.language = language
+        self.audio_file = audio_file
+        self.status = QUEUED
+        self.processed_seconds = 0.0
+        self.total_seconds = None
+        self.start_seconds = None  # Where decoding started (later than 0 when resumed)
+        self.started_at = None
+        self.finished_at = None
+        self.text = None
+        self.message = ""
+        self.export_paths = []
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def progress(self):
+        """Fraction of the audio decoded so far (0.0 - 1.0)"""
+        if not self.total_seconds:
+            return 1.0 if self.status == DONE else 0.0
+        return min(1.0, self.processed_seconds / self.total_seconds)
+
+    @property
+    def eta_seconds(self):
+        """Time left at the decoding speed measured so far (None until known)"""
+        if self.status != RUNNING or not self.total_seconds or self.start_seconds is None:
+            return None
+        decoded = self.processed_seconds - self.start_seconds
+        if decoded <= 0:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / decoded * (self.total_seconds - self.processed_seconds)
+
+    def update_progress(self, processed_seconds, total_seconds):
+        if self.start_seconds is None:
+            self.start_seconds = processed_seconds
+        self.processed_seconds = processed_seconds
+        self.total_seconds = total_seconds
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            # Never started: the pool will not run it
+            self.status = CANCELLED
+            self.finished_at = time.time()
+
+
+class JobQueue:
+    """
+    Runs FileJobs on a bounded thread pool.
+
+    Vosk releases the GIL while decoding, so a couple of workers transcribe
+    files in parallel without starving the live recording thread.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-job")
+
+    def submit(self, job, work):
+        """
+        Queue job; work(job) runs on a worker and returns (text, message)
+        like process_audio_file.
+        """
+        job.future = self._executor.submit(self._run, job, work)
+        return job
+
+    @staticmethod
+    def _run(job, work):
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.text, job.message = work(job)
+            if job.cancel_event.is_set():
+                job.status = CANCELLED
+            else:
+                job.status = DONE if job.text else FAILED
+        except Exception as e:
+            job.status = FAILED
+            job.message = f"Error processing file: {str(e)}"
+        finally:
+            job.audio_file = None  # Free the uploaded bytes
+            job.finished_at = time.time()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def format_duration(seconds):
+    """m:ss (or h:mm:ss) for progress displays"""
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
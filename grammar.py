@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Grammar-constrained decoding for WhisperBoard
+Builds a Vosk grammar from a vocabulary or phrase file so that command-style
+input is decoded against a small, fixed set of words instead of the full model.
+"""
+
+import json
+import os
+
+DEFAULT_VOCABULARY = os.path.join("whisperboard", "vocabulary.txt")
+
+
+def load_phrases(path=DEFAULT_VOCABULARY):
+    """Read one word or phrase per line (blank lines and '#' comments are skipped)"""
+    phrases = []
+    seen = set()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            phrase = ' '.join(line.split()).lower()
+            if not phrase or phrase.startswith('#') or phrase in seen:
+                continue
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases
+
+
+def supports_grammar(model_path):
+    """Only models with a runtime (lookahead) graph can be constrained by a grammar"""
+    graph = os.path.join(model_path, 'graph')
+    return (os.path.exists(os.path.join(graph, 'HCLr.fst')) and
+            os.path.exists(os.path.join(graph, 'Gr.fst')))
+
+
+def model_vocabulary(model_path):
+    """Words known to the model, or None if the model does not ship a word list"""
+    words_file = os.path.join(model_path, 'graph', 'words.txt')
+    if not os.path.exists(words_file):
+        return None
+    with open(words_file, encoding='utf-8') as f:
+        return {line.split()[0] for line in f if line.strip()}
+
+
+def build_grammar(phrases, vocabulary=None, allow_unknown=True):
+    """
+    Build the JSON grammar string expected by KaldiRecognizer.
+
+    Phrases containing words the model does not know are dropped (Vosk would
+    otherwise warn and ignore them). With allow_unknown, "[unk]" is added so
+    out-of-grammar speech is not forced onto the closest command.
+    """
+    if vocabulary is not None:
+        phrases = [p for p in phrases if all(word in vocabulary for word in p.split())]
+    if not phrases:
+        raise ValueError("Grammar is empty: none of the phrases are in the model vocabulary")
+    if allow_unknown:
+        phrases = phrases + ["[unk]"]
+    return json.dumps(phrases, ensure_ascii=False)
+
+
+def load_grammar(model_path, phrases_path=DEFAULT_VOCABULARY, allow_unknown=True):
+    """Build a grammar from a phrase file, filtered to the words the model knows"""
+    return build_grammar(load_phrases(phrases_path), model_vocabulary(model_path), allow_unknown)
+
+
+def create_recognizer(model, samplerate=16000, grammar=None):
+    """Create a recognizer for open (grammar=None) or constrained decoding"""
+    import vosk
+    if grammar:
+        recognizer = vosk.KaldiRecognizer(model, samplerate, grammar)
+    else:
+        recognizer = vosk.KaldiRecognizer(model, samplerate)
+    recognizer.SetWords(True)
+    return recognizer
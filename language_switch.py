@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Gapless language switching for WhisperBoard
+Keeps a warm recognizer for every enabled language and routes the live audio
+to one of them. Switching language while recording only changes where the
+next block goes: the capture stream and the worker keep running, so no audio
+is lost, and the switch takes effect on the next block (0.5 s at most).
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+from recognition import shift_times
+
+BYTES_PER_SECOND = 16000 * 2  # 16kHz int16 mono
+
+
+class HotSwitchRecognizer:
+    """
+    Recognizer-like object that decodes with the recognizer of the current
+    language and can be switched from another thread with switch().
+
+    On a switch, the utterance in progress is finalized with the old language
+    (so nothing said before the switch is dropped) and the new recognizer is
+    reset. Each recognizer only counts the audio it was fed, so its word
+    timings are moved by the stream time it missed while inactive. Every
+    final result carries the "language" it was decoded with. When both
+    languages close an utterance on the same block, the old language's result
+    is delivered first and the new one on the next call, each with its own
+    language and speaker embedding.
+    """
+
+    def __init__(self, recognizers, language):
+        self.recognizers = recognizers
+        self.language = language
+        self._requested = language
+        self._requested_at = None
+        self._lock = threading.Lock()
+        self._fed = dict.fromkeys(recognizers, 0)  # Bytes each recognizer has decoded
+        self._offsets = dict.fromkeys(recognizers, 0.0)
+        self._stream = 0  # Bytes of live audio so far
+        self._result = {"text": ""}
+        self._pending = deque()  # Final results still to deliver, oldest first
+        self.switches = 0
+        self.last_switch_seconds = None  # From switch() to the first block decoded in the new language
+
+    def switch(self, language):
+        """Decode the next block in language (called from the UI thread)"""
+        if language not in self.recognizers:
+            raise KeyError(f"No warm recognizer for {language}")
+        with self._lock:
+            if language != self._requested:
+                self._requested = language
+                self._requested_at = time.perf_counter()
+
+    def _final(self, language, result_json):
+        result = shift_times(json.loads(result_json), self._offsets[language])
+        return dict(result, language=language)
+
+    def _activate(self, language):
+        """Close the old language's utterance and make language current"""
+        flushed = self._final(self.language, self.recognizers[self.language].FinalResult())
+        recognizer = self.recognizers[language]
+        recognizer.Reset()
+        # The new recognizer's clock stopped while it was inactive
+        self._offsets[language] = (self._stream - self._fed[language]) / BYTES_PER_SECOND
+        self.language = language
+        self.switches += 1
+        return flushed
+
+    def AcceptWaveform(self, data):
+        with self._lock:
+            requested, requested_at = self._requested, self._requested_at
+        flushed = None
+        if requested != self.language:
+            flushed = self._activate(requested)
+
+        recognizer = self.recognizers[self.language]
+        endpoint = recognizer.AcceptWaveform(data)
+        self._fed[self.language] += len(data)
+        self._stream += len(data)
+        if flushed is not None and requested_at is not None:
+            self.last_switch_seconds = time.perf_counter() - requested_at
+
+        if flushed is not None and flushed.get('text', '').strip():
+            self._pending.append(flushed)
+        if endpoint:
+            self._pending.append(self._final(self.language, recognizer.Result()))
+        if not self._pending:
+            return False
+        self._result = self._pending.popleft()
+        return True
+
+    def Result(self):
+        return json.dumps(self._result, ensure_ascii=False)
+
+    def PartialResult(self):
+        return self.recognizers[self.language].PartialResult()
+
+    def FinalResult(self):
+        if self._pending:
+            # A result from the last block is still owed; the utterance in progress carries on
+            self._result = self._pending.popleft()
+        else:
+            self._result = self._final(self.language, self.recognizers[self.language].FinalResult())
+        return self.Result()
+
+    def Reset(self):
+        self._pending.clear()
+        for recognizer in self.recognizers.values():
+            recognizer.Reset()
+
+    def SetSpkModel(self, speaker_model):
+        # Embeddings from every language's recognizer feed the same speaker clustering
+        for recognizer in self.recognizers.values():
+            recognizer.SetSpkModel(speaker_model)
+
+    def close(self):
+        # Recognizers from a RecognizerPool hold a session in a worker process
+        for recognizer in self.recognizers.values():
+            close = getattr(recognizer, 'close', None)
+            if close:
+                close()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Native-rate microphone capture for WhisperBoard
+Opens input devices at their own default sample rate (USB and Bluetooth
+microphones usually run at 44.1 or 48kHz) instead of asking PortAudio for
+16kHz, and converts each captured block to the 16kHz int16 mono the models
+expect with the streaming resampler, timing the conversion as it goes.
+
+Run directly to measure every input device (or one with --device): native
+rate, whether it accepts 16kHz at all, resampling CPU load and the capture
+latency of the live pipeline. Without a working audio system, the resampling
+cost is measured on synthetic blocks at the common native rates instead.
+
+Usage:
+    python live_capture.py
+    python live_capture.py --device 2 --seconds 10
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from resampler import TARGET_RATE, MultiChannelResampler, StreamingResampler, to_int16
+
+BLOCK_SECONDS = 0.5  # 8000 samples at 16kHz, the live block size the apps always used
+COMMON_RATES = [16000, 22050, 32000, 44100, 48000, 96000]
+
+
+class NativeRateCapture:
+    """
+    Captures one input device at its native rate and puts 16kHz int16 blocks
+    (as bytes) on audio_queue, ready for the recognition loop. With channels
+    above 1 every channel is captured and each queued block is instead a
+    (channels, samples) int16 array, one contiguous row per channel.
+
+    Devices that already run at 16kHz pass straight through. cpu_load is the
+    resampling time per second of audio; latency_seconds is how long after
+    capture a sample reaches the queue (PortAudio's measured input latency
+    plus the block length and the resampling filter's look-ahead).
+    """
+
+    def __init__(self, audio_queue, device=None, block_seconds=BLOCK_SECONDS, channels=1):
+        import sounddevice as sd
+        self._sd = sd
+        info = sd.query_devices(device, 'input')
+        self.device = device
+        self.name = info['name']
+        self.samplerate = int(info['default_samplerate'])
+        self.blocksize = int(self.samplerate * block_seconds)
+        self.channels = channels
+        self.audio_queue = audio_queue
+        if channels > 1:
+            self.resampler = MultiChannelResampler(self.samplerate, channels)
+        else:
+            self.resampler = StreamingResampler(self.samplerate, TARGET_RATE)
+        self.cpu_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.input_latency = None  # Measured by PortAudio once the stream runs
+
+    def __str__(self):
+        channels = f", {self.channels} channels" if self.channels > 1 else ""
+        return f"{self.name} @ {self.samplerate}Hz{channels}"
+
+    @property
+    def resampling(self):
+        return self.samplerate != TARGET_RATE
+
+    @property
+    def cpu_load(self):
+        return self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    @property
+    def latency_seconds(self):
+        input_latency = self.input_latency or 0.0
+        return input_latency + self.blocksize / self.samplerate + self.resampler.delay_seconds
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"Audio status: {status}", file=sys.stderr)
+        start = time.thread_time()
+        if self.channels > 1:
+            block = self.resampler.process(np.frombuffer(indata, dtype=np.int16).reshape(-1, self.channels))
+        elif self.resampling:
+            block = to_int16(self.resampler.process(np.frombuffer(indata, dtype=np.int16))).tobytes()
+        else:
+            block = bytes(indata)
+        self.cpu_seconds += time.thread_time() - start
+        self.audio_seconds += frames / self.samplerate
+        # Some host APIs leave the timestamps at zero
+        if time_info.inputBufferAdcTime > 0:
+            self.input_latency = time_info.currentTime - time_info.inputBufferAdcTime
+        self.audio_queue.put(block)
+
+    def stream(self):
+        """An sd.RawInputStream to use as a context manager around the recognition loop"""
+        return self._sd.RawInputStream(samplerate=self.samplerate, blocksize=self.blocksize,
+                                       device=self.device, dtype='int16', channels=self.channels,
+                                       callback=self._callback)
+
+    def summary(self):
+        """One-line description of the capture for status messages"""
+        if not self.resampling:
+            return f"{self.name}: native 16kHz, no resampling"
+        return (f"{self.name}: {self.samplerate}Hz → 16kHz, resampling {self.cpu_load:.2%} CPU, "
+                f"~{self.latency_seconds * 1000:.0f} ms capture latency")
+
+
+def accepts_16k(device):
+    """Whether PortAudio would open the device directly at 16kHz"""
+    import sounddevice as sd
+    try:
+        sd.check_input_settings(device=device, samplerate=TARGET_RATE, channels=1, dtype='int16')
+        return True
+    except Exception:
+        return False
+
+
+def measure_device(device, seconds):
+    import queue
+    capture = NativeRateCapture(queue.Queue(), device)
+    with capture.stream():
+        time.sleep(seconds)
+    return capture
+
+
+def measure_synthetic(seconds):
+    """Resampling cost per native rate on noise blocks, without an audio device"""
+    rng = np.random.default_rng(0)
+    print(f"{'Native rate':>11} | {'CPU load':>8} | {'filter delay':>12} | {'latency':>8}")
+    print("-" * 50)
+    for rate in COMMON_RATES:
+        resampler = StreamingResampler(rate, TARGET_RATE)
+        blocksize = int(rate * BLOCK_SECONDS)
+        blocks = [rng.integers(-3000, 3000, blocksize).astype(np.int16)
+                  for _ in range(int(seconds / BLOCK_SECONDS))]
+        start = time.process_time()
+        for block in blocks:
+            if rate != TARGET_RATE:
+                to_int16(resampler.process(block)).tobytes()
+        cpu = time.process_time() - start
+        latency = BLOCK_SECONDS + resampler.delay_seconds
+        print(f"{rate:>9}Hz | {cpu / seconds:8.3%} | {resampler.delay_seconds * 1000:9.2f} ms | "
+              f"{latency * 1000:5.0f} ms")
+    print("\n(latency = block length + filter look-ahead; PortAudio's input latency comes on top)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Native-rate capture benchmark")
+    parser.add_argument('--device', type=int, help="Input device index (default: every input device)")
+    parser.add_argument('--seconds', type=float, default=5, help="Capture time per device")
+    args = parser.parse_args()
+
+    print("🎙️ WhisperBoard Native-Rate Capture")
+    print("=" * 70)
+    try:
+        import sounddevice as sd
+        devices = [args.device] if args.device is not None else [
+            i for i, device in enumerate(sd.query_devices()) if device['max_input_channels'] > 0]
+    except Exception as e:
+        print(f"(No audio system available: {e})")
+        print("Measuring the resampling cost on synthetic audio instead\n")
+        measure_synthetic(max(args.seconds, 60))
+        return
+
+    for device in devices:
+        try:
+            capture = measure_device(device, args.seconds)
+        except Exception as e:
+            print(f"❌ Device {device}: {e}")
+            continue
+        direct = "yes" if accepts_16k(device) else "no"
+        print(f"🎤 Device {device}: {capture}")
+        print(f"   • opens at 16kHz directly: {direct}")
+        print(f"   • resampling: {capture.cpu_load:.3%} CPU "
+              f"({capture.cpu_seconds * 1000:.1f} ms for {capture.audio_seconds:.1f} s of audio)")
+        input_latency = f"{capture.input_latency * 1000:.0f} ms" if capture.input_latency else "not reported"
+        print(f"   • latency: {capture.latency_seconds * 1000:.0f} ms "
+              f"(input {input_latency}, block {BLOCK_SECONDS * 1000:.0f} ms, "
+              f"filter {capture.resampler.delay_seconds * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
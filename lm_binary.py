@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Compact memory-mapped binary format for ARPA n-gram language models
+Compiles a text ARPA file (e.g. whisperboard/lm.arpa) once into an
+array-backed binary layout and loads it with np.memmap, so startup does no
+parsing and the pages are shared between every process that opens the file.
+
+File layout (all arrays little-endian, 8-byte aligned):
+    b"WBLM" | uint32 version | uint32 header length | JSON header | arrays
+
+The JSON header records the model order, the bits used per word id and the
+dtype, byte offset and shape of every array:
+    vocab_blob, vocab_offsets   sorted vocabulary (UTF-8 bytes + offsets)
+    keys{n}                     sorted n-gram keys (word ids packed in a uint64)
+    prob{n}, bo{n}              8-bit quantized log10 probabilities / backoffs
+    prob_codebook{n}, ...       float32 values the 8-bit codes map to
+
+Usage:
+    python lm_binary.py whisperboard/lm.arpa
+    python lm_binary.py whisperboard/lm.arpa --query "vosk is a speech recognition toolkit"
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"WBLM"
+VERSION = 1
+ALIGNMENT = 8
+QUANTIZATION_BITS = 8
+UNK = "<unk>"
+BOS = "<s>"
+EOS = "</s>"
+BINARY_SUFFIX = ".wblm"
+
+
+# --- COMPILER ---
+def parse_arpa(arpa_path):
+    """Parse an ARPA file into {order: [(words, logprob, backoff), ...]}"""
+    ngrams = {}
+    order = None
+    with open(arpa_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('\\data\\') or line.startswith('ngram '):
+                continue
+            if line == '\\end\\':
+                break
+            if line.startswith('\\') and line.endswith('-grams:'):
+                order = int(line[1:line.index('-')])
+                ngrams[order] = []
+                continue
+            if order is None:
+                continue
+
+            parts = line.split()
+            words = tuple(parts[1:1 + order])
+            backoff = float(parts[1 + order]) if len(parts) > 1 + order else 0.0
+            ngrams[order].append((words, float(parts[0]), backoff))
+    if 1 not in ngrams:
+        raise ValueError(f"{arpa_path} has no unigram section")
+    return ngrams
+
+
+def quantize(values, bits=QUANTIZATION_BITS):
+    """
+    Map float values to `bits`-bit codes and a codebook of representative values.
+
+    Values are split into equal-population bins (the codebook holds each bin's
+    mean), so dense regions of the distribution get the most resolution.
+    """
+    levels = 1 << bits
+    values = np.asarray(values, dtype=np.float64)
+    unique = np.unique(values)
+    if len(unique) <= levels:
+        codebook = unique
+        codes = np.searchsorted(unique, values)
+    else:
+        sorted_values = np.sort(values)
+        edges = np.linspace(0, len(sorted_values), levels + 1).astype(np.int64)
+        codebook = np.array([sorted_values[a:b].mean() for a, b in zip(edges[:-1], edges[1:])])
+        boundaries = (codebook[:-1] + codebook[1:]) / 2
+        codes = np.searchsorted(boundaries, values)
+
+    padded = np.zeros(levels, dtype=np.float32)
+    padded[:len(codebook)] = codebook
+    return codes.astype(np.uint8 if bits <= 8 else np.uint16), padded
+
+
+def pack_keys(ids, bits):
+    """Pack rows of word ids (shape [k, n]) into one sortable uint64 key per row"""
+    ids = np.asarray(ids, dtype=np.uint64)
+    keys = np.zeros(ids.shape[0], dtype=np.uint64)
+    for column in range(ids.shape[1]):
+        keys = (keys << np.uint64(bits)) | ids[:, column]
+    return keys
+
+
+def compile_arpa(arpa_path, out_path=None):
+    """Compile an ARPA file to the binary format and return the output path"""
+    out_path = out_path or os.path.splitext(arpa_path)[0] + BINARY_SUFFIX
+    ngrams = parse_arpa(arpa_path)
+    order = max(ngrams)
+
+    # Sorted vocabulary: a word's id is its index
+    if UNK not in {words[0] for words, _, _ in ngrams[1]}:
+        ngrams[1].append(((UNK,), -100.0, 0.0))
+    vocab = sorted({words[0] for words, _, _ in ngrams[1]}, key=lambda w: w.encode('utf-8'))
+    word_ids = {word: i for i, word in enumerate(vocab)}
+
+    bits = max(1, int(len(vocab)).bit_length())
+    if bits * order > 64:
+        raise ValueError(f"{len(vocab)} words x order {order} does not fit in 64-bit keys")
+
+    encoded = [word.encode('utf-8') for word in vocab]
+    arrays = {
+        'vocab_blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        'vocab_offsets': np.concatenate([[0], np.cumsum([len(w) for w in encoded])]).astype(np.uint64)
+    }
+
+    counts = []
+    for n in range(1, order + 1):
+        entries = [e for e in ngrams.get(n, []) if all(w in word_ids for w in e[0])]
+        ids = np.array([[word_ids[w] for w in words] for words, _, _ in entries],
+                       dtype=np.uint64).reshape(len(entries), n)
+        keys = pack_keys(ids, bits)
+        sort = np.argsort(keys, kind='stable')
+        arrays[f'keys{n}'] = keys[sort]
+
+        probs = np.array([p for _, p, _ in entries])[sort]
+        arrays[f'prob{n}'], arrays[f'prob_codebook{n}'] = quantize(probs)
+        if n < order:
+            backoffs = np.array([b for _, _, b in entries])[sort]
+            arrays[f'bo{n}'], arrays[f'bo_codebook{n}'] = quantize(backoffs)
+        counts.append(len(entries))
+
+    header = {
+        'order': order,
+        'bits': bits,
+        'counts': counts,
+        'unk_id': word_ids[UNK],
+        'bos_id': word_ids.get(BOS),
+        'eos_id': word_ids.get(EOS),
+        'arrays': {}
+    }
+
+    # Lay the arrays out after the header; offsets are relative to the file start
+    header_size = 12
+    while True:
+        offset = _align(header_size)
+        for name, array in arrays.items():
+            header['arrays'][name] = {
+                'dtype': array.dtype.str, 'offset': offset, 'shape': list(array.shape)
+            }
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode('utf-8')
+        if 12 + len(header_bytes) <= header_size:
+            break
+        header_size = 12 + len(header_bytes)
+
+    with open(out_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<II', VERSION, len(header_bytes)) + header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).astype(array.dtype.newbyteorder('<')).tobytes())
+    return out_path
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# --- LOADER ---
+class BinaryLM:
+    """
+    Zero-copy view of a compiled language model.
+
+    Opening the file only reads the JSON header; every table is a view into a
+    read-only shared memory map, so the OS pages data in on demand and several
+    processes loading the same file share one copy in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if self._map[:4].tobytes() != MAGIC:
+            raise ValueError(f"{path} is not a WhisperBoard binary LM")
+        version, header_len = struct.unpack('<II', self._map[4:12].tobytes())
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported version {version}")
+        header = json.loads(self._map[12:12 + header_len].tobytes().decode('utf-8'))
+
+        self.order = header['order']
+        self.bits = header['bits']
+        self.counts = header['counts']
+        self.unk_id = header['unk_id']
+        self.bos_id = header['bos_id']
+        self.eos_id = header['eos_id']
+
+        self.arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            nbytes = int(np.prod(spec['shape'], dtype=np.int64)) * dtype.itemsize
+            # Plain ndarray views of the map: still zero-copy, without memmap's per-slice overhead
+            view = self._map[spec['offset']:spec['offset'] + nbytes].view(np.ndarray).view(dtype)
+            self.arrays[name] = view.reshape(spec['shape'])
+
+        self._vocab_blob = self.arrays['vocab_blob']
+        self._vocab_offsets = self.arrays['vocab_offsets']
+        self.vocab_size = len(self._vocab_offsets) - 1
+        self._id_cache = {}
+
+    def word(self, word_id):
+        start, end = self._vocab_offsets[word_id], self._vocab_offsets[word_id + 1]
+        return self._vocab_blob[start:end].tobytes().decode('utf-8')
+
+    def word_id(self, word):
+        """Binary search the sorted vocabulary, memoizing results (unknown words map to <unk>)"""
+        cached = self._id_cache.get(word)
+        if cached is not None:
+            return cached
+        word_id = self._search_vocab(word.encode('utf-8'))
+        self._id_cache[word] = word_id
+        return word_id
+
+    def _search_vocab(self, target):
+        lo, hi = 0, self.vocab_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._vocab_offsets[mid], self._vocab_offsets[mid + 1]
+            candidate = self._vocab_blob[start:end].tobytes()
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return mid
+        return self.unk_id
+
+    def _lookup(self, n, keys):
+        """Vectorized search of packed keys in the order-n table: (found mask, index)"""
+        table = self.arrays[f'keys{n}']
+        if len(table) == 0:
+            return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=np.int64)
+        index = np.minimum(np.searchsorted(table, keys), len(table) - 1)
+        return table[index] == keys, index
+
+    def _values(self, kind, n, index):
+        return self.arrays[f'{kind}_codebook{n}'][self.arrays[f'{kind}{n}'][index]]
+
+    def score_positions(self, history, words):
+        """
+        log10 P(word | history) for many positions at once.
+
+        history is an int array [k, order-1] of preceding word ids (most recent
+        last, -1 where the sentence has no earlier word), words an int array [k].
+        Standard ARPA backoff: use the longest n-gram present and add the
+        backoff weights of every longer context that was missing.
+        """
+        words = np.asarray(words, dtype=np.int64)
+        history = np.asarray(history, dtype=np.int64).reshape(len(words), self.order - 1)
+        scores = np.zeros(len(words), dtype=np.float64)
+        done = np.zeros(len(words), dtype=bool)
+
+        for n in range(self.order, 0, -1):
+            context = history[:, self.order - n:] if n > 1 else history[:, :0]
+            valid = ~done & np.all(context >= 0, axis=1)
+            if not valid.any():
+                continue
+
+            rows = np.flatnonzero(valid)
+            ngram = np.column_stack([context[rows], words[rows]])
+            found, index = self._lookup(n, pack_keys(ngram, self.bits))
+            scores[rows[found]] += self._values('prob', n, index[found])
+            done[rows[found]] = True
+
+            if n > 1:
+                # Back off: add the weight of the (n-1)-word context, if it is listed
+                missing = rows[~found]
+                ctx_found, ctx_index = self._lookup(n - 1, pack_keys(context[missing], self.bits))
+                scores[missing[ctx_found]] += self._values('bo', n - 1, ctx_index[ctx_found])
+        return scores
+
+    def score_batch(self, sentences, bos=True, eos=True):
+        """Total log10 probability of each tokenized sentence, scored in one vectorized pass"""
+        histories, words, owners = [], [], []
+        for i, tokens in enumerate(sentences):
+            ids = [self.word_id(token) for token in tokens]
+            if bos and self.bos_id is not None:
+                ids.insert(0, self.bos_id)
+            if eos and self.eos_id is not None:
+                ids.append(self.eos_id)
+            start = 1 if bos and self.bos_id is not None else 0
+            padded = [-1] * (self.order - 1) + ids
+            for p in range(start, len(ids)):
+                histories.append(padded[p:p + self.order - 1])
+                words.append(ids[p])
+                owners.append(i)
+
+        if not words:
+            return np.zeros(len(sentences))
+        scores = self.score_positions(np.array(histories).reshape(len(words), self.order - 1), words)
+        return np.bincount(owners, weights=scores, minlength=len(sentences))
+
+    def score(self, tokens, bos=True, eos=True):
+        return float(self.score_batch([tokens], bos, eos)[0])
+
+
+def load_lm(arpa_path):
+    """Load the binary form of an ARPA file, (re)compiling it if missing or stale"""
+    binary_path = os.path.splitext(arpa_path)[0] + BINARY_SUFFIX
+    if (not os.path.exists(binary_path) or
+            os.path.getmtime(binary_path) < os.path.getmtime(arpa_path)):
+        compile_arpa(arpa_path, binary_path)
+    return BinaryLM(binary_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile an ARPA language model to WhisperBoard's binary format")
+    parser.add_argument('arpa', help="Input ARPA file")
+    parser.add_argument('-o', '--output', help=f"Output file (default: <arpa>{BINARY_SUFFIX})")
+    parser.add_argument('--query', action='append', default=[], help="Sentence to score after compiling")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out_path = compile_arpa(args.arpa, args.output)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lm = BinaryLM(out_path)
+    load_time = time.perf_counter() - start
+
+    print(f"✅ Compiled {args.arpa} → {out_path} in {compile_time * 1000:.1f} ms")
+    print(f"   • Order: {lm.order}, vocabulary: {lm.vocab_size} words, n-grams: {lm.counts}")
+    print(f"   • Size: {os.path.getsize(args.arpa)} bytes ARPA → {os.path.getsize(out_path)} bytes binary")
+    print(f"   • Load time: {load_time * 1000:.2f} ms")
+    for sentence in args.query:
+        print(f"   • log10 P({sentence!r}) = {lm.score(sentence.lower().split()):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-session load tester for WhisperBoard
+Spins up N simulated live sessions from recorded WAV files against one shared
+Vosk model per language, using the same recognition loop as app.py, and ramps N
+to find how many simultaneous sessions one server can hold.
+
+Usage:
+    python load_test.py recording.wav
+    python load_test.py en.wav --language English --sessions 1,2,4,8,16
+    python load_test.py en.wav --processes 4     # decode in a RecognizerPool
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import vosk
+
+from grammar import create_recognizer
+from recognition import recognition_loop
+from recognizer_pool import RecognizerPool
+from wav_reader import WavAudio
+
+# Audio configuration (matches the live worker in app.py)
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 8000
+BLOCK_SECONDS = BLOCK_SIZE / SAMPLE_RATE
+
+MODELS = {
+    "English": "model-English",
+    "Hindi": "model-Hindi",
+    "Telugu": "model-Telugu"
+}
+
+
+def load_wav_samples(path):
+    """Memory-map a 16-bit WAV file as 16kHz int16 mono samples (resampled if needed)"""
+    blocks = list(WavAudio.open(path).blocks())
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (None if it cannot be measured)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+class TimedAudioQueue(queue.Queue):
+    """Audio queue that remembers when the most recently dequeued block was captured"""
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self.last_capture_time = None
+
+    def put_block(self, data):
+        self.put_nowait((time.perf_counter(), data))
+
+    def get(self, block=True, timeout=None):
+        captured, data = super().get(block, timeout)
+        self.last_capture_time = captured
+        return data
+
+
+class LatencyRecorder:
+    """Stands in for the UI text queue and timestamps every result the loop emits"""
+
+    def __init__(self, audio_queue):
+        self.audio_queue = audio_queue
+        self.partial_latencies = []
+        self.final_latencies = []
+
+    def put(self, message):
+        latency = time.perf_counter() - self.audio_queue.last_capture_time
+        if message["type"] == "partial":
+            self.partial_latencies.append(latency)
+        elif message["type"] == "final":
+            self.final_latencies.append(latency)
+
+
+class SimulatedSession:
+    """One simulated live session: a real-time audio feeder plus a recognition worker"""
+
+    def __init__(self, new_recognizer, samples, duration, start_delay, max_backlog):
+        self.new_recognizer = new_recognizer
+        self.samples = samples
+        self.duration = duration
+        self.start_delay = start_delay
+        self.audio_queue = TimedAudioQueue(maxsize=max(1, int(max_backlog / BLOCK_SECONDS)))
+        self.results = LatencyRecorder(self.audio_queue)
+        self.stop_event = threading.Event()
+        self.dropped_blocks = 0
+        self.cpu_seconds = 0.0  # CPU time of this session's recognition worker thread
+        self.threads = []
+
+    def start(self):
+        self.recognizer = self.new_recognizer()
+        self.threads = [
+            threading.Thread(target=self._work, daemon=True),
+            threading.Thread(target=self._feed, daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        getattr(self.recognizer, 'close', lambda: None)()
+
+    def _work(self):
+        cpu_start = time.thread_time()
+        recognition_loop(self.recognizer, self.audio_queue, self.results, self.stop_event)
+        self.cpu_seconds = time.thread_time() - cpu_start
+
+    def _feed(self):
+        """Deliver audio blocks at real-time pace, dropping them when the worker falls behind"""
+        time.sleep(self.start_delay)
+        n_blocks = int(self.duration / BLOCK_SECONDS)
+        offset = np.random.randint(0, len(self.samples))
+        started = time.perf_counter()
+
+        for k in range(n_blocks):
+            # Wait until this block would have been captured by a microphone
+            delay = started + (k + 1) * BLOCK_SECONDS - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            idx = (offset + np.arange(k * BLOCK_SIZE, (k + 1) * BLOCK_SIZE)) % len(self.samples)
+            try:
+                self.audio_queue.put_block(self.samples[idx].tobytes())
+            except queue.Full:
+                self.dropped_blocks += 1
+
+        # Let the worker drain what it already has before stopping it
+        deadline = time.perf_counter() + 10
+        while not self.audio_queue.empty() and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        self.stop_event.set()
+
+    @property
+    def dropped_seconds(self):
+        return self.dropped_blocks * BLOCK_SECONDS
+
+
+def run_level(new_recognizer, samples, n_sessions, args, baseline_rss=None):
+    """
+    Run n_sessions concurrent sessions and collect their metrics. Memory per
+    session is the growth of RSS over baseline_rss (the loaded models, which
+    every session shares) divided by the number of sessions.
+    """
+    sessions = [
+        SimulatedSession(
+            new_recognizer, samples, args.duration,
+            start_delay=BLOCK_SECONDS * i / n_sessions,
+            max_backlog=args.max_backlog
+        )
+        for i in range(n_sessions)
+    ]
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    partials = [l for s in sessions for l in s.results.partial_latencies]
+    finals = [l for s in sessions for l in s.results.final_latencies]
+    rss = current_rss_mb()
+    return {
+        'sessions': sessions,
+        'partial_p50': percentile(partials, 50),
+        'partial_p95': percentile(partials, 95),
+        'final_p50': percentile(finals, 50),
+        'final_p95': percentile(finals, 95),
+        'dropped': sum(s.dropped_seconds for s in sessions),
+        'cpu_percent': 100 * cpu / wall,
+        'session_cpu_percent': 100 * sum(s.cpu_seconds for s in sessions) / n_sessions / wall,
+        'rss_mb': rss,
+        'session_rss_mb': (rss - baseline_rss) / n_sessions if rss is not None and baseline_rss is not None else None
+    }
+
+
+def is_sustainable(level, args):
+    """A level is sustainable if no audio was dropped and latency stayed within budget"""
+    if level['dropped'] > 0:
+        return False
+    # NaN (no results of that type, e.g. Telugu partials) never fails the check
+    if level['partial_p95'] > args.max_partial_latency:
+        return False
+    if level['final_p95'] > args.max_final_latency:
+        return False
+    return True
+
+
+def print_sessions(level):
+    for i, session in enumerate(level['sessions'], 1):
+        partial = session.results.partial_latencies
+        final = session.results.final_latencies
+        print(f"      session {i:3}: partial p95 {percentile(partial, 95) * 1000:7.0f} ms | "
+              f"final p95 {percentile(final, 95) * 1000:7.0f} ms | "
+              f"dropped {session.dropped_seconds:5.1f} s | "
+              f"worker CPU {session.cpu_seconds:6.2f} s")
+
+
+def test_language(language, model_path, samples, args):
+    """
+    Ramp concurrency for one language model and return the maximum
+    sustainable level with its metrics (None for the level if none was)
+    """
+    print(f"\n🎙️ Load testing {language} model ({model_path})")
+    print("=" * 118)
+
+    if not os.path.exists(model_path):
+        print(f"⚠️  {language} model directory not found: {model_path}")
+        return None
+
+    pool = None
+    if args.processes:
+        # Models load in every worker process up front, outside the measurements
+        pool = RecognizerPool(args.processes, preload=[model_path])
+        new_recognizer = lambda: pool.recognizer(model_path, SAMPLE_RATE)
+        print(f"Decoding in {args.processes} worker processes (CPU % and RSS are this process only)")
+    else:
+        model = vosk.Model(model_path)
+        new_recognizer = lambda: create_recognizer(model, SAMPLE_RATE)
+    baseline_rss = current_rss_mb()
+    print(f"{'N':>4} | {'partial p50/p95 (ms)':>22} | {'final p50/p95 (ms)':>20} | "
+          f"{'dropped (s)':>11} | {'CPU %':>5} | {'per session':>11} | {'RSS (MB)':>8} | "
+          f"{'per session':>11} | status")
+    print("-" * 118)
+
+    best, best_level = 0, None
+    for n_sessions in args.sessions:
+        level = run_level(new_recognizer, samples, n_sessions, args, baseline_rss)
+        ok = is_sustainable(level, args)
+        rss = f"{level['rss_mb']:8.0f}" if level['rss_mb'] is not None else f"{'n/a':>8}"
+        session_rss = f"{level['session_rss_mb']:8.1f} MB" if level['session_rss_mb'] is not None else f"{'n/a':>11}"
+        print(f"{n_sessions:4} | {level['partial_p50'] * 1000:10.0f} / {level['partial_p95'] * 1000:9.0f} | "
+              f"{level['final_p50'] * 1000:8.0f} / {level['final_p95'] * 1000:9.0f} | "
+              f"{level['dropped']:11.1f} | {level['cpu_percent']:5.0f} | {level['session_cpu_percent']:9.1f} % | "
+              f"{rss} | {session_rss} | {'✅' if ok else '❌'}")
+        if args.verbose:
+            print_sessions(level)
+
+        if not ok:
+            break
+        best, best_level = n_sessions, level
+
+    if pool:
+        pool.close()
+    return best, best_level
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load tester for WhisperBoard")
+    parser.add_argument('wav_files', nargs='+', help="Recorded WAV files to replay (16-bit mono)")
+    parser.add_argument('--language', action='append', choices=list(MODELS.keys()),
+                        help="Language model(s) to test (default: all installed)")
+    parser.add_argument('--sessions', default="1,2,4,8,12,16,24,32",
+                        help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument('--duration', type=float, default=20.0,
+                        help="Seconds of audio each simulated session streams")
+    parser.add_argument('--max-backlog', type=float, default=2.0,
+                        help="Seconds of audio a session may buffer before blocks are dropped")
+    parser.add_argument('--max-partial-latency', type=float, default=0.5,
+                        help="p95 partial latency budget in seconds")
+    parser.add_argument('--max-final-latency', type=float, default=1.5,
+                        help="p95 final latency budget in seconds")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="Decode in a pool of this many worker processes (default: threads in this process)")
+    parser.add_argument('--verbose', action='store_true', help="Print per-session metrics")
+    args = parser.parse_args()
+    args.sessions = sorted(int(n) for n in args.sessions.split(',') if n.strip())
+    return args
+
+
+def main():
+    args = parse_args()
+    vosk.SetLogLevel(-1)
+
+    print("🔥 WhisperBoard Multi-Session Load Test")
+    print("=" * 100)
+
+    samples = np.concatenate([load_wav_samples(path) for path in args.wav_files])
+    print(f"Loaded {len(samples) / SAMPLE_RATE:.1f} s of audio from {len(args.wav_files)} file(s)")
+    print(f"Each session streams {args.duration:.0f} s in {BLOCK_SECONDS:.1f} s blocks")
+
+    languages = args.language or list(MODELS.keys())
+    results = {}
+    for language in languages:
+        results[language] = test_language(language, MODELS[language], samples, args)
+
+    print("\n" + "=" * 118)
+    print("🏁 MAXIMUM SUSTAINABLE CONCURRENCY:")
+    print("=" * 118)
+    for language, result in results.items():
+        if result is None:
+            print(f"{language:10} | model not installed")
+            continue
+        best, level = result
+        cost = ""
+        if level is not None:
+            # What each session costs at that level, to size a server by session count
+            memory = f", {level['session_rss_mb']:.1f} MB" if level['session_rss_mb'] is not None else ""
+            cost = f" ({level['session_cpu_percent']:.1f}% CPU{memory} per session)"
+        if best == args.sessions[-1]:
+            print(f"{language:10} | ≥ {best} sessions{cost} (increase --sessions to find the limit)")
+        else:
+            print(f"{language:10} | {best} sessions{cost}")
+
+
+if __name__ == "__main__":
+    main()
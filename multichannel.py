@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Per-channel transcription of multichannel input for WhisperBoard
+Meeting-room interfaces put one microphone on each input channel. Instead of
+capturing a single channel, every channel is captured in one stream,
+de-interleaved with NumPy and decoded by its own recognizer, all channels
+concurrently on a thread pool (Vosk releases the GIL while decoding). Results
+carry their channel and word times, so they merge into one timestamped
+transcript labeled by channel.
+
+Run directly to check that a machine keeps up: a multichannel WAV (or a
+mono/stereo one replicated with --channels) is decoded as fast as possible
+and the real-time factor is reported with the pool and with a single thread.
+
+Usage:
+    python multichannel.py meeting-8ch.wav --model model-English
+    python multichannel.py interview.wav --channels 8
+"""
+
+import argparse
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from audio_feed import as_waveform, pcm_view
+from grammar import create_recognizer
+from recognition import flush_block, process_block
+from resampler import TARGET_RATE, MultiChannelResampler
+from transcript_export import format_timestamp
+
+BLOCK_SECONDS = 0.5
+
+
+def channel_label(channel):
+    return f"Ch {channel + 1}"
+
+
+class _ChannelQueue:
+    """Tags every message put on the shared text queue with its channel"""
+
+    def __init__(self, text_queue_ref, channel):
+        self.text_queue_ref = text_queue_ref
+        self.channel = channel
+
+    def put(self, message):
+        self.text_queue_ref.put(dict(message, channel=self.channel))
+
+
+class MultiChannelRecognizer:
+    """
+    One recognizer per input channel, fed concurrently.
+
+    process() takes a (channels, samples) int16 block with one contiguous row
+    per channel and pushes the usual partial/final messages, each with a
+    "channel" index. on_result receives final Vosk results with a "channel"
+    key added.
+    """
+
+    def __init__(self, model, channels, samplerate=TARGET_RATE, grammar=None, max_workers=None):
+        self.channels = channels
+        self.recognizers = [create_recognizer(model, samplerate, grammar) for _ in range(channels)]
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or channels,
+                                            thread_name_prefix="channel")
+
+    def _labeled(self, on_result, channel):
+        if on_result is None:
+            return None
+        return lambda result: on_result(dict(result, channel=channel))
+
+    def process(self, block, text_queue_ref, on_result=None):
+        futures = [
+            self._executor.submit(process_block, recognizer, as_waveform(pcm_view(block[channel])),
+                                  _ChannelQueue(text_queue_ref, channel), self._labeled(on_result, channel))
+            for channel, recognizer in enumerate(self.recognizers)
+        ]
+        for future in futures:
+            future.result()
+
+    def finish(self, text_queue_ref, on_result=None):
+        """Flush the last utterance of every channel"""
+        for channel, recognizer in enumerate(self.recognizers):
+            segment = flush_block(recognizer)
+            if segment.text:
+                text_queue_ref.put(dict(segment.message(), channel=channel))
+                if on_result:
+                    on_result(dict(segment.result, channel=channel))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def multichannel_loop(recognizer, audio_queue, text_queue_ref, stop_event, on_result=None):
+    """recognition_loop for (channels, samples) blocks from a multichannel capture"""
+    while not stop_event.is_set():
+        try:
+            block = audio_queue.get(timeout=0.1)
+            recognizer.process(block, text_queue_ref, on_result)
+        except queue.Empty:
+            continue
+        except Exception as e:
+            print(f"Error in multichannel recognition loop: {e}", file=sys.stderr)
+            # The recognizers may be mid-block: leave them unflushed
+            return
+    recognizer.finish(text_queue_ref, on_result)
+
+
+def merged_transcript(segments):
+    """One line per segment in start-time order: "[00:01:02.500] Ch 2: text" """
+    timed = sorted(segments, key=lambda segment: (segment.get('start') is None, segment.get('start') or 0.0,
+                                                  segment.get('channel', 0)))
+    lines = []
+    for segment in timed:
+        stamp = f"[{format_timestamp(segment['start'], '.')}] " if segment.get('start') is not None else ""
+        label = f"{channel_label(segment['channel'])}: " if 'channel' in segment else ""
+        lines.append(f"{stamp}{label}{segment['text']}")
+    return '\n'.join(lines)
+
+
+def wav_channel_blocks(audio, channels=None, block_seconds=BLOCK_SECONDS):
+    """
+    (channels, samples) 16kHz int16 blocks from a WavAudio. With channels
+    given, the file's channels are repeated (or cut) to that many.
+    """
+    columns = None
+    if channels is not None and channels != audio.channels:
+        columns = np.arange(channels) % audio.channels
+    resampler = MultiChannelResampler(audio.samplerate, channels or audio.channels)
+    step = int(audio.samplerate * block_seconds)
+    for start in range(0, audio.frames, step):
+        block = audio.samples[start:start + step]
+        yield resampler.process(block if columns is None else block[:, columns])
+    tail = resampler.flush()
+    if tail.shape[1]:
+        yield tail
+
+
+def decode_file(model, blocks, channels, max_workers):
+    recognizer = MultiChannelRecognizer(model, channels, max_workers=max_workers)
+    messages = queue.Queue()
+    samples = 0
+    start = time.perf_counter()
+    for block in blocks:
+        samples += block.shape[1]
+        recognizer.process(block, messages)
+    recognizer.finish(messages)
+    elapsed = time.perf_counter() - start
+    recognizer.close()
+    finals = []
+    while not messages.empty():
+        message = messages.get()
+        if message['type'] == 'final':
+            finals.append(message)
+    return finals, elapsed, samples / TARGET_RATE
+
+
+def main():
+    from wav_reader import WavAudio
+
+    parser = argparse.ArgumentParser(description="Per-channel transcription benchmark")
+    parser.add_argument('wav_file', help="16-bit WAV file (one microphone per channel)")
+    parser.add_argument('--channels', type=int, help="Replicate the file's channels to this many")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model directory not found: {args.model}")
+        return
+    import vosk
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+
+    audio = WavAudio.open(args.wav_file)
+    blocks = list(wav_channel_blocks(audio, args.channels))
+    channels = blocks[0].shape[0] if blocks else 0
+    print("🎚️ WhisperBoard Per-Channel Transcription")
+    print("=" * 70)
+    print(f"{args.wav_file}: {audio} → {channels} channel recognizers, {os.cpu_count()} CPUs")
+
+    results = {}
+    for label, workers in (("Thread pool", channels), ("Single thread", 1)):
+        finals, elapsed, seconds = decode_file(model, blocks, channels, workers)
+        results[label] = finals
+        rtf = elapsed / seconds if seconds else 0.0
+        verdict = "✅ keeps up" if rtf < 1 else "❌ falls behind"
+        print(f"   {label:13} | {elapsed:7.2f} s for {seconds:.1f} s of audio | RTF {rtf:.3f} | {verdict}")
+
+    print("\n📝 Merged transcript (first 20 segments):")
+    for line in merged_transcript(results["Thread pool"]).splitlines()[:20]:
+        print(f"   {line}")
+
+
+if __name__ == "__main__":
+    main()
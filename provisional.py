@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Provisional text for models without partial results
+Some models (Telugu) return no partial results, so nothing appears until a
+phrase is finished. ProvisionalRecognizer fills the gap: every
+interval_seconds it decodes the last window_seconds of the utterance in
+progress on a secondary recognizer and offers the words as the partial
+result, until the real final arrives. The secondary decode runs in its own
+low-priority thread and is held to a share of one CPU (cpu_budget), so it
+can fall behind but never slows the main decode down.
+
+Run directly to replay a recording at live pace and compare when text first
+appears, with and without provisional text, and what it costs the main
+decode.
+
+Usage:
+    python provisional.py telugu.wav --model model-Telugu
+    python provisional.py telugu.wav --model model-Telugu --cpu-budget 0.5 --speed 2
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+class ProvisionalRecognizer:
+    """
+    Recognizer-like wrapper that shows a sliding-window decode as the partial
+    result while the wrapped recognizer has none.
+
+    new_recognizer() creates the secondary recognizer (on the same model,
+    in-process or from a RecognizerPool) once, in the decoding thread; each
+    window is decoded as one utterance of it. Windows overlap: words of a new
+    window that start within its first context_seconds only serve as context
+    and the earlier decode's words are kept there, so a long utterance builds
+    up instead of showing only its last seconds. After each decode the thread
+    idles until the decode took at most cpu_budget of the time since it
+    started; windows due while a decode is still running are not decoded
+    (skipped).
+    """
+
+    def __init__(self, recognizer, new_recognizer, window_seconds=3.0, interval_seconds=0.5,
+                 context_seconds=0.5, cpu_budget=0.25, samplerate=16000):
+        self.recognizer = recognizer
+        self.new_recognizer = new_recognizer
+        self.window_bytes = int(window_seconds * samplerate) * 2
+        self.interval_seconds = interval_seconds
+        self.context_seconds = context_seconds
+        self.cpu_budget = cpu_budget
+        self.samplerate = samplerate
+        self.decodes = 0
+        self.skipped = 0
+        self.decode_seconds = 0.0  # Wall time of the secondary decodes
+        self.cpu_seconds = 0.0  # CPU time of the decoding thread
+        self._audio = bytearray()  # The last window_seconds of the utterance in progress
+        self._utterance_bytes = 0
+        self._words = []  # Provisional (word, start, end), in seconds since the utterance began
+        self._text = ""
+        self._utterance = 0  # Decodes of an earlier utterance are discarded
+        self._next_decode = 0.0
+        self._window_recognizer = None
+        self._window_fed = 0.0  # Seconds fed to the secondary recognizer (its word times count them)
+        self._busy = False
+        self._lock = threading.Lock()
+        self._windows = queue.Queue()
+        self._thread = threading.Thread(target=self._decode_windows, name="provisional", daemon=True)
+        self._thread.start()
+
+    @property
+    def text(self):
+        return self._text
+
+    def AcceptWaveform(self, data):
+        if self.recognizer.AcceptWaveform(data):
+            self._new_utterance()
+            return True
+        size = len(self._audio)
+        self._audio += data
+        self._utterance_bytes += len(self._audio) - size
+        if len(self._audio) > self.window_bytes:
+            del self._audio[:len(self._audio) - self.window_bytes]
+        now = time.monotonic()
+        if now >= self._next_decode:
+            if self._busy:
+                self.skipped += 1
+            else:
+                self._busy = True
+                self._next_decode = now + self.interval_seconds
+                offset = (self._utterance_bytes - len(self._audio)) / 2 / self.samplerate
+                self._windows.put((self._utterance, offset, bytes(self._audio)))
+        return False
+
+    def PartialResult(self):
+        partial = self.recognizer.PartialResult()
+        if self._text and not json.loads(partial).get('partial'):
+            return json.dumps({"partial": self._text}, ensure_ascii=False)
+        return partial
+
+    def FinalResult(self):
+        self._new_utterance()
+        return self.recognizer.FinalResult()
+
+    def Reset(self):
+        self._new_utterance()
+        self.recognizer.Reset()
+
+    def close(self):
+        self._windows.put(None)
+        self._thread.join()
+        for recognizer in (self._window_recognizer, self.recognizer):
+            close = getattr(recognizer, 'close', None)
+            if close:
+                close()
+
+    def __getattr__(self, name):
+        # Result, SetSpkModel, ... go to the wrapped recognizer
+        return getattr(self.recognizer, name)
+
+    def _new_utterance(self):
+        with self._lock:
+            self._utterance += 1
+            self._words = []
+            self._text = ""
+        self._audio.clear()
+        self._utterance_bytes = 0
+
+    def _decode_windows(self):
+        try:
+            # Lower this thread's priority (Linux schedules threads separately)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+        while (window := self._windows.get()) is not None:
+            utterance, offset, audio = window
+            started, cpu_started = time.perf_counter(), time.thread_time()
+            try:
+                words = self._decode(audio, offset)
+            except Exception as e:
+                print(f"Provisional decode failed: {e}", file=sys.stderr)
+                words = []
+            elapsed = time.perf_counter() - started
+            self.decodes += 1
+            self.decode_seconds += elapsed
+            self.cpu_seconds += time.thread_time() - cpu_started
+            with self._lock:
+                if utterance == self._utterance:
+                    self._merge(words, offset)
+            # Idle so that decoding takes at most cpu_budget of the time
+            self._next_decode = max(self._next_decode, time.monotonic() + elapsed * (1 / self.cpu_budget - 1))
+            self._busy = False
+
+    def _decode(self, audio, offset):
+        if self._window_recognizer is None:
+            self._window_recognizer = self.new_recognizer()
+        recognizer = self._window_recognizer
+        # A window holding an endpoint is already final; otherwise finalize it
+        result = json.loads(recognizer.Result() if recognizer.AcceptWaveform(audio) else recognizer.FinalResult())
+        # Like every Vosk recognizer, it keeps its clock across utterances
+        shift = offset - self._window_fed
+        self._window_fed += len(audio) / 2 / self.samplerate
+        return [(word['word'], word['start'] + shift, word['end'] + shift)
+                for word in result.get('result', [])]
+
+    def _merge(self, words, offset):
+        cut = offset + self.context_seconds if offset else 0.0
+        kept = [word for word in self._words if word[2] <= cut]
+        self._words = kept + [word for word in words if word[1] >= cut]
+        self._text = ' '.join(word[0] for word in self._words)
+
+
+def replay(recognizer, blocks, block_seconds, speed):
+    """
+    Feed blocks at live pace. Returns the audio time at which text first
+    showed for each utterance with its first word's start, and the wall
+    seconds of every main decode step.
+    """
+    from recognition import decode_block, flush_block
+
+    shown, first_text, steps = [], None, []
+    started = time.perf_counter()
+    for i, block in enumerate(blocks):
+        delay = started + i * block_seconds / speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        step = time.perf_counter()
+        segment = decode_block(recognizer, block)
+        steps.append(time.perf_counter() - step)
+        block_end = (i + 1) * block_seconds
+        if segment is None:
+            continue
+        if first_text is None:
+            first_text = block_end
+        if segment.final:
+            if segment.text and segment.start is not None:
+                shown.append((first_text, segment.start))
+            first_text = None
+    flush_block(recognizer)
+    return shown, steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provisional text for models without partial results")
+    parser.add_argument('audio_file', help="Recording to replay (WAV, or any format soundfile reads)")
+    parser.add_argument('--model', default="model-Telugu", help="Vosk model directory")
+    parser.add_argument('--window', type=float, default=3.0, help="Seconds decoded for provisional text")
+    parser.add_argument('--cpu-budget', type=float, default=0.25, help="Share of one CPU for provisional decoding")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed (1 = live)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model directory not found: {args.model}")
+        return
+    import vosk
+
+    from grammar import create_recognizer
+    from transcriber import BLOCK_SECONDS, file_source
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+    blocks = [bytes(block) for block in file_source(args.audio_file)]
+
+    print("🔮 WhisperBoard Provisional Text")
+    print("=" * 78)
+    print(f"{args.audio_file}: {len(blocks) * BLOCK_SECONDS:.1f} s replayed at {args.speed:g}x, "
+          f"{args.window:g} s window, {args.cpu_budget:.0%} CPU budget\n")
+    print(f"{'Mode':18} | {'text after word 1 p50/p95':>25} | {'main step p50/p95':>18} | provisional")
+    print("-" * 78)
+    for label, provisional in (("Partials only", False), ("Provisional text", True)):
+        recognizer = create_recognizer(model)
+        if provisional:
+            recognizer = ProvisionalRecognizer(recognizer, lambda: create_recognizer(model),
+                                               window_seconds=args.window, cpu_budget=args.cpu_budget)
+        started = time.perf_counter()
+        shown, steps = replay(recognizer, blocks, BLOCK_SECONDS, args.speed)
+        wall = time.perf_counter() - started
+        delays = [first - start for first, start in shown]
+        d50, d95 = np.percentile(delays, [50, 95]) if delays else (float('nan'),) * 2
+        s50, s95 = np.percentile(steps, [50, 95]) * 1000
+        extra = ""
+        if provisional:
+            recognizer.close()
+            extra = (f"{recognizer.decodes} decodes, {recognizer.skipped} skipped, "
+                     f"{recognizer.cpu_seconds / wall:.0%} CPU")
+        print(f"{label:18} | {d50:10.2f} s / {d95:7.2f} s | {s50:6.1f} / {s95:6.1f} ms | {extra}")
+    print("\nText delay is audio time from an utterance's first word to its first visible text.")
+
+
+if __name__ == "__main__":
+    main()
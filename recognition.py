@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Shared Vosk recognition loop for WhisperBoard
+The Streamlit apps and the command-line tools all decode live audio through
+this loop so that they behave (and perform) the same way.
+"""
+
+import json
+import queue
+import sys
+from collections import namedtuple
+
+# Vosk's word for out-of-grammar speech when a grammar allows it (grammar.build_grammar)
+UNKNOWN_WORD = "[unk]"
+
+
+def drop_unknown(result):
+    """Copy of a Vosk result without its "[unk]" words, in the text and the word timings"""
+    if UNKNOWN_WORD not in result.get('text', ''):
+        return result
+    result = dict(result, text=' '.join(word for word in result['text'].split() if word != UNKNOWN_WORD))
+    if 'result' in result:
+        result['result'] = [word for word in result['result'] if word['word'] != UNKNOWN_WORD]
+    return result
+
+
+def segment_times(result):
+    """
+    Audio time (seconds since the recognizer started) covered by a final Vosk
+    result, from its word timings; (None, None) when words are not available.
+    """
+    words = result.get('result')
+    if not words:
+        return None, None
+    return words[0]['start'], words[-1]['end']
+
+
+def shift_times(result, offset):
+    """
+    Copy of a Vosk result with its word times moved by offset seconds, or by
+    offset(start) for each word when offset is a function of the word's start
+    (e.g. SilenceGate.offset_at, which changes within an utterance).
+    """
+    if not offset or not result.get('result'):
+        return result
+    words = []
+    for word in result['result']:
+        shift = offset(word['start']) if callable(offset) else offset
+        words.append(dict(word, start=word['start'] + shift, end=word['end'] + shift))
+    return dict(result, result=words)
+
+
+def word_error_rate(reference, hypothesis):
+    """Levenshtein distance between word sequences divided by the reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ref_word != hyp_word))
+    return row[-1] / len(ref)
+
+
+def recognition_loop(recognizer, audio_queue, text_queue_ref, stop_event, on_result=None, gate=None):
+    """
+    Feed audio blocks from audio_queue into the recognizer until stop_event is set.
+
+    Results are pushed to text_queue_ref as {"type": "partial" | "final", "text": ...}
+    messages, the same format the Streamlit UI consumes. on_result, if given, is
+    called in the worker thread with every non-empty final Vosk result (e.g. to
+    stream word timings to disk). A SilenceGate, if given, keeps silent blocks
+    away from the recognizer; word timings are corrected for the skipped audio.
+    """
+    while not stop_event.is_set():
+        try:
+            # Get audio data from queue (with timeout to check stop_event regularly)
+            data = audio_queue.get(timeout=0.1)
+
+            if gate is None:
+                blocks = [data]
+            else:
+                blocks = [block.tobytes() for block in gate.process(data)]
+
+            for block in blocks:
+                process_block(recognizer, block, text_queue_ref, on_result,
+                              gate.offset_at if gate else 0.0)
+
+        except queue.Empty:
+            # No audio data available, continue loop
+            continue
+        except Exception as e:
+            print(f"Error in recognition loop: {e}", file=sys.stderr)
+            break
+
+
+def final_message(result):
+    """UI message for a final Vosk result, None when it holds no text"""
+    if not result.get('text', '').strip():
+        return None
+    message = {
+        "type": "final",
+        "text": result['text'].strip()
+    }
+    if 'language' in result:
+        # Set by multi-language recognizers (code-switching mode)
+        message["language"] = result['language']
+    if 'speaker' in result:
+        # Set when speaker labeling is on
+        message["speaker"] = result['speaker']
+    start, end = segment_times(result)
+    if start is not None:
+        message["start"], message["end"] = start, end
+    return message
+
+
+class Partial(namedtuple('Partial', 'text')):
+    """Hypothesis for the utterance in progress, superseded by the next segment"""
+    __slots__ = ()
+    final = False
+
+    def message(self):
+        return {"type": "partial", "text": self.text}
+
+
+class Final(namedtuple('Final', 'text start end result')):
+    """
+    A finished utterance. start and end are audio seconds from the word
+    timings (None without them); result is the Vosk result, with any keys
+    added by recognizer wrappers (language, speaker, ...).
+    """
+    __slots__ = ()
+    final = True
+
+    def message(self):
+        return final_message(self.result)
+
+
+def _final(result_json, time_offset):
+    result = shift_times(drop_unknown(json.loads(result_json)), time_offset)
+    start, end = segment_times(result)
+    return Final(result.get('text', '').strip(), start, end, result)
+
+
+def decode_block(recognizer, data, time_offset=0.0, partials=True):
+    """
+    The decoding hot path every front end shares: feed one block and return
+    a Final when it closed an utterance (its text may be empty, the
+    recognizer has reset either way), a Partial with text, or None.
+    "[unk]" words (out-of-grammar speech) are left out of both.
+    """
+    if recognizer.AcceptWaveform(data):
+        return _final(recognizer.Result(), time_offset)
+    if not partials:
+        return None
+    text = json.loads(recognizer.PartialResult()).get('partial', '')
+    if UNKNOWN_WORD in text:
+        text = ' '.join(word for word in text.split() if word != UNKNOWN_WORD)
+    text = text.strip()
+    return Partial(text) if text else None
+
+
+def flush_block(recognizer, time_offset=0.0):
+    """Close the utterance in progress at the end of the audio (a Final, text may be empty)"""
+    return _final(recognizer.FinalResult(), time_offset)
+
+
+def process_block(recognizer, data, text_queue_ref, on_result=None, time_offset=0.0):
+    """Feed one audio block and push the resulting partial or final message"""
+    segment = decode_block(recognizer, data, time_offset)
+    if segment is None or not segment.text:
+        return
+    text_queue_ref.put(segment.message())
+    if segment.final and on_result:
+        on_result(segment.result)
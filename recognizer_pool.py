@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Multi-process recognition backend for WhisperBoard
+Live sessions normally decode in threads of the Streamlit server process, so
+the Python-side work of every session (JSON results, queues, wrappers) shares
+one interpreter lock. A RecognizerPool moves decoding into a fixed set of
+worker processes that keep their models loaded; each session gets a
+RemoteRecognizer on the least busy process. Audio blocks and results travel
+through a pair of shared-memory rings per session, so a block costs two
+small pipe messages instead of pickling the audio, and a busy session only
+competes with the sessions sharing its process.
+
+RemoteRecognizer has the KaldiRecognizer interface, so it drops into
+recognition_loop and the rescoring, speaker and language-switch wrappers.
+
+Run directly to measure decoding throughput of N sessions as threads of one
+process against the same sessions spread over a pool of processes.
+
+Usage:
+    python recognizer_pool.py recording.wav --sessions 8
+    python recognizer_pool.py recording.wav --sessions 16 --processes 4 --model model-Hindi
+"""
+
+import argparse
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+AUDIO_RING_BYTES = 1 << 20   # ~32 s of 16kHz int16 audio
+RESULT_RING_BYTES = 1 << 18  # Vosk JSON results (word timings, N-best lists)
+
+
+class SharedRing:
+    """
+    Single-producer, single-consumer message ring in shared memory.
+
+    The producer copies each message in contiguously (wrapping to the start
+    when it does not fit before the end) and passes the (offset, size, end)
+    returned by write() to the consumer out of band. The consumer reads the
+    message in place with view() and frees its space with release(end). Two
+    counters at the start of the segment hold the bytes written and freed.
+    """
+
+    HEADER = struct.Struct('QQ')
+
+    def __init__(self, capacity=None, name=None):
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.HEADER.size + capacity)
+            self.HEADER.pack_into(self._shm.buf, 0, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        self._data = self._shm.buf[self.HEADER.size:]
+        self.capacity = len(self._data)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def write(self, data):
+        """Copy one message into the ring; returns its (offset, size, end)"""
+        data = memoryview(data).cast('B')
+        size = len(data)
+        written, freed = self.HEADER.unpack_from(self._shm.buf, 0)
+        offset = written % self.capacity
+        if offset + size > self.capacity:
+            # Skip the tail so the message stays contiguous
+            written += self.capacity - offset
+            offset = 0
+        end = written + size
+        if end - freed > self.capacity:
+            raise BufferError(f"{size} byte message does not fit in the {self.capacity} byte ring")
+        self._data[offset:offset + size] = data
+        struct.pack_into('Q', self._shm.buf, 0, end)
+        return offset, size, end
+
+    def view(self, offset, size):
+        """The message at offset, in place (release the view before release())"""
+        return self._data[offset:offset + size]
+
+    def release(self, end):
+        struct.pack_into('Q', self._shm.buf, 8, end)
+
+    def close(self):
+        self._data.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class RemoteRecognizer:
+    """
+    KaldiRecognizer stand-in that decodes in a RecognizerPool worker process.
+
+    AcceptWaveform is one round trip: the block goes through the audio ring
+    and the reply brings back the Result() or PartialResult() the worker took
+    right after decoding, so the follow-up call is answered locally. Other
+    methods (FinalResult, Reset, SetMaxAlternatives, ...) are forwarded.
+    SetSpkModel takes the speaker model's directory, since a loaded model
+    cannot be sent to another process.
+    """
+
+    def __init__(self, conn, audio, results, process_sentinel, on_close=None):
+        self._conn = conn
+        self._audio = audio
+        self._results = results
+        self._on_close = on_close
+        self._pending = None  # (endpoint, text) from the last AcceptWaveform
+        try:
+            # The worker reports whether the recognizer was created, unless it died first
+            if conn not in wait([conn, process_sentinel]):
+                raise RuntimeError("Recognizer process exited")
+            self._reply(conn.recv())
+        except Exception:
+            self.close()
+            raise
+
+    def _reply(self, reply):
+        if reply[0] == "error":
+            raise RuntimeError(f"Recognizer process: {reply[1]}")
+        _, value, location = reply
+        if location is None:
+            return value, None
+        offset, size, end = location
+        with self._results.view(offset, size) as view:
+            text = str(view, 'utf-8')
+        self._results.release(end)
+        return value, text
+
+    def _request(self, *message):
+        """Send one command and wait for its (value, text) reply"""
+        try:
+            self._conn.send(message)
+            return self._reply(self._conn.recv())
+        except (EOFError, OSError) as e:
+            raise RuntimeError("Recognizer process exited") from e
+
+    def AcceptWaveform(self, data):
+        endpoint, text = self._request("accept", *self._audio.write(data))
+        self._pending = (endpoint, text)
+        return endpoint
+
+    def _pending_text(self, endpoint):
+        pending, self._pending = self._pending, None
+        if pending is not None and pending[0] == endpoint:
+            return pending[1]
+        return None
+
+    def _call(self, name, *args):
+        value, text = self._request("call", name, args)
+        return text if text is not None else value
+
+    def Result(self):
+        text = self._pending_text(True)
+        return text if text is not None else self._call("Result")
+
+    def PartialResult(self):
+        text = self._pending_text(False)
+        return text if text is not None else self._call("PartialResult")
+
+    def SetSpkModel(self, speaker_model_path):
+        if not isinstance(speaker_model_path, str):
+            raise TypeError("RemoteRecognizer.SetSpkModel takes the speaker model directory")
+        self._request("speaker", speaker_model_path)
+
+    def __getattr__(self, name):
+        # Vosk's recognizer methods are CamelCase; anything else is not forwarded
+        if not name[:1].isupper():
+            raise AttributeError(name)
+        return lambda *args: self._call(name, *args)
+
+    def close(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(("close",))
+        except OSError:
+            pass
+        self._conn.close()
+        self._conn = None
+        self._audio.close()
+        self._results.close()
+        if self._on_close:
+            self._on_close(self)
+
+
+def _handle(recognizer, message, audio, load):
+    """Run one client command in a worker process; returns (value, text)"""
+    from audio_feed import as_waveform
+
+    command = message[0]
+    if command == "accept":
+        _, offset, size, end = message
+        with audio.view(offset, size) as block:
+            endpoint = recognizer.AcceptWaveform(as_waveform(block))
+        audio.release(end)
+        return endpoint, recognizer.Result() if endpoint else recognizer.PartialResult()
+    if command == "speaker":
+        recognizer.SetSpkModel(load("speaker", message[1]))
+        return None, None
+    _, name, args = message
+    value = getattr(recognizer, name)(*args)
+    return (None, value) if isinstance(value, str) else (value, None)
+
+
+def _serve_session(load, conn, model_path, samplerate, grammar, audio_name, results_name):
+    """One session in a worker process: decode blocks until the client closes"""
+    from grammar import create_recognizer
+
+    rings = []
+    try:
+        try:
+            audio = SharedRing(name=audio_name)
+            rings.append(audio)
+            results = SharedRing(name=results_name)
+            rings.append(results)
+            recognizer = create_recognizer(load("model", model_path), samplerate, grammar)
+        except Exception as e:
+            conn.send(("error", str(e)))
+            return
+        conn.send(("ok", None, None))
+
+        while True:
+            message = conn.recv()
+            if message[0] == "close":
+                break
+            try:
+                value, text = _handle(recognizer, message, audio, load)
+                location = results.write(text.encode('utf-8')) if text is not None else None
+                conn.send(("ok", value, location))
+            except Exception as e:
+                conn.send(("error", str(e)))
+    except (EOFError, OSError):
+        pass  # The client went away without closing
+    finally:
+        for ring in rings:
+            ring.close()
+        conn.close()
+
+
+def _worker_main(control, preload):
+    """Worker process: loads models once and serves every session sent to it"""
+    import vosk
+    vosk.SetLogLevel(-1)
+    models = {}
+    lock = threading.Lock()
+
+    def load(kind, path):
+        with lock:
+            if (kind, path) not in models:
+                models[kind, path] = vosk.Model(path) if kind == "model" else vosk.SpkModel(path)
+            return models[kind, path]
+
+    for path in preload:
+        load("model", path)
+    while True:
+        try:
+            message = control.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        threading.Thread(target=_serve_session, args=(load,) + message, daemon=True).start()
+
+
+class _Worker:
+    def __init__(self, process, control):
+        self.process = process
+        self.control = control
+        self.sessions = set()
+
+
+class RecognizerPool:
+    """
+    Worker processes that keep Vosk models loaded and decode for sessions.
+
+    Models listed in preload are loaded by every process at start; others
+    are loaded by a process the first time one of its sessions needs them,
+    so memory grows with processes x models in use. Each call to
+    recognizer() opens a session on the process with the fewest sessions.
+    """
+
+    def __init__(self, processes=None, preload=(), audio_ring_bytes=AUDIO_RING_BYTES,
+                 result_ring_bytes=RESULT_RING_BYTES):
+        self.audio_ring_bytes = audio_ring_bytes
+        self.result_ring_bytes = result_ring_bytes
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._workers = []
+        for _ in range(processes or os.cpu_count() or 1):
+            control, child = self._context.Pipe()
+            process = self._context.Process(target=_worker_main, args=(child, list(preload)),
+                                            name="recognizer", daemon=True)
+            process.start()
+            child.close()
+            self._workers.append(_Worker(process, control))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def processes(self):
+        return len(self._workers)
+
+    @property
+    def sessions(self):
+        """Open sessions per worker process"""
+        return [len(worker.sessions) for worker in self._workers]
+
+    def recognizer(self, model_path, samplerate=16000, grammar=None):
+        """A RemoteRecognizer for model_path on the least busy process"""
+        with self._lock:
+            alive = [worker for worker in self._workers if worker.process.is_alive()]
+            if not alive:
+                raise RuntimeError("No recognizer process is running")
+            worker = min(alive, key=lambda w: len(w.sessions))
+            conn, child = self._context.Pipe()
+            audio = SharedRing(self.audio_ring_bytes)
+            results = SharedRing(self.result_ring_bytes)
+            worker.control.send((child, model_path, samplerate, grammar, audio.name, results.name))
+        child.close()
+        recognizer = RemoteRecognizer(conn, audio, results, worker.process.sentinel,
+                                      on_close=lambda closed: self._closed(worker, closed))
+        with self._lock:
+            worker.sessions.add(recognizer)
+        return recognizer
+
+    def _closed(self, worker, recognizer):
+        with self._lock:
+            worker.sessions.discard(recognizer)
+
+    def close(self):
+        for worker in self._workers:
+            for recognizer in list(worker.sessions):
+                recognizer.close()
+        for worker in self._workers:
+            try:
+                worker.control.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.control.close()
+        self._workers = []
+
+
+def decode_sessions(recognizers, blocks):
+    """Feed every block to every recognizer, one thread per session, as fast as possible"""
+    from recognition import process_block
+
+    class Discard:
+        def put(self, message):
+            pass
+
+    session_seconds = [0.0] * len(recognizers)
+
+    def run(i, recognizer):
+        start = time.perf_counter()
+        for block in blocks:
+            process_block(recognizer, block, Discard())
+        recognizer.FinalResult()
+        session_seconds[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=run, args=(i, r)) for i, r in enumerate(recognizers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, session_seconds
+
+
+def main():
+    import numpy as np
+
+    from grammar import create_recognizer
+    from wav_reader import WavAudio
+
+    parser = argparse.ArgumentParser(description="Multi-process recognizer throughput benchmark")
+    parser.add_argument('wav_file', help="Recording to decode in every session (16-bit WAV)")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent sessions")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model directory not found: {args.model}")
+        return
+    import vosk
+    vosk.SetLogLevel(-1)
+
+    samples = np.concatenate(list(WavAudio.open(args.wav_file).blocks()))
+    blocks = [samples[i:i + 8000].tobytes() for i in range(0, len(samples), 8000)]
+    audio_seconds = len(samples) / 16000
+
+    print("🧮 WhisperBoard Multi-Process Recognizer")
+    print("=" * 70)
+    print(f"{args.sessions} sessions x {audio_seconds:.1f} s of audio, {os.cpu_count()} CPUs")
+    print(f"{'Backend':26} | {'wall (s)':>8} | {'x real time':>11} | {'slowest session (s)':>19}")
+    print("-" * 75)
+
+    model = vosk.Model(args.model)
+    backends = [("Threads, one process", lambda: [create_recognizer(model) for _ in range(args.sessions)])]
+    pool = RecognizerPool(args.processes, preload=[args.model])
+    backends.append((f"Pool of {args.processes} processes",
+                     lambda: [pool.recognizer(args.model) for _ in range(args.sessions)]))
+    with pool:
+        for label, make_recognizers in backends:
+            recognizers = make_recognizers()
+            wall, per_session = decode_sessions(recognizers, blocks)
+            for recognizer in recognizers:
+                getattr(recognizer, 'close', lambda: None)()
+            speed = args.sessions * audio_seconds / wall
+            print(f"{label:26} | {wall:8.2f} | {speed:10.1f}x | {max(per_session):19.2f}")
+
+
+if __name__ == "__main__":
+    main()
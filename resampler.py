@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Block-wise polyphase resampling for WhisperBoard
+Converts audio of any sample rate to the 16kHz the models expect one block at
+a time, carrying filter state across blocks, so a stream never has to be held
+in memory to be resampled. Output matches scipy.signal.resample_poly on the
+whole signal.
+"""
+
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TARGET_RATE = 16000
+
+
+class StreamingResampler:
+    """
+    Rational-ratio polyphase FIR resampler with state.
+
+    Uses the same Kaiser-windowed anti-aliasing filter and delay compensation
+    as scipy.signal.resample_poly, evaluated only at the output positions
+    (never materializing the zero-stuffed signal).
+    """
+
+    def __init__(self, in_rate, out_rate=TARGET_RATE):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        if self.up == self.down:
+            # Already at the target rate: blocks pass straight through
+            self.taps_per_phase = 0
+        else:
+            # scipy.signal takes over a second to import: only load it once a
+            # stream actually needs resampling
+            import scipy.signal
+            max_rate = max(self.up, self.down)
+            taps = scipy.signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+            # Polyphase matrix, newest-input tap last: reversed_phases[p, -1 - j] = taps[p + j * up]
+            self.taps_per_phase = -(-len(taps) // self.up)
+            padded = np.zeros(self.taps_per_phase * self.up)
+            padded[:len(taps)] = taps
+            self.reversed_phases = padded.reshape(self.taps_per_phase, self.up).T[:, ::-1].copy()
+            self.delay = (len(taps) - 1) // 2  # In upsampled samples
+        self.reset()
+
+    @property
+    def delay_seconds(self):
+        """Group delay of the anti-aliasing filter (how far outputs lag their inputs)"""
+        if self.up == self.down:
+            return 0.0
+        return self.delay / (self.in_rate * self.up)
+
+    def reset(self):
+        # Zeros stand in for the samples before the stream starts
+        self._history = np.zeros(self.taps_per_phase, dtype=np.float64)
+        self._history_start = -self.taps_per_phase  # Input index of _history[0]
+        self._inputs = 0
+        self._outputs = 0
+
+    def _emit(self, buffer, last_output):
+        """Outputs self._outputs .. last_output - 1 from buffer (input indices from _history_start)"""
+        count = max(0, last_output - self._outputs)
+        output = np.empty(count)
+        # windows[i] is buffer[i:i + taps_per_phase] (a strided view, not a copy)
+        windows = sliding_window_view(buffer, self.taps_per_phase)
+        # Outputs `up` apart use the same filter phase and inputs `down` apart,
+        # so each phase is one matrix-vector product over a strided view
+        for r in range(min(self.up, count)):
+            position = (self._outputs + r) * self.down + self.delay
+            first = position // self.up - (self.taps_per_phase - 1) - self._history_start
+            n = len(range(r, count, self.up))
+            output[r::self.up] = windows[first:first + (n - 1) * self.down + 1:self.down] @ \
+                self.reversed_phases[position % self.up]
+        self._outputs = max(self._outputs, last_output)
+        return output
+
+    def process(self, block):
+        """Resample the next block of samples (any numeric dtype); returns float64"""
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float64)
+        buffer = np.concatenate([self._history, np.asarray(block, dtype=np.float64)])
+        self._inputs += len(block)
+        # Every output whose newest input sample has arrived can be computed
+        last_output = max(self._outputs, -(-(self._inputs * self.up - self.delay) // self.down))
+        output = self._emit(buffer, last_output)
+        # Later outputs reach back at most taps_per_phase samples
+        self._history = buffer[-self.taps_per_phase:]
+        self._history_start += len(buffer) - len(self._history)
+        return output
+
+    def flush(self):
+        """Remaining outputs once the stream has ended (zero-padded like resample_poly)"""
+        if self.up == self.down:
+            return np.zeros(0)
+        total = -(-self._inputs * self.up // self.down)
+        # The filter's look-ahead runs past the last sample into zeros
+        padding = np.zeros(self.delay // self.up + 2)
+        return self._emit(np.concatenate([self._history, padding]), total)
+
+
+def to_int16(samples):
+    """Round and clip resampled float samples back to 16-bit PCM"""
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+
+class MultiChannelResampler:
+    """
+    Splits interleaved (frames, channels) blocks into one C-contiguous 16kHz
+    int16 row per channel, each channel with its own resampler state.
+    """
+
+    def __init__(self, in_rate, channels, out_rate=TARGET_RATE):
+        self.channels = channels
+        self.resamplers = [StreamingResampler(in_rate, out_rate) for _ in range(channels)]
+
+    @property
+    def delay_seconds(self):
+        return self.resamplers[0].delay_seconds
+
+    def process(self, block):
+        """(frames, channels) samples in, (channels, samples) int16 out"""
+        first = self.resamplers[0]
+        if first.up == first.down:
+            # De-interleaving is a single transposing copy
+            return np.ascontiguousarray(np.asarray(block).T, dtype=np.int16)
+        return np.stack([to_int16(resampler.process(block[:, channel]))
+                         for channel, resampler in enumerate(self.resamplers)])
+
+    def flush(self):
+        return np.stack([to_int16(resampler.flush()) for resampler in self.resamplers])
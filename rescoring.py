@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+N-best rescoring with the custom domain language model for WhisperBoard
+Asks the recognizer for several alternatives on each final result and picks
+the one with the best combination of acoustic score and domain LM score
+(whisperboard/lm.arpa, trained on terms such as "Vosk", "Streamlit", "Lomiri").
+
+Usage (timing benchmark):
+    python rescoring.py --alternatives 10 --iterations 2000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+import numpy as np
+
+from lm_binary import load_lm
+
+DEFAULT_LM = os.path.join("whisperboard", "lm.arpa")
+LN10 = math.log(10)
+
+
+class NBestRescorer:
+    """
+    Log-linear interpolation of the recognizer's alternatives with an n-gram LM.
+
+    combined = acoustic_weight * confidence
+             + lm_weight * ln P_lm(text)
+             + word_bonus * number of words
+
+    Vosk's alternative "confidence" is a natural-log lattice score, so the LM
+    log10 probability is converted to natural log to keep the weights comparable.
+    """
+
+    def __init__(self, lm, lm_weight=0.5, acoustic_weight=1.0, word_bonus=0.0):
+        self.lm = lm
+        self.lm_weight = lm_weight
+        self.acoustic_weight = acoustic_weight
+        self.word_bonus = word_bonus
+        self.last_rescore_ms = 0.0
+
+    def rescore(self, result):
+        """Turn an alternatives result into a regular {"text", "result"} result"""
+        alternatives = result.get('alternatives')
+        if not alternatives:
+            return result
+
+        start = time.perf_counter()
+        tokens = [alt.get('text', '').split() for alt in alternatives]
+        acoustic = np.array([alt.get('confidence', 0.0) for alt in alternatives])
+        lengths = np.array([len(t) for t in tokens])
+        lm_scores = self.lm.score_batch(tokens) * LN10
+
+        combined = (self.acoustic_weight * acoustic +
+                    self.lm_weight * lm_scores +
+                    self.word_bonus * lengths)
+        best = alternatives[int(np.argmax(combined))]
+        self.last_rescore_ms = (time.perf_counter() - start) * 1000
+
+        rescored = {"text": best.get('text', '')}
+        if 'result' in best:
+            rescored["result"] = best['result']
+        # Speaker embeddings describe the audio, not one alternative
+        for key in ('spk', 'spk_frames'):
+            if key in result:
+                rescored[key] = result[key]
+        return rescored
+
+
+class RescoringRecognizer:
+    """
+    Recognizer-like wrapper that rescores final results with an NBestRescorer.
+
+    Partial results are passed through untouched, so live latency only grows
+    by the rescoring time of each final result.
+    """
+
+    def __init__(self, recognizer, rescorer, max_alternatives=5):
+        self.recognizer = recognizer
+        self.rescorer = rescorer
+        recognizer.SetMaxAlternatives(max_alternatives)
+
+    def AcceptWaveform(self, data):
+        return self.recognizer.AcceptWaveform(data)
+
+    def PartialResult(self):
+        return self.recognizer.PartialResult()
+
+    def Result(self):
+        return self._rescored(self.recognizer.Result())
+
+    def FinalResult(self):
+        return self._rescored(self.recognizer.FinalResult())
+
+    def __getattr__(self, name):
+        # Everything else (Reset, SetWords, ...) goes to the wrapped recognizer
+        return getattr(self.recognizer, name)
+
+    def _rescored(self, result_json):
+        return json.dumps(self.rescorer.rescore(json.loads(result_json)), ensure_ascii=False)
+
+
+def load_rescorer(lm_path=DEFAULT_LM, **weights):
+    """Create a rescorer backed by the memory-mapped binary form of lm_path"""
+    return NBestRescorer(load_lm(lm_path), **weights)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time N-best rescoring with the domain LM")
+    parser.add_argument('--lm', default=DEFAULT_LM, help="ARPA language model")
+    parser.add_argument('--alternatives', type=int, default=5, help="Alternatives per final result")
+    parser.add_argument('--words', type=int, default=12, help="Words per alternative")
+    parser.add_argument('--iterations', type=int, default=1000, help="Final results to rescore")
+    args = parser.parse_args()
+
+    rescorer = load_rescorer(args.lm)
+    vocab = [rescorer.lm.word(i) for i in range(rescorer.lm.vocab_size)] + ["hello", "world"]
+
+    timings = []
+    for _ in range(args.iterations):
+        result = {"alternatives": [
+            {"confidence": random.uniform(200, 300),
+             "text": ' '.join(random.choice(vocab) for _ in range(args.words))}
+            for _ in range(args.alternatives)
+        ]}
+        rescorer.rescore(result)
+        timings.append(rescorer.last_rescore_ms)
+
+    print("🧠 WhisperBoard N-best Rescoring Benchmark")
+    print("=" * 50)
+    print(f"LM: {args.lm} (order {rescorer.lm.order}, {rescorer.lm.vocab_size} words)")
+    print(f"{args.alternatives} alternatives x {args.words} words, {args.iterations} final results")
+    print(f"   • mean: {np.mean(timings):.3f} ms")
+    print(f"   • p50:  {np.percentile(timings, 50):.3f} ms")
+    print(f"   • p99:  {np.percentile(timings, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
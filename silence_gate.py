@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Energy / zero-crossing silence gate for WhisperBoard
+Decides per block whether audio is worth sending to the recognizer, so long
+silences cost a few vectorized numpy operations instead of a full decoder
+pass. After speech, a hangover of silence is still passed through so Vosk's
+endpointer can finalize the utterance, and a short pre-roll of the skipped
+audio is replayed when speech resumes so word onsets are not clipped.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FULL_SCALE_DB = 20 * np.log10(32768.0)
+
+
+class SilenceGate:
+    """
+    Per-block speech/silence gate with an adaptive noise floor.
+
+    A 10 ms frame counts as speech when its energy is margin_db above the
+    tracked noise floor (and above threshold_db), or slightly below that but
+    with the high zero-crossing rate of fricatives like "s" and "f". A block
+    is passed when it has min_speech_frames speech frames, or while less than
+    hangover_seconds of silence have followed the last speech.
+
+    Skipping audio moves the recognizer's clock behind real time, by a
+    different amount after each skip; add offset_at(t) to a word the
+    recognizer puts at t seconds to get its position in the input.
+    """
+
+    def __init__(self, samplerate=SAMPLE_RATE, threshold_db=-55.0, margin_db=12.0, zcr_threshold=0.3,
+                 zcr_margin_db=8.0, min_speech_frames=3, hangover_seconds=1.0, preroll_seconds=0.3):
+        self.samplerate = samplerate
+        self.frame = samplerate // 100
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.zcr_threshold = zcr_threshold
+        self.zcr_margin_db = zcr_margin_db
+        self.min_speech_frames = min_speech_frames
+        self.hangover_seconds = hangover_seconds
+        self.preroll_samples = int(samplerate * preroll_seconds)
+        self.reset()
+
+    def reset(self):
+        self.noise_floor_db = None
+        self._silence_seconds = float('inf')  # Nothing to finalize before the first speech
+        self._preroll = None
+        self.skipped_seconds = 0.0
+        self.passed_seconds = 0.0
+        # Recognizer times where speech resumed, and the audio skipped before each
+        self._resumed_at = [0.0]
+        self._offsets = [0.0]
+
+    @property
+    def skipped_fraction(self):
+        total = self.skipped_seconds + self.passed_seconds
+        return self.skipped_seconds / total if total else 0.0
+
+    def offset_at(self, seconds):
+        """Audio skipped before the recognizer's clock reached seconds"""
+        return self._offsets[bisect_right(self._resumed_at, seconds) - 1]
+
+    def speech_frames(self, samples):
+        """Number of speech frames in a block of int16 samples"""
+        return int(np.count_nonzero(self.speech_mask(samples)))
+
+    def speech_mask(self, samples):
+        """Speech (True) or silence for each 10 ms frame of a block of int16 samples"""
+        count = len(samples) // self.frame
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+        frames = np.asarray(samples[:count * self.frame], dtype=np.float32).reshape(count, self.frame)
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-3) - FULL_SCALE_DB
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame - 1)
+
+        # The floor follows the quietest frames: down at once, up slowly
+        quietest = float(energy_db.min())
+        if self.noise_floor_db is None or quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        else:
+            self.noise_floor_db += 0.05 * (quietest - self.noise_floor_db)
+
+        threshold = max(self.threshold_db, self.noise_floor_db + self.margin_db)
+        return (energy_db > threshold) | (
+            (energy_db > threshold - self.zcr_margin_db) & (zcr > self.zcr_threshold))
+
+    def process(self, samples):
+        """
+        Gate one block of int16 samples (an array or a raw PCM buffer). Returns
+        the list of sample arrays to feed the recognizer: [] while skipping,
+        [block] or [pre-roll, block] when speech resumes after skipped audio.
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        seconds = len(samples) / self.samplerate
+        if self.speech_frames(samples) >= self.min_speech_frames:
+            blocks = [samples]
+            if self._preroll is not None:
+                blocks.insert(0, self._preroll)
+                self.skipped_seconds -= len(self._preroll) / self.samplerate
+                self._resumed_at.append(self.passed_seconds)
+                self._offsets.append(self.skipped_seconds)
+                self.passed_seconds += len(self._preroll) / self.samplerate
+                self._preroll = None
+            self._silence_seconds = 0.0
+            self.passed_seconds += seconds
+            return blocks
+
+        self._silence_seconds += seconds
+        if self._silence_seconds <= self.hangover_seconds:
+            # Trailing silence lets the recognizer detect the end of the utterance
+            self.passed_seconds += seconds
+            return [samples]
+
+        # Keep the end of the skipped audio (a view, not a copy) as pre-roll
+        self._preroll = samples[-self.preroll_samples:]
+        self.skipped_seconds += seconds
+        return []
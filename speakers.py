@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Online speaker labeling for WhisperBoard
+With a Vosk speaker model (vosk-model-spk) attached, every final result
+carries an x-vector embedding of its speaker. Each embedding is assigned to
+a speaker as soon as the segment finalizes, by cosine similarity against a
+fixed-size matrix of speaker centroids: one vectorized matrix-vector product
+per segment, so labeling costs the same at minute one and hour three.
+
+Usage:
+    python speakers.py interview.wav --model model-English --spk-model model-spk
+    python speakers.py --segments 100000     # clustering cost vs session length
+"""
+
+import argparse
+import json
+import os
+import time
+
+# numpy is imported where clustering needs it, so the apps can import this
+# module (SPEAKER_MODEL, speaker_label) before anything heavy has loaded
+SPEAKER_MODEL = "model-spk"
+EMBEDDING_SIZE = 128  # x-vectors produced by vosk-model-spk-0.4
+
+
+def speaker_label(speaker):
+    return f"Speaker {speaker + 1}"
+
+
+def load_speaker_model(path=SPEAKER_MODEL):
+    """The Vosk speaker model at path, or None if it is not installed"""
+    if not os.path.isdir(path):
+        return None
+    import vosk
+    return vosk.SpkModel(path)
+
+
+class OnlineSpeakerClustering:
+    """
+    Incremental cosine-similarity clustering of speaker embeddings.
+
+    An embedding joins the most similar speaker when the similarity reaches
+    threshold, otherwise it starts a new speaker (up to max_speakers, after
+    which the closest speaker is used). Centroids are running means whose
+    weight is capped at max_weight, so they keep adapting to a voice over a
+    long session. Segments shorter than min_frames (10 ms frames) give noisy
+    embeddings: they get the closest existing speaker but never move a
+    centroid or create a speaker.
+    """
+
+    def __init__(self, threshold=0.5, max_speakers=10, min_frames=100, max_weight=30,
+                 dimensions=EMBEDDING_SIZE):
+        import numpy as np
+        self.threshold = threshold
+        self.max_speakers = max_speakers
+        self.min_frames = min_frames
+        self.max_weight = max_weight
+        self.centroids = np.zeros((max_speakers, dimensions), dtype=np.float32)
+        self.weights = np.zeros(max_speakers, dtype=np.float32)
+        self.count = 0
+
+    def reset(self):
+        self.centroids[:] = 0
+        self.weights[:] = 0
+        self.count = 0
+
+    def assign(self, embedding, frames=None):
+        """Speaker index (0-based) for one embedding; None for a short first segment"""
+        import numpy as np
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        vector /= norm
+        reliable = frames is None or frames >= self.min_frames
+
+        # Unit-length centroids: one matrix-vector product gives every cosine similarity
+        similarities = self.centroids[:self.count] @ vector
+        best = int(np.argmax(similarities)) if self.count else None
+        if not reliable:
+            return best
+        if best is None or (similarities[best] < self.threshold and self.count < self.max_speakers):
+            best = self.count
+            self.count += 1
+
+        weight = self.weights[best]
+        centroid = self.centroids[best] * weight + vector
+        self.centroids[best] = centroid / np.linalg.norm(centroid)
+        self.weights[best] = min(weight + 1, self.max_weight)
+        return best
+
+
+class SpeakerRecognizer:
+    """
+    Recognizer-like wrapper that labels every final result with a "speaker"
+    index from its x-vector. The raw embedding is removed from the result so
+    it never reaches the UI or the exports.
+    """
+
+    def __init__(self, recognizer, speaker_model, clustering=None):
+        self.recognizer = recognizer
+        self.clustering = clustering or OnlineSpeakerClustering()
+        recognizer.SetSpkModel(speaker_model)
+
+    def AcceptWaveform(self, data):
+        return self.recognizer.AcceptWaveform(data)
+
+    def PartialResult(self):
+        return self.recognizer.PartialResult()
+
+    def Result(self):
+        return self._labeled(self.recognizer.Result())
+
+    def FinalResult(self):
+        return self._labeled(self.recognizer.FinalResult())
+
+    def __getattr__(self, name):
+        return getattr(self.recognizer, name)
+
+    def _labeled(self, result_json):
+        result = json.loads(result_json)
+        embedding = result.pop('spk', None)
+        frames = result.pop('spk_frames', None)
+        if embedding is not None and result.get('text', '').strip():
+            speaker = self.clustering.assign(embedding, frames)
+            if speaker is not None:
+                result['speaker'] = speaker
+        return json.dumps(result, ensure_ascii=False)
+
+
+def benchmark_clustering(segments, speakers=4):
+    """Per-segment assignment time early and late in a long synthetic session"""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    voices = rng.standard_normal((speakers, EMBEDDING_SIZE))
+    clustering = OnlineSpeakerClustering()
+    checkpoints = sorted({100, segments // 10, segments // 2, segments})
+    timings = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(1, segments + 1):
+        voice = (i - 1) % speakers
+        embedding = voices[voice] + 0.6 * rng.standard_normal(EMBEDDING_SIZE)
+        t0 = time.perf_counter()
+        speaker = clustering.assign(embedding, frames=200)
+        timings.append(time.perf_counter() - t0)
+        if i > speakers and speaker != voice:
+            errors += 1
+        if i in checkpoints:
+            recent = timings[-100:]
+            print(f"   after {i:>7} segments: {1e6 * np.mean(recent):6.1f} µs per segment, "
+                  f"{clustering.count} speakers")
+    print(f"\n   {segments} segments in {time.perf_counter() - start:.1f} s, "
+          f"{errors / max(segments - speakers, 1):.2%} assigned to the wrong voice")
+
+
+def label_file(path, model_path, speaker_model_path):
+    import vosk
+
+    from grammar import create_recognizer
+    from transcriber import Transcriber, file_source
+    vosk.SetLogLevel(-1)
+    recognizer = SpeakerRecognizer(create_recognizer(vosk.Model(model_path)),
+                                   load_speaker_model(speaker_model_path))
+    for segment in Transcriber(recognizer, partials=False).transcribe(file_source(path)):
+        start = segment.start if segment.start is not None else 0.0
+        speaker = segment.result.get('speaker')
+        label = speaker_label(speaker) if speaker is not None else "?"
+        print(f"   [{start:7.1f}s] {label}: {segment.text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online speaker labeling")
+    parser.add_argument('wav_file', nargs='?', help="Recording to label (16-bit WAV)")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    parser.add_argument('--spk-model', default=SPEAKER_MODEL, help="Vosk speaker model directory")
+    parser.add_argument('--segments', type=int, default=20000, help="Synthetic segments to cluster")
+    args = parser.parse_args()
+
+    print("🗣️ WhisperBoard Speaker Labeling")
+    print("=" * 70)
+    if args.wav_file:
+        if not os.path.isdir(args.spk_model):
+            print(f"❌ Speaker model not found: {args.spk_model}")
+            print("   Download vosk-model-spk-0.4 from https://alphacephei.com/vosk/models")
+            return
+        label_file(args.wav_file, args.model, args.spk_model)
+    else:
+        print("Clustering cost per segment as the session grows (synthetic embeddings):")
+        benchmark_clustering(args.segments)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,11 @@
 Advanced Telugu model recognition test with real audio input
 """
 import vosk
-import sounddevice as sd
-import queue
-import json
 import time
 import threading
-import sys
+
+from grammar import create_recognizer
+from transcriber import MicrophoneSource, Transcriber
 
 def test_live_recognition(model_path, language_name, duration=10):
     """Test live audio recognition for a specific model"""
@@ -19,64 +18,36 @@ def test_live_recognition(model_path, language_name, duration=10):
     try:
         # Load model
         model = vosk.Model(model_path)
-        recognizer = vosk.KaldiRecognizer(model, 16000)
-        recognizer.SetWords(True)
+        transcriber = Transcriber(create_recognizer(model, 16000))
         
         print("✅ Model and recognizer loaded successfully")
         
-        # Audio configuration
-        audio_queue = queue.Queue()
-        stop_flag = threading.Event()
-        
-        def audio_callback(indata, frames, time, status):
-            if status:
-                print(f"Audio status: {status}")
-            audio_queue.put(bytes(indata))
+        # Smaller blocks than the apps for more responsive recognition; the
+        # shared cancel event also stops it if the device delivers nothing
+        microphone = MicrophoneSource(block_seconds=0.25, cancel_event=transcriber.cancel_event)
         
         print(f"\n🔴 Starting {duration}-second recording test...")
         print(f"Please speak in {language_name} now!")
         print("-" * 60)
         
-        # Start audio stream
-        with sd.RawInputStream(
-            samplerate=16000,
-            blocksize=4000,  # Smaller block size for more responsive recognition
-            device=None,
-            dtype='int16',
-            channels=1,
-            callback=audio_callback
-        ):
-            
-            start_time = time.time()
-            final_results = []
-            partial_count = 0
-            
-            while time.time() - start_time < duration:
-                try:
-                    # Get audio data
-                    data = audio_queue.get(timeout=0.1)
-                    
-                    # Process with recognizer
-                    if recognizer.AcceptWaveform(data):
-                        # Final result
-                        result = json.loads(recognizer.Result())
-                        if result.get('text', '').strip():
-                            final_text = result['text'].strip()
-                            final_results.append(final_text)
-                            print(f"🎯 FINAL: {final_text}")
-                    else:
-                        # Partial result
-                        partial_result = json.loads(recognizer.PartialResult())
-                        if partial_result.get('partial', '').strip():
-                            partial_text = partial_result['partial'].strip()
-                            partial_count += 1
-                            print(f"🔄 PARTIAL ({partial_count}): {partial_text}")
-                            
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    print(f"❌ Error during recognition: {e}")
-                    break
+        final_results = []
+        partial_count = 0
+        
+        # Stop after duration seconds; the utterance in progress is still finalized
+        timer = threading.Timer(duration, transcriber.cancel)
+        timer.start()
+        try:
+            for segment in transcriber.transcribe(microphone):
+                if segment.final:
+                    final_results.append(segment.text)
+                    print(f"🎯 FINAL: {segment.text}")
+                else:
+                    partial_count += 1
+                    print(f"🔄 PARTIAL ({partial_count}): {segment.text}")
+        except Exception as e:
+            print(f"❌ Error during recognition: {e}")
+        finally:
+            timer.cancel()
         
         print("-" * 60)
         print(f"⏹️ Recording finished for {language_name}")
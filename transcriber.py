@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Streamlit-free transcription API for WhisperBoard
+A Transcriber turns any source of 16kHz int16 mono PCM (an audio file, a
+microphone, an iterator of byte blocks or an async iterator of them) into
+Partial and Final segments (see recognition.py), either as a generator
+(transcribe) or an async generator (atranscribe). Both decode with the same
+per-block hot path as the apps, recognition.decode_block.
+
+Backpressure: sources are pulled only as fast as blocks are decoded; an
+async source is read at most max_pending blocks ahead, and a microphone,
+which cannot wait, drops its oldest audio beyond max_backlog_seconds.
+Cancellation: cancel() (or setting a shared cancel_event) stops after the
+current block and still delivers the last Final; cancelling the task or
+closing the async generator stops at once.
+
+    transcriber = Transcriber(create_recognizer(vosk.Model("model-English")))
+    for segment in transcriber.transcribe(file_source("talk.mp3")):
+        if segment.final:
+            print(segment.start, segment.text)
+
+Run directly to measure what the API costs per block over a bare
+AcceptWaveform loop.
+
+Usage:
+    python transcriber.py recording.wav --model model-English
+"""
+
+import argparse
+import asyncio
+import os
+import queue
+import threading
+import time
+
+from audio_feed import as_waveform, pcm_view
+from recognition import decode_block, flush_block
+
+SAMPLE_RATE = 16000
+BLOCK_SECONDS = 0.5
+_END = object()
+
+
+def file_source(audio_file, block_seconds=BLOCK_SECONDS):
+    """
+    16kHz PCM blocks of an audio file given as a path or as its bytes. WAV
+    files are memory-mapped (or viewed in place) and other formats decoded
+    as they are read, so the file is never expanded in memory.
+    """
+    from io import BytesIO
+
+    from audio_decode import CompressedAudio, is_wav
+    from wav_reader import WavAudio
+
+    if isinstance(audio_file, (str, os.PathLike)):
+        with open(audio_file, 'rb') as f:
+            header = f.read(12)
+        audio = WavAudio.open(audio_file) if is_wav(header) else CompressedAudio(audio_file)
+    else:
+        audio = WavAudio.from_buffer(audio_file) if is_wav(audio_file[:12]) else CompressedAudio(BytesIO(audio_file))
+    step = int(SAMPLE_RATE * block_seconds)
+    for block in audio.blocks(block_seconds):
+        for start in range(0, len(block), step):
+            yield pcm_view(block[start:start + step])
+
+
+class DroppingQueue(queue.Queue):
+    """Bounded audio queue for capture callbacks: put() never waits, the oldest block is dropped instead"""
+
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put(self, item, block=True, timeout=None):
+        while True:
+            try:
+                return super().put(item, block=False)
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class MicrophoneSource:
+    """
+    16kHz PCM blocks from an input device captured at its native rate (see
+    live_capture.py). The stream is open while the source is iterated. If
+    decoding falls more than max_backlog_seconds behind, the oldest audio
+    is dropped (dropped_seconds) rather than stalling the audio thread.
+    Iteration ends within 0.1 s of cancel_event being set (pass the
+    Transcriber's, so cancel() stops a silent or stalled device too).
+    """
+
+    def __init__(self, device=None, block_seconds=BLOCK_SECONDS, max_backlog_seconds=5.0, cancel_event=None):
+        self.device = device
+        self.block_seconds = block_seconds
+        self.audio_queue = DroppingQueue(max(1, int(max_backlog_seconds / block_seconds)))
+        self.cancel_event = cancel_event or threading.Event()
+        self.capture = None
+
+    @property
+    def dropped_seconds(self):
+        return self.audio_queue.dropped * self.block_seconds
+
+    def __iter__(self):
+        from live_capture import NativeRateCapture
+        self.capture = NativeRateCapture(self.audio_queue, self.device, self.block_seconds)
+        with self.capture.stream():
+            while not self.cancel_event.is_set():
+                try:
+                    # Time out so cancellation does not wait for the next block
+                    yield self.audio_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+
+class Transcriber:
+    """
+    Decodes PCM sources with one recognizer (anything with the
+    KaldiRecognizer interface, including the repo's wrappers and
+    RemoteRecognizer) and yields its segments.
+
+    Empty results are skipped; with partials=False only Finals are yielded
+    (and PartialResult is never called, which is faster for files). A
+    SilenceGate keeps silence away from the recognizer, with word times
+    corrected for the skipped audio. A transcriber decodes one source at a
+    time; the recognizer carries over from one source to the next.
+    """
+
+    def __init__(self, recognizer, gate=None, partials=True, cancel_event=None):
+        self.recognizer = recognizer
+        self.gate = gate
+        self.partials = partials
+        self.cancel_event = cancel_event or threading.Event()
+        self.blocks = 0
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Stop after the current block (thread-safe)"""
+        self.cancel_event.set()
+
+    @property
+    def real_time_factor(self):
+        return self.decode_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def _time_offset(self):
+        return self.gate.offset_at if self.gate is not None else 0.0
+
+    def decode(self, block):
+        """Segments with text for one block of PCM (bytes, memoryview or int16 array)"""
+        started = time.perf_counter()
+        self.blocks += 1
+        self.audio_seconds += len(pcm_view(block)) / 2 / SAMPLE_RATE
+        pieces = [block] if self.gate is None else self.gate.process(block)
+        segments = []
+        for piece in pieces:
+            segment = decode_block(self.recognizer, as_waveform(pcm_view(piece)),
+                                   self._time_offset(), self.partials)
+            if segment is not None and segment.text:
+                segments.append(segment)
+        self.decode_seconds += time.perf_counter() - started
+        return segments
+
+    def finish(self):
+        """The Final for the utterance in progress at the end of a source, if it has text"""
+        segment = flush_block(self.recognizer, self._time_offset())
+        return [segment] if segment.text else []
+
+    def transcribe(self, source):
+        """Yield the segments of a source of PCM blocks, then the last Final"""
+        blocks = iter(source)
+        try:
+            for block in blocks:
+                yield from self.decode(block)
+                if self.cancelled:
+                    break
+            yield from self.finish()
+        finally:
+            close = getattr(blocks, 'close', None)
+            if close:
+                close()
+
+    async def atranscribe(self, source, max_pending=4):
+        """
+        Async generator over the segments of a sync or async source. Decoding
+        (and reading a blocking source) runs in a worker thread, so the event
+        loop stays free; an async source is read at most max_pending blocks
+        ahead of the decoder.
+        """
+        if hasattr(source, '__aiter__'):
+            steps = self._async_steps(source, max_pending)
+        else:
+            steps = self._sync_steps(source)
+        try:
+            async for segments in steps:
+                for segment in segments:
+                    yield segment
+                if self.cancelled:
+                    break
+            for segment in await _in_thread(self.finish):
+                yield segment
+        finally:
+            await steps.aclose()
+
+    def _next_segments(self, blocks):
+        block = next(blocks, _END)
+        return None if block is _END else self.decode(block)
+
+    async def _sync_steps(self, source):
+        # Reading and decoding share one worker thread per block: the source
+        # is only pulled when the consumer wants more
+        blocks = iter(source)
+        try:
+            while (segments := await _in_thread(self._next_segments, blocks)) is not None:
+                yield segments
+        finally:
+            close = getattr(blocks, 'close', None)
+            if close:
+                await _in_thread(close)
+
+    async def _async_steps(self, source, max_pending):
+        pending = asyncio.Queue(max_pending)
+        reader = asyncio.create_task(_read_ahead(source, pending))
+        try:
+            while (block := await pending.get()) is not _END:
+                if isinstance(block, Exception):
+                    raise block
+                yield await _in_thread(self.decode, block)
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+
+async def _in_thread(function, *args):
+    """
+    Run function in a worker thread. When the caller is cancelled, wait for
+    the thread to finish before unwinding, so the recognizer and the source
+    are never used by two threads at once.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, function, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+async def _read_ahead(source, pending):
+    """Copy an async source into the pending queue (which bounds the read-ahead)"""
+    blocks = source.__aiter__()
+    try:
+        async for block in blocks:
+            await pending.put(block)
+        await pending.put(_END)
+    except Exception as e:
+        await pending.put(e)
+    finally:
+        aclose = getattr(blocks, 'aclose', None)
+        if aclose:
+            await aclose()
+
+
+def benchmark(recognizer_factory, blocks):
+    """Seconds to decode blocks with a bare loop, transcribe() and atranscribe()"""
+    import json
+
+    def bare():
+        recognizer = recognizer_factory()
+        for block in blocks:
+            if recognizer.AcceptWaveform(block):
+                json.loads(recognizer.Result())
+            else:
+                json.loads(recognizer.PartialResult())
+        json.loads(recognizer.FinalResult())
+
+    def sync():
+        for _ in Transcriber(recognizer_factory()).transcribe(blocks):
+            pass
+
+    async def run_async():
+        async for _ in Transcriber(recognizer_factory()).atranscribe(blocks):
+            pass
+
+    timings = {}
+    for label, run in (("Bare AcceptWaveform loop", bare), ("Transcriber.transcribe", sync),
+                       ("Transcriber.atranscribe", lambda: asyncio.run(run_async()))):
+        start = time.perf_counter()
+        run()
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcriber API benchmark")
+    parser.add_argument('audio_file', help="Recording to decode (WAV, or any format soundfile reads)")
+    parser.add_argument('--model', default="model-English", help="Vosk model directory")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model directory not found: {args.model}")
+        return
+    import vosk
+
+    from grammar import create_recognizer
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+
+    blocks = [bytes(block) for block in file_source(args.audio_file)]
+    audio_seconds = sum(len(block) for block in blocks) / 2 / SAMPLE_RATE
+    print("🧩 WhisperBoard Transcriber API")
+    print("=" * 70)
+    print(f"{args.audio_file}: {audio_seconds:.1f} s in {len(blocks)} blocks of {BLOCK_SECONDS} s")
+    timings = benchmark(lambda: create_recognizer(model), blocks)
+    baseline = timings["Bare AcceptWaveform loop"]
+    for label, seconds in timings.items():
+        overhead = (seconds - baseline) / len(blocks) * 1e6 if blocks else 0.0
+        print(f"   {label:26} | {seconds:7.2f} s | RTF {seconds / audio_seconds:.3f} | "
+              f"{overhead:+8.1f} µs per block")
+
+    print("\n📝 Segments:")
+    for segment in Transcriber(create_recognizer(model), partials=False).transcribe(blocks):
+        start = f"{segment.start:7.1f}s" if segment.start is not None else "        "
+        print(f"   {start} {segment.text}")
+
+
+if __name__ == "__main__":
+    main()
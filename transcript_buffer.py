@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Segment-based transcript buffer for WhisperBoard
+Holds a live transcript as a list of finalized segments plus one partial
+hypothesis, so each update costs the same however long the session runs.
+"""
+
+
+class TranscriptBuffer:
+    """
+    Finalized segments plus the current partial result.
+
+    Appending a segment is O(1), and the UI only ever renders a bounded
+    window or page of segments. The full text is joined on demand (e.g. for
+    downloads) and cached until the next segment arrives.
+    """
+
+    def __init__(self):
+        self.segments = []
+        self.partial = ""
+        self.word_count = 0
+        self._text = ""
+        self._text_segments = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __bool__(self):
+        return bool(self.segments)
+
+    def add_final(self, text, **metadata):
+        """
+        Append a finalized segment (extra metadata such as start/end is kept
+        with it). A "label" in the metadata, e.g. "[Speaker 2] ", is shown
+        before the segment's text.
+        """
+        self.segments.append(dict(metadata, text=text))
+        self.word_count += len(text.split())
+        self.partial = ""
+
+    def set_partial(self, text):
+        self.partial = text
+
+    def clear(self):
+        self.__init__()
+
+    def window(self, size):
+        """The most recent `size` segments"""
+        return self.segments[-size:]
+
+    def page(self, index, size):
+        """Segments on page `index` (0-based) of `size` segments each"""
+        return self.segments[index * size:(index + 1) * size]
+
+    def page_count(self, size):
+        return max(1, (len(self.segments) + size - 1) // size)
+
+    def window_text(self, size, partial_marker=""):
+        """Text of the most recent segments followed by the partial result"""
+        parts = [segment.get('label', '') + segment['text'] for segment in self.window(size)]
+        if self.partial:
+            parts.append(self.partial + partial_marker)
+        return ' '.join(parts)
+
+    def text(self):
+        """The full transcript of finalized segments"""
+        if self._text_segments != len(self.segments):
+            self._text = ' '.join(segment.get('label', '') + segment['text'] for segment in self.segments)
+            self._text_segments = len(self.segments)
+        return self._text
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming word-timestamp export for WhisperBoard
+Writes each finalized Vosk result to disk as soon as it arrives: JSONL for
+pipelines and SRT / WebVTT for captions. Every segment is flushed
+immediately, so nothing accumulates in memory and other tools can tail the
+files while a recording or file job is still running.
+"""
+
+import json
+import os
+import time
+
+EXPORT_DIR = "transcripts"
+FORMATS = ("jsonl", "srt", "vtt")
+WORDS_PER_CUE = 7
+
+
+def format_timestamp(seconds, decimal_separator):
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)"""
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{decimal_separator}{millis:03}"
+
+
+class JsonlExporter:
+    """One JSON object per segment: text, start, end, language, speaker (if labeled) and word timings"""
+
+    extension = "jsonl"
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write_segment(self, result, language=None):
+        words = result.get('result', [])
+        record = {
+            "text": result.get('text', '').strip(),
+            "start": words[0]['start'] if words else None,
+            "end": words[-1]['end'] if words else None,
+            "language": language,
+            "words": words
+        }
+        if 'speaker' in result:
+            record["speaker"] = result['speaker']
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SrtExporter:
+    """SubRip captions, WORDS_PER_CUE words per cue"""
+
+    extension = "srt"
+    decimal_separator = ","
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._cues = 0
+
+    def _write_cue(self, start, end, text):
+        self._file.write(f"{self._cues}\n{format_timestamp(start, self.decimal_separator)} --> "
+                         f"{format_timestamp(end, self.decimal_separator)}\n{text}\n\n")
+
+    def write_segment(self, result, language=None):
+        words = result.get('result', [])
+        for i in range(0, len(words), WORDS_PER_CUE):
+            line = words[i:i + WORDS_PER_CUE]
+            self._cues += 1
+            self._write_cue(line[0]['start'], line[-1]['end'], ' '.join(word['word'] for word in line))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class VttExporter(SrtExporter):
+    """WebVTT captions (same cues as SRT, different header and timestamps)"""
+
+    extension = "vtt"
+    decimal_separator = "."
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file.write("WEBVTT\n\n")
+        self._file.flush()
+
+
+EXPORTERS = {cls.extension: cls for cls in (JsonlExporter, SrtExporter, VttExporter)}
+
+
+class SegmentExporter:
+    """
+    Fans each finalized segment out to one file per format. Word times are
+    written as given: the decode path already puts them in stream time.
+    """
+
+    def __init__(self, base_path, formats=FORMATS, language=None):
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.language = language
+        self.exporters = [EXPORTERS[fmt](f"{base_path}.{fmt}") for fmt in formats]
+
+    @property
+    def paths(self):
+        return [exporter.path for exporter in self.exporters]
+
+    def write_segment(self, result):
+        if not result.get('text', '').strip():
+            return
+        language = result.get('language', self.language)
+        for exporter in self.exporters:
+            exporter.write_segment(result, language)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def export_base_path(prefix, name, directory=EXPORT_DIR):
+    """transcripts/<prefix>_<name>_<timestamp> with a filesystem-safe name"""
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name).strip('_')
+    return os.path.join(directory, f"{prefix}_{safe_name}_{time.strftime('%Y%m%d-%H%M%S')}")
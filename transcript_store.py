@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Persistent transcript history for WhisperBoard
+An append-only SQLite store of finished segments (language, timestamps and
+source) with an incrementally maintained FTS5 full-text index, so months of
+transcripts stay searchable in milliseconds.
+
+Usage:
+    python transcript_store.py "streamlit"
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from datetime import datetime
+
+DEFAULT_DB = os.environ.get("WHISPERBOARD_HISTORY_DB", "transcript_history.db")
+
+# unicode61 treats combining marks (matras, virama, anusvara, nukta...) as
+# separators, which would split Devanagari and Telugu words into single
+# letters. Declaring them token characters keeps whole words as tokens.
+INDIC_BLOCKS = [(0x0900, 0x0980), (0x0C00, 0x0C80)]  # Devanagari, Telugu
+INDIC_TOKENCHARS = ''.join(
+    chr(c) for start, end in INDIC_BLOCKS for c in range(start, end)
+    if unicodedata.category(chr(c)).startswith('M')
+) + '\u200c\u200d'  # zero-width (non-)joiners used in Indic spelling
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    language TEXT NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_created_at ON segments(created_at);
+CREATE INDEX IF NOT EXISTS segments_session ON segments(session_id);
+CREATE INDEX IF NOT EXISTS segments_language ON segments(language, created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text,
+    content='segments',
+    content_rowid='id',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '{INDIC_TOKENCHARS}'"
+);
+
+-- The index is updated incrementally as each segment is appended
+CREATE TRIGGER IF NOT EXISTS segments_index AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+
+-- History is append-only
+CREATE TRIGGER IF NOT EXISTS segments_no_update BEFORE UPDATE ON segments BEGIN
+    SELECT RAISE(ABORT, 'transcript history is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS segments_no_delete BEFORE DELETE ON segments BEGIN
+    SELECT RAISE(ABORT, 'transcript history is append-only');
+END;
+"""
+
+
+def normalize(text):
+    """NFC-normalize so precomposed and decomposed spellings index identically"""
+    return unicodedata.normalize('NFC', text)
+
+
+def build_match_query(query):
+    """
+    Turn free text into a safe FTS5 query: every word must match, and a
+    trailing '*' makes a word a prefix search (e.g. "stream*").
+    """
+    terms = []
+    for word in normalize(query).split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class TranscriptStore:
+    """Append-only transcript history shared by all sessions of the app"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def append(self, text, language, source, session_id, start_time=None, end_time=None):
+        """Store one finished segment and return its id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO segments (session_id, source, language, start_time, end_time, created_at, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, source, language, start_time, end_time, time.time(), normalize(text))
+            )
+            return cursor.lastrowid
+
+    def search(self, query, limit=50, language=None):
+        """Best-matching segments for a free-text query (most relevant first)"""
+        match = build_match_query(query)
+        if not match:
+            return []
+        sql = ("SELECT s.*, snippet(segments_fts, 0, '**', '**', '…', 12) AS snippet "
+               "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+               "WHERE segments_fts MATCH ?")
+        params = [match]
+        if language:
+            sql += " AND s.language = ?"
+            params.append(language)
+        sql += " ORDER BY bm25(segments_fts), s.created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def recent(self, limit=50, language=None):
+        """Most recently finished segments"""
+        sql = "SELECT * FROM segments"
+        params = []
+        if language:
+            sql += " WHERE language = ?"
+            params.append(language)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Usage: python {sys.argv[0]} <query>")
+        return
+
+    store = TranscriptStore()
+    query = ' '.join(sys.argv[1:])
+    start = time.perf_counter()
+    results = store.search(query)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"🔎 {len(results)} result(s) for {query!r} in {store.count()} segments ({elapsed:.1f} ms)")
+    for row in results:
+        when = datetime.fromtimestamp(row['created_at']).strftime('%Y-%m-%d %H:%M')
+        print(f"   [{when}] {row['language']} · {row['source']}: {row['snippet']}")
+
+
+if __name__ == "__main__":
+    main()
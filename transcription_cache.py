@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Content-addressed transcription cache for WhisperBoard
+Stores finished file transcriptions on disk, keyed by a hash of the
+normalized 16kHz PCM, the model installation and the decode options, so
+re-uploading a file (or processing it again with the same model) returns the
+transcript and word timings without decoding. The cache is capped in size
+and evicts least-recently-used entries.
+
+Usage:
+    python transcription_cache.py           # show cache statistics
+    python transcription_cache.py --clear   # remove all entries
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = os.environ.get("WHISPERBOARD_CACHE_DIR", "transcription_cache")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+HASH_BLOCK_BYTES = 1024 * 1024
+ENTRY_SUFFIX = ".json"
+
+# Bump when a change to the decoding pipeline alters its output
+DECODER_VERSION = 1
+
+
+def _digest(*parts):
+    return hashlib.blake2b('\0'.join(str(p) for p in parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def model_identity(model_path):
+    """
+    Fingerprint of an installed model (or LM file) from its files' names,
+    sizes and modification times. Reinstalling or upgrading a model changes
+    the fingerprint, which retires every cache entry made with the old one.
+    """
+    stats = []
+    if os.path.isfile(model_path):
+        stat = os.stat(model_path)
+        stats.append(('', stat.st_size, stat.st_mtime_ns))
+    else:
+        for root, _, files in os.walk(model_path):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                stats.append((os.path.relpath(path, model_path), stat.st_size, stat.st_mtime_ns))
+    return _digest(*sorted(stats))
+
+
+def decode_options(grammar=None, rescorer=None, gate=None):
+    """Everything besides the audio and the model that changes the transcript"""
+    options = {"decoder": DECODER_VERSION, "samplerate": 16000, "grammar": grammar, "rescoring": None,
+               "silence_gate": None}
+    if rescorer is not None:
+        options["rescoring"] = {
+            "lm": model_identity(rescorer.lm.path),
+            "lm_weight": rescorer.lm_weight,
+            "acoustic_weight": rescorer.acoustic_weight,
+            "word_bonus": rescorer.word_bonus
+        }
+    if gate is not None:
+        options["silence_gate"] = {
+            name: getattr(gate, name) for name in
+            ("threshold_db", "margin_db", "zcr_threshold", "zcr_margin_db", "min_speech_frames",
+             "hangover_seconds", "preroll_samples")
+        }
+    return options
+
+
+class CacheKey:
+    """
+    Incrementally built cache key: model and options first, then PCM blocks
+    as they stream through, so the audio is never copied or joined to hash it.
+    """
+
+    def __init__(self, model_path, options):
+        self.model_tag = _digest(os.path.abspath(model_path))
+        self.identity = model_identity(model_path)
+        self._hash = hashlib.blake2b(digest_size=20)
+        self._hash.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        self._hash.update(self.identity.encode('ascii'))
+
+    def update(self, pcm):
+        """Hash a block of normalized PCM (bytes, memoryview or int16 array)"""
+        view = memoryview(pcm).cast('B')
+        for start in range(0, len(view), HASH_BLOCK_BYTES):
+            self._hash.update(view[start:start + HASH_BLOCK_BYTES])
+
+    @property
+    def name(self):
+        # <model>.<installation>.<content hash>
+        return f"{self.model_tag}.{self.identity}.{self._hash.hexdigest()}"
+
+    @property
+    def filename(self):
+        return self.name + ENTRY_SUFFIX
+
+
+class TranscriptionCache:
+    """Size-capped on-disk cache of transcripts with LRU eviction"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # filename -> [size, last used]; file mtimes carry recency across restarts
+        self._entries = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                self._entries[entry.name] = [stat.st_size, stat.st_mtime]
+        self.total_bytes = sum(size for size, _ in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, filename):
+        size, _ = self._entries.pop(filename)
+        self.total_bytes -= size
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError:
+            pass
+
+    def _retire_stale(self, key):
+        """Drop entries made with an earlier installation of the same model"""
+        prefix = key.model_tag + "."
+        current = f"{prefix}{key.identity}."
+        for filename in [f for f in self._entries if f.startswith(prefix) and not f.startswith(current)]:
+            self._remove(filename)
+
+    def get(self, key):
+        """The cached entry for key, or None. A hit marks the entry as recently used."""
+        with self._lock:
+            self._retire_stale(key)
+            filename = key.filename
+            if filename not in self._entries:
+                return None
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(filename)
+                return None
+            now = time.time()
+            os.utime(path, (now, now))
+            self._entries[filename][1] = now
+            return entry
+
+    def put(self, key, text, segments, **metadata):
+        """Store a transcript and its Vosk final results (with word timings)"""
+        entry = dict(metadata, text=text, segments=segments, created_at=time.time())
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            filename = key.filename
+            path = os.path.join(self.directory, filename)
+            # Write to a temporary file first so readers never see a partial entry
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            if filename in self._entries:
+                self.total_bytes -= self._entries[filename][0]
+            self._entries[filename] = [len(data), time.time()]
+            self.total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for filename in sorted(self._entries, key=lambda f: self._entries[f][1]):
+            self._remove(filename)
+            if self.total_bytes <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            for filename in list(self._entries):
+                self._remove(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperBoard transcription cache")
+    parser.add_argument('--directory', default=CACHE_DIR, help="Cache directory")
+    parser.add_argument('--clear', action='store_true', help="Remove all cached transcriptions")
+    args = parser.parse_args()
+
+    cache = TranscriptionCache(args.directory)
+    if args.clear:
+        count = len(cache)
+        cache.clear()
+        print(f"🗑️ Removed {count} cached transcription(s) from {args.directory}")
+        return
+    print(f"🗄️ {len(cache)} cached transcription(s) in {args.directory}: "
+          f"{cache.total_bytes / 1024 / 1024:.1f} MB of {cache.max_bytes / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Zero-copy WAV ingestion for WhisperBoard
+Walks the RIFF chunk list to find the "fmt " and "data" chunks wherever they
+are (LIST/INFO, bext, fact, JUNK or other chunks before, between or after
+them, "fmt " after "data", RF64 for files over 4 GB) and exposes the samples
+without copying them: files on disk as an np.memmap that the OS pages in on
+demand (and shares between processes), in-memory uploads as an np.frombuffer
+view.
+
+Usage:
+    python wav_reader.py archive.wav
+"""
+
+import mmap
+import os
+import struct
+import sys
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+from resampler import TARGET_RATE, StreamingResampler, to_int16
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+BLOCK_SECONDS = 2.0
+
+WavFormat = namedtuple('WavFormat', 'channels samplerate bits_per_sample block_align data_offset data_bytes')
+
+
+def parse_wav(buffer):
+    """
+    Locate the format and sample data of a WAV file held in any buffer
+    (bytes, mmap...). Raises wave.Error for files that are not 16-bit PCM WAV.
+    """
+    size = len(buffer)
+    if size < 12 or buffer[8:12] != b'WAVE' or buffer[0:4] not in (b'RIFF', b'RF64'):
+        raise wave.Error("file does not start with a RIFF/WAVE header")
+
+    fmt = None
+    data = None
+    rf64_data_bytes = None
+    offset = 12
+    while offset + 8 <= size:
+        chunk_id = buffer[offset:offset + 4]
+        (chunk_size,) = struct.unpack('<I', buffer[offset + 4:offset + 8])
+        body = offset + 8
+        if chunk_id == b'ds64':
+            # RF64: the real (64-bit) data size lives here
+            (rf64_data_bytes,) = struct.unpack('<Q', buffer[body + 8:body + 16])
+        elif chunk_id == b'fmt ':
+            format_tag, channels, samplerate, _, block_align, bits = struct.unpack(
+                '<HHIIHH', buffer[body:body + 16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                # The real format code is the first field of the subformat GUID
+                (format_tag,) = struct.unpack('<H', buffer[body + 24:body + 26])
+            fmt = (format_tag, channels, samplerate, bits, block_align)
+        elif chunk_id == b'data':
+            if rf64_data_bytes is not None and chunk_size == 0xFFFFFFFF:
+                chunk_size = rf64_data_bytes
+            # Writers that were cut off (or stream) leave a wrong size: trust the file
+            chunk_size = min(chunk_size, size - body)
+            data = (body, chunk_size)
+        if fmt and data:
+            break
+        # Chunks are word-aligned: odd sizes are followed by a pad byte
+        offset = body + chunk_size + (chunk_size & 1)
+
+    if fmt is None:
+        raise wave.Error("no fmt chunk found")
+    if data is None:
+        raise wave.Error("no data chunk found")
+    format_tag, channels, samplerate, bits, block_align = fmt
+    if format_tag != WAVE_FORMAT_PCM:
+        raise wave.Error(f"unsupported WAV format 0x{format_tag:04x} (PCM required)")
+    if bits != 16:
+        raise wave.Error(f"Audio file must be 16-bit, found {bits}-bit")
+    if channels < 1 or block_align != channels * 2:
+        raise wave.Error(f"invalid fmt chunk ({channels} channels, block align {block_align})")
+    data_offset, data_bytes = data
+    return WavFormat(channels, samplerate, bits, block_align, data_offset,
+                     data_bytes - data_bytes % block_align)
+
+
+class WavAudio:
+    """
+    16-bit PCM WAV samples exposed without a copy, read as 16kHz mono blocks.
+
+    16kHz mono files are a single block that is the mapped data itself; other
+    rates and channel counts are downmixed and resampled block by block.
+    """
+
+    def __init__(self, fmt, samples):
+        self.fmt = fmt
+        self.samples = samples  # (frames, channels) int16 view of the data chunk
+        self.samplerate = fmt.samplerate
+        self.channels = fmt.channels
+        self.frames = len(samples)
+        self.total_samples = -(-self.frames * TARGET_RATE // self.samplerate)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """View the samples of a WAV file already in memory (e.g. an upload)"""
+        fmt = parse_wav(buffer)
+        samples = np.frombuffer(buffer, dtype='<i2', count=fmt.data_bytes // 2, offset=fmt.data_offset)
+        return cls(fmt, samples.reshape(-1, fmt.channels))
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map the samples of a WAV file on disk"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise wave.Error("file is empty")
+            # Only the pages holding chunk headers are touched while parsing
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as header_map:
+                fmt = parse_wav(header_map)
+        frames = fmt.data_bytes // fmt.block_align
+        if frames == 0:
+            return cls(fmt, np.zeros((0, fmt.channels), dtype='<i2'))
+        samples = np.memmap(path, dtype='<i2', mode='r', offset=fmt.data_offset, shape=(frames, fmt.channels))
+        return cls(fmt, samples)
+
+    def __str__(self):
+        return f"{self.channels} channels, 16-bit, {self.samplerate}Hz, {self.frames} frames"
+
+    def blocks(self, block_seconds=BLOCK_SECONDS):
+        """Yield 16kHz int16 mono blocks"""
+        if self.channels == 1 and self.samplerate == TARGET_RATE:
+            yield self.samples.reshape(-1)
+            return
+        resampler = StreamingResampler(self.samplerate, TARGET_RATE)
+        step = int(self.samplerate * block_seconds)
+        for start in range(0, self.frames, step):
+            block = self.samples[start:start + step]
+            mono = block[:, 0] if self.channels == 1 else block.mean(axis=1)
+            yield to_int16(resampler.process(mono))
+        tail = resampler.flush()
+        if len(tail):
+            yield to_int16(tail)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Usage: python {sys.argv[0]} <file.wav>")
+        return
+    audio = WavAudio.open(sys.argv[1])
+    print(f"📄 {sys.argv[1]}: {audio}")
+    print(f"   • data chunk at byte {audio.fmt.data_offset}, {audio.fmt.data_bytes} bytes "
+          f"({audio.frames / audio.samplerate:.1f} s), memory-mapped")
+
+
+if __name__ == "__main__":
+    main()